@@ -5,18 +5,36 @@ __author__ = 'TabQ'
 
 from GuGu.billboard import (BillBoard)
 
+from GuGu.cache import (Cache)
+
 from GuGu.classify import (Classify)
 
+from GuGu.klinestore import (KlineStore)
+
 from GuGu.lowriskintarb import (LowRiskIntArb)
 
 from GuGu.macro import (Macro)
 
 from GuGu.marketdata import (MarketData)
 
+from GuGu.metrics import (Metrics)
+
+from GuGu.ratelimit import (RateLimiter)
+
+from GuGu.recorder import (Recorder, FixtureServer)
+
 from GuGu.reference import (Reference)
 
+from GuGu.retry import (Retrier, CircuitBreaker, CircuitOpenError)
+
 from GuGu.stockdata import (StockData)
 
 from GuGu.stockinfo import (StockInfo)
 
+from GuGu.tickjob import (TickJob)
+
+from GuGu.tickstore import (TickStore)
+
+from GuGu.tradingcalendar import (TradingCalendar)
+
 from GuGu.utility import (Utility)
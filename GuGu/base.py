@@ -8,29 +8,618 @@ Created on 2018/12/27
 """
 
 import pandas as pd
+import numpy as np
 import sys
+import time
+import inspect
+import functools
+import threading
 import requests
+import lxml.html
+from io import BytesIO, StringIO
+from multiprocessing.pool import ThreadPool
 from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
 import config as cf
+from ratelimit import RateLimiter
+from retry import Retrier, CircuitBreaker
 
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
 
-class Base():
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    asyncio = None
+
+
+_session = None
+_sessionLock = threading.Lock()
+_cache = None
+_recorder = None
+_metrics = None
+_limiter = RateLimiter()
+_retrier = Retrier()
+_breaker = CircuitBreaker()
+_local = threading.local()
+_instrumentLock = threading.Lock()
+_asyncLock = threading.Lock()
+_asyncLoop = None
+_asyncExecutor = None
+
+
+def _newSession():
+    """
+    创建共用会话：默认连接池大小为 cf.POOL_SIZE，cf.POOL_SIZES 中的URL前缀使用各自的连接池
+    重试由 Base._retry 统一调度，传输层不再重试
+    """
+    session = requests.Session()
+    adapter = Adapter(pool_connections=cf.POOL_SIZE, pool_maxsize=cf.POOL_SIZE, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    for prefix, size in cf.POOL_SIZES:
+        session.mount(prefix, Adapter(pool_connections=1, pool_maxsize=size, max_retries=0))
+        
+    return session
+
+
+def _asyncEnv():
+    """
+    获取异步调用共享的事件循环及线程池
+    """
+    global _asyncLoop, _asyncExecutor
+    
+    if asyncio is None or not hasattr(asyncio, 'get_running_loop'):
+        raise ImportError(cf.ASYNC_UNSUPPORTED_MSG)
+    
+    with _asyncLock:
+        if _asyncExecutor is None:
+            _asyncExecutor = ThreadPoolExecutor(max_workers=cf.ASYNC_WORKERS)
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if _asyncLoop is None or _asyncLoop.is_closed():
+                _asyncLoop = asyncio.new_event_loop()
+            loop = _asyncLoop
+            
+    return loop, _asyncExecutor
+
+
+class _CallContext():
+    """
+    一次公共方法调用的统计上下文，在调用线程及其分页线程间共享
+    """
+    def __init__(self, method):
+        self.method = method
+        self.network = 0.0      # 网络请求耗时合计
+        self.waiting = 0.0      # 调用线程等待分页线程的时间
+        self.workers = 0.0      # 分页线程的执行时间合计
+        self.__lock = threading.Lock()
+        
+        
+    def request(self, seconds):
+        """
+        登记一次请求的耗时
+        """
+        with self.__lock:
+            self.network += seconds
+    
+    
+    def bind(self, func):
+        """
+        使分页线程中的请求记入本次调用
+        """
+        def run(page):
+            _local.context = self
+            start = time.time()
+            try:
+                return func(page)
+            finally:
+                with self.__lock:
+                    self.workers += time.time() - start
+                _local.context = None
+                
+        return run
+    
+    
+    def wait(self, seconds):
+        with self.__lock:
+            self.waiting += seconds
+            
+            
+    def parse(self, seconds):
+        """
+        网络请求以外的耗时：调用线程及分页线程的执行时间减去请求耗时
+        """
+        return max(0.0, seconds - self.waiting + self.workers - self.network)
+    
+    
+def _measured(method, func):
+    """
+    统计公共方法的调用耗时、解析耗时及返回行数，嵌套调用记入最外层方法
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        metrics = _metrics
+        if metrics is None or getattr(_local, 'context', None) is not None:
+            return func(self, *args, **kwargs)
+        
+        context = _CallContext(method)
+        _local.context = context
+        start = time.time()
+        try:
+            result = func(self, *args, **kwargs)
+        except Exception:
+            seconds = time.time() - start
+            metrics.observeCall(method, seconds, context.parse(seconds), error=True)
+            raise
+        finally:
+            _local.context = None
+        
+        seconds = time.time() - start
+        rows = len(result) if hasattr(result, '__len__') else 0
+        metrics.observeCall(method, seconds, context.parse(seconds), rows)
+        
+        return result
+    
+    return wrapper
+
+
+def _measuredPages(method, func):
+    """
+    统计分页生成器方法：每次取页时在本次调用的上下文中执行，生成器结束或关闭时记录总耗时及行数
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        pages = func(self, *args, **kwargs)
+        context = None
+        seconds = 0.0
+        rows = 0
+        error = False
+        try:
+            while True:
+                metrics = _metrics
+                own = metrics is not None and getattr(_local, 'context', None) is None
+                if own and context is None:
+                    context = _CallContext(method)
+                if own:
+                    _local.context = context
+                start = time.time()
+                try:
+                    page = next(pages)
+                except StopIteration:
+                    break
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    if own:
+                        seconds += time.time() - start
+                        _local.context = None
+                        
+                rows += len(page) if hasattr(page, '__len__') else 0
+                yield page
+        finally:
+            if context is not None and _metrics is not None:
+                _metrics.observeCall(method, seconds, context.parse(seconds), rows, error)
+                
+    return wrapper
+
+
+def _instrument(cls):
+    """
+    为Base子类的公共方法加上调用统计，每个类只处理一次
+    """
+    if cls.__dict__.get('_instrumented'):
+        return
+    
+    with _instrumentLock:
+        for klass in inspect.getmro(cls):
+            if klass is Base:
+                break
+            if klass.__dict__.get('_instrumented'):
+                continue
+            
+            for name, value in list(klass.__dict__.items()):
+                if name.startswith('_') or not inspect.isfunction(value):
+                    continue
+                measure = _measuredPages if inspect.isgeneratorfunction(value) else _measured
+                setattr(klass, name, measure('%s.%s' % (klass.__name__, name), value))
+            klass._instrumented = True
+        
+        
+class Collector():
+    """
+    分页数据收集器
+    逐页收集DataFrame或行数据列表，最后一次性合并，避免逐页append时的重复拷贝
+    """
+    def __init__(self, columns=None):
+        self.__frames = []
+        self.__rows = []
+        self.__columns = columns
+        
+        
+    def add(self, data):
+        """
+        添加一页数据
+        Parameters
+        ------
+            data: DataFrame or list
+                    单页DataFrame或行数据列表，为None时忽略
+        """
+        if data is None:
+            return
+        
+        if isinstance(data, pd.DataFrame):
+            self.__flushRows()
+            self.__frames.append(data)
+        else:
+            self.__rows.extend(data)
+            
+            
+    def result(self, ignore_index=True):
+        """
+        合并所有已收集的数据
+        return
+        ------
+            DataFrame 无数据时返回空DataFrame
+        """
+        self.__flushRows()
+        
+        if not self.__frames:
+            return pd.DataFrame(columns=self.__columns) if self.__columns is not None else pd.DataFrame()
+        
+        data = pd.concat(self.__frames, ignore_index=ignore_index)
+        self.__frames = [data]
+        
+        return data
+    
+    
+    def __flushRows(self):
+        if self.__rows:
+            self.__frames.append(pd.DataFrame(self.__rows, columns=self.__columns))
+            self.__rows = []
+            
+            
+class Adapter(HTTPAdapter):
+    """
+    GuGu传输适配器：GET请求先查询响应缓存，实际发出的请求经过按域名熔断及限流；设置了Recorder时录制或回放响应
+    可重试的HTTP状态码（cf.RETRY_STATUS）转为 HTTPError，由 Base._retry 统一重试
+    """
+    def send(self, request, **kwargs):
+        metrics = _metrics
+        retries = _retrier.retried()
+        if metrics is None:
+            return self.__dispatch(request, **kwargs)
+        
+        context = getattr(_local, 'context', None)
+        method = context.method if context is not None else cf.METRICS_NO_METHOD
+        start = time.time()
+        try:
+            response = self.__dispatch(request, **kwargs)
+        except Exception:
+            seconds = time.time() - start
+            if context is not None:
+                context.request(seconds)
+            metrics.observeRequest(method, request.url, seconds, error=True, retries=retries)
+            raise
+        
+        seconds = time.time() - start
+        if context is not None:
+            context.request(seconds)
+        history = getattr(getattr(response.raw, 'retries', None), 'history', None)
+        retries += len(history) if history else 0
+        metrics.observeRequest(method, request.url, seconds, len(response.content), 
+                               response.status_code >= 400, retries)
+        
+        return response
+    
+    
+    def __dispatch(self, request, **kwargs):
+        recorder = _recorder
+        if recorder is None:
+            return self.__send(request, **kwargs)
+        
+        if recorder.mode == 'replay':
+            hit = recorder.load(request.url)
+            if hit is None:
+                raise requests.exceptions.ConnectionError(cf.RECORDER_MISSING_MSG % request.url, request=request)
+            return self.__buildResponse(request, hit)
+        
+        response = self.__send(request, **kwargs)
+        recorder.save(request.url, response.content, response.status_code, response.headers)
+        
+        return response
+    
+    
+    def __send(self, request, **kwargs):
+        cache = _cache
+        if cache is None or request.method != 'GET':
+            return self.__limited(request, **kwargs)
+        
+        ttl = cache.ttl(request.url)
+        if ttl <= 0:
+            return self.__limited(request, **kwargs)
+        
+        key = cache.key(request.url)
+        hit = cache.get(key)
+        if hit is not None:
+            return self.__buildResponse(request, hit)
+        
+        response = self.__limited(request, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, (response.status_code, dict(response.headers), response.content), ttl)
+            
+        return response
+    
+    
+    def __limited(self, request, **kwargs):
+        breaker = _breaker
+        host = urlparse(request.url).hostname or ''
+        if breaker is not None:
+            breaker.before(host)
+        
+        limiter = _limiter
+        bucket = limiter.acquire(request.url) if limiter is not None else None
+        try:
+            response = HTTPAdapter.send(self, request, **kwargs)
+        except Exception:
+            if breaker is not None:
+                breaker.failure(host)
+            raise
+        finally:
+            if bucket is not None:
+                limiter.release(bucket)
+                
+        if response.status_code in cf.RETRY_STATUS:
+            if breaker is not None:
+                breaker.failure(host)
+            response.close()
+            raise requests.exceptions.HTTPError(cf.RETRY_STATUS_MSG % (response.status_code, request.url),
+                                                request=request, response=response)
+        
+        if breaker is not None:
+            breaker.success(host)
+            
+        return response
+    
+    
+    def __buildResponse(self, request, hit):
+        response = requests.Response()
+        response.status_code, headers, response._content = hit
+        response.headers = requests.structures.CaseInsensitiveDict(headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.reason = 'OK' if response.status_code == 200 else ''
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        
+        return response
+    
+    
+class Base(object):
+    """
+    数据接口基类
+    各方法的结果保存在调用线程各自的 _data 中，同一对象可在多个线程中并发调用，结果以返回值为准
+    """
     def __init__(self, pandas=True, inter=True):
+        self._threadLocal = threading.local()      # 按线程保存的调用结果
         self.__pandas = False if not pandas else True
         self._PY3 = (sys.version_info[0] >= 3)
         self._inter = False if not inter else True      # 交互模式
         
-        self._session = requests.Session()
-        retry = Retry(connect=5, backoff_factor=1)
-        adapter = HTTPAdapter(max_retries=retry)
-        self._session.mount('http://', adapter)
-        self._session.mount('https://', adapter)
-        self._session.keep_alive = False
-        
         self._data = pd.DataFrame()
+        
+        _instrument(self.__class__)
+        
+        
+    @property
+    def _data(self):
+        """
+        当前线程最近一次调用的结果
+        """
+        data = getattr(self._threadLocal, 'data', None)
+        if data is None:
+            data = self._threadLocal.data = pd.DataFrame()
+            
+        return data
+    
+    
+    @_data.setter
+    def _data(self, data):
+        self._threadLocal.data = data
+        
+        
+    @property
+    def _session(self):
+        """
+        所有对象共用的会话，连接保持复用
+        """
+        return Base.getSession()
 
 
+    def __getattr__(self, name):
+        """
+        公共方法的异步版本：在方法名后加Async，返回可await的对象
+        e.g. await StockData('600000').historyAsync(start='2018-01-01')
+        """
+        if name.endswith('Async') and not name.startswith('_'):
+            func = getattr(self, name[:-len('Async')])
+            if callable(func):
+                return functools.partial(self._async, func.__name__)
+            
+        raise AttributeError(name)
+    
+    
+    def _async(self, name, *args, **kwargs):
+        """
+        在共享线程池中执行公共方法，返回绑定在共享事件循环上的Future
+        结果按线程保存，并发调用之间互不覆盖，结果以返回值为准
+        """
+        loop, executor = _asyncEnv()
+        
+        return loop.run_in_executor(executor, functools.partial(getattr(self, name), *args, **kwargs))
+    
+    
+    @staticmethod
+    def setSession(session=None):
+        """
+        设置所有对象及Utility共用的会话
+        Parameters
+        ------
+            session: requests.Session
+                    为None时在下次请求时重新创建默认会话（如在fork出的子进程中）
+        """
+        global _session
+        with _sessionLock:
+            _session = session
+            
+            
+    @staticmethod
+    def getSession():
+        """
+        获取所有对象及Utility共用的会话，首次调用时创建
+        """
+        global _session
+        
+        session = _session
+        if session is not None:
+            return session
+        
+        with _sessionLock:
+            if _session is None:
+                _session = _newSession()
+                
+            return _session
+        
+        
+    @staticmethod
+    def setCache(cache=None):
+        """
+        设置所有对象共用的网络响应缓存
+        Parameters
+        ------
+            cache: Cache
+                    e.g. Cache(maxsize=1024, path='./cache')，为None时关闭缓存
+        """
+        global _cache
+        _cache = cache
+        
+        
+    @staticmethod
+    def getCache():
+        return _cache
+    
+    
+    @staticmethod
+    def setRecorder(recorder=None):
+        """
+        设置所有对象共用的响应录制回放器
+        Parameters
+        ------
+            recorder: Recorder
+                    e.g. Recorder('./fixtures', 'record')，为None时恢复正常请求
+        """
+        global _recorder
+        _recorder = recorder
+        
+        
+    @staticmethod
+    def getRecorder():
+        return _recorder
+    
+    
+    @staticmethod
+    def setRateLimiter(limiter=None):
+        """
+        设置所有对象共用的按域名限流器，默认使用 cf.RATE_LIMITS 的规则
+        Parameters
+        ------
+            limiter: RateLimiter
+                    e.g. RateLimiter([('jisilu.cn', 1, 2, 1)])，为None时不限流
+        """
+        global _limiter
+        _limiter = limiter
+        
+        
+    @staticmethod
+    def getRateLimiter():
+        return _limiter
+    
+    
+    @staticmethod
+    def setRetrier(retrier=None):
+        """
+        设置所有对象共用的重试调度器
+        Parameters
+        ------
+            retrier: Retrier
+                    e.g. Retrier(base=1, cap=60)，为None时恢复默认
+        """
+        global _retrier
+        _retrier = retrier or Retrier()
+        
+        
+    @staticmethod
+    def getRetrier():
+        return _retrier
+    
+    
+    @staticmethod
+    def setCircuitBreaker(breaker=None):
+        """
+        设置所有对象共用的按域名熔断器
+        Parameters
+        ------
+            breaker: CircuitBreaker
+                    e.g. CircuitBreaker(failures=10, cooldown=60)，为None时不熔断
+        """
+        global _breaker
+        _breaker = breaker
+        
+        
+    @staticmethod
+    def getCircuitBreaker():
+        return _breaker
+    
+    
+    @staticmethod
+    def setMetrics(metrics=None):
+        """
+        设置所有对象共用的请求与调用统计
+        Parameters
+        ------
+            metrics: Metrics
+                    e.g. Metrics()，为None时关闭统计
+        """
+        global _metrics
+        _metrics = metrics
+        
+        
+    @staticmethod
+    def getMetrics():
+        return _metrics
+    
+    
+    @staticmethod
+    def runAsync(*aws):
+        """
+        在共享事件循环中并发执行多个异步调用，用于非异步代码
+        Parameters
+        ------
+            aws: 由xxxAsync方法返回的可await对象
+        return
+        ------
+            list 与aws顺序一致的结果
+        """
+        loop, _ = _asyncEnv()
+        
+        return loop.run_until_complete(asyncio.gather(*aws))
+        
+        
     def _result(self):
         """
         返回结果：使用pandas时返回DataFrame否则返回list
@@ -51,7 +640,17 @@ class Base():
             return self._data.to_dict('records')
         
         
+    def _page(self, data):
+        """
+        分页生成器的单页结果：使用pandas时返回DataFrame否则返回list
+        """
+        return data if self.__pandas else data.to_dict('records')
+    
+    
     def output(self, full=False):
+        """
+        打印当前线程最近一次调用的结果，并发使用时请直接使用各方法的返回值
+        """
         print('')
         
         if not full:
@@ -102,5 +701,168 @@ class Base():
         if self._inter:
             sys.stdout.write(cf.GETTING_FLAG)
             sys.stdout.flush()  
+            
+            
+    def _retry(self, func, retry=3, pause=0.001):
+        """
+        按共用的重试调度执行抓取
+        Parameters
+        ------
+            func: function
+                    无参数的抓取函数
+            retry: int, 默认 3
+                    最多执行次数，网络类错误按带抖动的指数退避重试，解析错误及熔断中的域名直接失败
+            pause: float, 默认 0.001
+                    首次执行前及重试间隔的最小等待秒数
+        return
+        ------
+            func的返回值，最终失败时抛出 IOError(cf.NETWORK_URL_ERROR_MSG)
+        """
+        return _retrier.run(func, retry, pause)
+    
+    
+    def _getHtml(self, url, encoding=None, replace=None):
+        """
+        通过会话获取页面并解析为lxml文档
+        Parameters
+        ------
+            url: string
+            encoding: string
+                    页面编码，为空时由lxml根据页面声明识别
+            replace: list
+                    解析前对页面文本的替换 [(old, new), ...]，需同时指定encoding
+        return
+        ------
+            lxml.etree.ElementTree
+        """
+        request = self._session.get(url, timeout=10)
+        if encoding is None:
+            return lxml.html.parse(BytesIO(request.content))
+        
+        request.encoding = encoding
+        text = request.text
+        for old, new in (replace or []):
+            text = text.replace(old, new)
+            
+        return lxml.html.parse(StringIO(text))
+    
+    
+    def _parseTable(self, rows, skiprows=None, replace=None):
+        """
+        直接从lxml表格行中提取单元格文本，按列构建DataFrame
+        只含<th>的行视为表头跳过；可整列转为数值的列（允许千分位逗号）转换为数值，空单元格为NaN
+        Parameters
+        ------
+            rows: list
+                    lxml <tr>元素列表
+            skiprows: list
+                    跳过的行序号
+            replace: list
+                    单元格文本的替换 [(old, new), ...]
+        return
+        ------
+            DataFrame 列名为列序号0,1,2...
+        """
+        data = []
+        for i, row in enumerate(rows):
+            if skiprows is not None and i in skiprows:
+                continue
+            
+            cells = [cell for cell in row if cell.tag in ('td', 'th')]
+            if not [cell for cell in cells if cell.tag == 'td']:
+                continue
+            texts = [cell.text_content().strip() for cell in cells]
+            for old, new in (replace or []):
+                texts = [text.replace(old, new) for text in texts]
+            data.append(texts)
+            
+        if not data:
+            return pd.DataFrame()
+        
+        width = max([len(row) for row in data])
+        columns = {}
+        for idx, values in enumerate(zip(*[row + [''] * (width - len(row)) for row in data])):
+            try:
+                columns[idx] = pd.to_numeric([value.replace(',', '') for value in values])
+            except (ValueError, TypeError):
+                columns[idx] = [value if value else np.nan for value in values]
+                
+        return pd.DataFrame(columns, columns=list(range(width)))
+    
+    
+    def _iterPages(self, fetch, page=1, retry=3, pause=0.001):
+        """
+        逐页抓取分页数据，栈深度不随页数增长
+        Parameters
+        ------
+            fetch: function
+                    单页抓取函数，参数为页码，返回 (单页数据, 下一页页码)，下一页页码为None时结束
+            page: int, 默认 1
+                    起始页码
+            retry, pause:
+                    同 _retry，按页重试
+        return
+        ------
+            generator 依次产出各页数据，单页数据为None时跳过
+        """
+        while page is not None:
+            self._writeConsole()
+            data, page = self._retry(functools.partial(fetch, page), retry, pause)
+            if data is not None:
+                yield data
+                
+                
+    def _collectPages(self, pages, columns=None):
+        """
+        合并分页生成器产出的各页数据
+        Parameters
+        ------
+            pages: generator
+                    e.g. _iterPages 的返回值
+            columns: list
+                    无数据时返回的空DataFrame的列
+        return
+        ------
+            DataFrame
+        """
+        dataArr = Collector(columns)
+        for data in pages:
+            dataArr.add(data)
+            
+        return dataArr.result()
+    
+    
+    def _mapPages(self, func, pages, workers=8):
+        """
+        并发抓取分页数据，结果按页码顺序返回
+        Parameters
+        ------
+            func: function
+                    单页抓取函数，参数为页码
+            pages: list
+                    页码列表
+            workers: int, 默认 8
+                    并发线程数，小于2时顺序抓取
+        return
+        ------
+            list 与pages顺序一致的抓取结果
+        """
+        pages = list(pages)
+        if len(pages) < 2 or workers < 2:
+            return [func(page) for page in pages]
+        
+        context = getattr(_local, 'context', None)
+        if context is not None:
+            func = context.bind(func)
+        
+        start = time.time()
+        pool = ThreadPool(min(workers, len(pages), cf.POOL_SIZE))
+        try:
+            return pool.map(func, pages)
+        finally:
+            pool.close()
+            pool.join()
+            if context is not None:
+                context.wait(time.time() - start)
         
         
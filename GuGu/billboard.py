@@ -7,12 +7,8 @@ Created on 2019/01/11
 @contact: 16621596@qq.com
 """
 
-import time
 import re
 import pandas as pd
-from pandas.compat import StringIO
-import lxml.html
-from lxml import etree
 from base import Base, cf
 from utility import Utility
 
@@ -47,7 +43,7 @@ class BillBoard(Base):
         self._data = pd.DataFrame()
         
         if date is None:
-            if Utility.getHour() < 18:
+            if Utility.getHour() < 18 or not Utility.isTradeDay():
                 date = Utility.lastTradeDate()
             else:
                 date = Utility.getToday()
@@ -55,38 +51,33 @@ class BillBoard(Base):
             if not Utility.isTradeDay(date):
                 return None
             
-        for _ in range(retry):
-            time.sleep(pause)
+        def fetch():
+            # http://data.eastmoney.com/DataCenter_V3/stock2016/TradeDetail/pagesize=200,page=1,sortRule=-1,sortType=,startDate=2019-01-10,endDate=2019-01-10,gpfw=0,js=vardata_tab_1.html
+            request = self._session.get( cf.LHB_URL % (date, date), timeout=10 )
+            request.encoding = 'gbk'
+            text = request.text.split('_1=')[1]
+            dataDict = Utility.str2Dict(text)
             
-            try:
-                # http://data.eastmoney.com/DataCenter_V3/stock2016/TradeDetail/pagesize=200,page=1,sortRule=-1,sortType=,startDate=2019-01-10,endDate=2019-01-10,gpfw=0,js=vardata_tab_1.html
-                request = self._session.get( cf.LHB_URL % (date, date), timeout=10 )
-                request.encoding = 'gbk'
-                text = request.text.split('_1=')[1]
-                dataDict = Utility.str2Dict(text)
-                
-                self._data = pd.DataFrame(dataDict['data'], columns=cf.LHB_TMP_COLS)
-                self._data.columns = cf.LHB_COLS
-                self._data['buy'] = self._data['buy'].astype(float)
-                self._data['sell'] = self._data['sell'].astype(float)
-                self._data['amount'] = self._data['amount'].astype(float)
-                self._data['Turnover'] = self._data['Turnover'].astype(float)
-                self._data['bratio'] = self._data['buy'] / self._data['Turnover']
-                self._data['sratio'] = self._data['sell'] / self._data['Turnover']
-                self._data['bratio'] = self._data['bratio'].map(cf.FORMAT)
-                self._data['sratio'] = self._data['sratio'].map(cf.FORMAT)
-                self._data['date'] = date
-                for col in ['amount', 'buy', 'sell']:
-                    self._data[col] = self._data[col].astype(float)
-                    self._data[col] = self._data[col] / 10000
-                    self._data[col] = self._data[col].map(cf.FORMAT)
-                self._data = self._data.drop('Turnover', axis=1)
-            except:
-                pass
-            else:
-                return self._result()
+            self._data = pd.DataFrame(dataDict['data'], columns=cf.LHB_TMP_COLS)
+            self._data.columns = cf.LHB_COLS
+            self._data['buy'] = self._data['buy'].astype(float)
+            self._data['sell'] = self._data['sell'].astype(float)
+            self._data['amount'] = self._data['amount'].astype(float)
+            self._data['Turnover'] = self._data['Turnover'].astype(float)
+            self._data['bratio'] = self._data['buy'] / self._data['Turnover']
+            self._data['sratio'] = self._data['sell'] / self._data['Turnover']
+            self._data['bratio'] = self._data['bratio'].map(cf.FORMAT)
+            self._data['sratio'] = self._data['sratio'].map(cf.FORMAT)
+            self._data['date'] = date
+            for col in ['amount', 'buy', 'sell']:
+                self._data[col] = self._data[col].astype(float)
+                self._data[col] = self._data[col] / 10000
+                self._data[col] = self._data[col].map(cf.FORMAT)
+            self._data = self._data.drop('Turnover', axis=1)
+            
+            return self._result()
             
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+        return self._retry(fetch, retry, pause)
     
     
     def countTops(self, days=5, retry=3, pause=0.001):
@@ -118,8 +109,8 @@ class BillBoard(Base):
             self._writeHead()
             
             # http://vip.stock.finance.sina.com.cn/q/go.php/vLHBData/kind/ggtj/index.phtml?last=5&p=1
-            self._data =  self.__parsePage(kind=cf.LHB_KINDS[0], last=days, column=cf.LHB_GGTJ_COLS, dataArr=pd.DataFrame(), pageNo=1, retry=retry, pause=pause)
-            self._data['code'] = self._data['code'].map(lambda x: str(x).zfill(6))
+            self._data =  self.__parsePage(kind=cf.LHB_KINDS[0], last=days, column=cf.LHB_GGTJ_COLS, retry=retry, pause=pause)
+            self._data['code'] = Utility.codes(self._data['code'])
             if self._data is not None:
                 self._data = self._data.drop_duplicates('code')
                 
@@ -154,7 +145,7 @@ class BillBoard(Base):
             self._writeHead()
             
             # http://vip.stock.finance.sina.com.cn/q/go.php/vLHBData/kind/yytj/index.phtml?last=5&p=1
-            self._data = self.__parsePage(kind=cf.LHB_KINDS[1], last=days, column=cf.LHB_YYTJ_COLS, dataArr=pd.DataFrame(), pageNo=1, retry=retry, pause=pause)
+            self._data = self.__parsePage(kind=cf.LHB_KINDS[1], last=days, column=cf.LHB_YYTJ_COLS, retry=retry, pause=pause)
             
             return self._result()
         
@@ -188,8 +179,8 @@ class BillBoard(Base):
             self._writeHead()
             
             # http://vip.stock.finance.sina.com.cn/q/go.php/vLHBData/kind/jgzz/index.phtml?last=5&p=1
-            self._data = self.__parsePage(kind=cf.LHB_KINDS[2], last=days, column=cf.LHB_JGZZ_COLS, dataArr=pd.DataFrame(), pageNo=1, retry=retry, pause=pause, drop_column=[2,3])
-            self._data['code'] = self._data['code'].map(lambda x: str(x).zfill(6))
+            self._data = self.__parsePage(kind=cf.LHB_KINDS[2], last=days, column=cf.LHB_JGZZ_COLS, retry=retry, pause=pause, drop_column=[2,3])
+            self._data['code'] = Utility.codes(self._data['code'])
             
             return self._result()
         
@@ -219,42 +210,50 @@ class BillBoard(Base):
         self._writeHead()
         
         # http://vip.stock.finance.sina.com.cn/q/go.php/vLHBData/kind/jgmx/index.phtml?last=&p=1
-        self._data = self.__parsePage(kind=cf.LHB_KINDS[3], last='', column=cf.LHB_JGMX_COLS, dataArr=pd.DataFrame(), pageNo=1, retry=retry, pause=pause)
+        self._data = self.__parsePage(kind=cf.LHB_KINDS[3], last='', column=cf.LHB_JGMX_COLS, retry=retry, pause=pause)
         if len(self._data) > 0:
-            self._data['code'] = self._data['code'].map(lambda x: str(x).zfill(6))
+            self._data['code'] = Utility.codes(self._data['code'])
             
         return self._result()
         
     
-    def __parsePage(self, kind, last, column, dataArr, pageNo=1, retry=3, pause=0.001, drop_column=None):
-        self._writeConsole()
+    def iterInstDetail(self, retry=3, pause=0.001):
+        """
+        逐页获取最近一个交易日机构席位成交明细统计数据，内存占用不随页数增长
+        Parameters
+        --------
+        retry : int, 默认 3
+                     如遇网络等问题重复执行的次数 
+        pause : int, 默认 0
+                    重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
+                    
+        Return
+        ----------
+        generator 每次产出一页 DataFrame or List，字段同instDetail
+        """
+        self._writeHead()
         
-        for _ in range(retry):
-            time.sleep(pause)
+        for df in self.__iterPages(cf.LHB_KINDS[3], '', cf.LHB_JGMX_COLS, retry, pause):
+            df['code'] = Utility.codes(df['code'])
+            yield self._page(df)
             
-            try:
-                request = self._session.get( cf.LHB_SINA_URL % (kind, last, pageNo), timeout=10 )
-                request.encoding = 'gbk'
-                html = lxml.html.parse(StringIO(request.text))
-                res = html.xpath("//table[@id=\"dataTable\"]/tr")
-                if self._PY3:
-                    sarr = [etree.tostring(node).decode('utf-8') for node in res]
-                else:
-                    sarr = [etree.tostring(node) for node in res]
-                sarr = ''.join(sarr)
-                sarr = '<table>%s</table>'%sarr
-                df = pd.read_html(sarr)[0]
-                if drop_column is not None:
-                    df = df.drop(drop_column, axis=1)
-                df.columns = column
-                dataArr = dataArr.append(df, ignore_index=True)
-                nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-                if len(nextPage) > 0:
-                    pageNo = re.findall(r'\d+', nextPage[0])[0]
-                    return self.__parsePage(kind, last, column, dataArr, pageNo, retry, pause, drop_column)
-                else:
-                    return dataArr
-            except Exception as e:
-                print(e)
+            
+    def __parsePage(self, kind, last, column, retry=3, pause=0.001, drop_column=None):
+        return self._collectPages(self.__iterPages(kind, last, column, retry, pause, drop_column))
+    
+    
+    def __iterPages(self, kind, last, column, retry, pause, drop_column=None):
+        def fetch(pageNo):
+            html = self._getHtml(cf.LHB_SINA_URL % (kind, last, pageNo), 'gbk')
+            res = html.xpath("//table[@id=\"dataTable\"]/tr")
+            df = self._parseTable(res)
+            if drop_column is not None:
+                df = df.drop(drop_column, axis=1)
+            df.columns = column
+            nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
+            
+            return df, (re.findall(r'\d+', nextPage[0])[0] if len(nextPage) > 0 else None)
+        
+        return self._iterPages(fetch, 1, retry, pause)
                 
                 
@@ -0,0 +1,168 @@
+# -*- coding:utf-8 -*-
+"""
+网络响应缓存类
+Created on 2026/10/18
+@group : GuGu
+"""
+
+import os
+import re
+import time
+import pickle
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+import config as cf
+
+_replaceLock = threading.Lock()
+
+
+def _dump(item, filename):
+    """
+    把item pickle到同目录下的独立临时文件再原子地替换filename，读取方不会读到写了一半的文件
+    py2没有os.replace，在锁内先删除再改名，保证同一进程内的写入互不干扰
+    """
+    fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(filename))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(item, f, pickle.HIGHEST_PROTOCOL)
+        if hasattr(os, 'replace'):
+            os.replace(tmp, filename)
+        else:
+            with _replaceLock:
+                if os.path.exists(filename):
+                    os.remove(filename)
+                os.rename(tmp, filename)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class Cache():
+    """
+    网络响应缓存：内存LRU淘汰，可选磁盘存储
+    以去掉随机防缓存参数后的URL为键，按接口类别设置有效期
+    """
+    def __init__(self, maxsize=1024, path=None, ttl=None, default_ttl=None):
+        """
+        Parameters
+        ------
+            maxsize: int, 默认 1024
+                    内存中最多保存的响应数，超出时淘汰最久未使用的响应
+            path: string
+                    磁盘缓存目录，为空时只使用内存缓存
+            ttl: list
+                    [(URL片段, 有效秒数), ...]，按顺序匹配，优先于 cf.CACHE_TTL
+            default_ttl: int
+                    未匹配任何URL片段时的有效秒数，默认 cf.CACHE_DEFAULT_TTL，0为不缓存
+        """
+        self.__maxsize = maxsize
+        self.__path = path
+        self.__ttl = list(ttl or []) + cf.CACHE_TTL
+        self.__defaultTtl = cf.CACHE_DEFAULT_TTL if default_ttl is None else default_ttl
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+
+        if path is not None and not os.path.exists(path):
+            os.makedirs(path)
+
+
+    @staticmethod
+    def key(url):
+        """
+        规范化URL：去掉 r=、rn= 等随机参数及jsonp随机回调名
+        """
+        url = re.sub(cf.CACHE_RANDOM_PARAMS, '', url)
+        url = re.sub(cf.CACHE_RANDOM_CALLBACK, r'\1', url)
+
+        return url.rstrip('?&')
+
+
+    def ttl(self, url):
+        """
+        获取URL对应的缓存有效秒数
+        """
+        for pattern, seconds in self.__ttl:
+            if pattern in url:
+                return seconds
+
+        return self.__defaultTtl
+
+
+    def get(self, key):
+        """
+        读取缓存，过期或不存在时返回None
+        """
+        now = time.time()
+
+        with self.__lock:
+            item = self.__data.get(key)
+            if item is not None:
+                if item[0] > now:
+                    self.__data.pop(key)
+                    self.__data[key] = item
+                    return item[1]
+                self.__data.pop(key)
+
+        item = self.__readDisk(key)
+        if item is not None and item[0] > now:
+            self.__store(key, item)
+            return item[1]
+
+        return None
+
+
+    def set(self, key, value, ttl):
+        """
+        写入缓存
+        Parameters
+        ------
+            key: string
+            value: 可pickle的对象
+            ttl: int 有效秒数
+        """
+        item = (time.time() + ttl, value)
+        self.__store(key, item)
+
+        if self.__path is not None:
+            _dump(item, self.__file(key))
+
+
+    def clear(self):
+        """
+        清空缓存
+        """
+        with self.__lock:
+            self.__data.clear()
+
+        if self.__path is not None:
+            for name in os.listdir(self.__path):
+                if name.endswith('.cache'):
+                    os.remove(os.path.join(self.__path, name))
+
+
+    def __store(self, key, item):
+        with self.__lock:
+            self.__data.pop(key, None)
+            self.__data[key] = item
+            while len(self.__data) > self.__maxsize:
+                self.__data.popitem(last=False)
+
+
+    def __readDisk(self, key):
+        if self.__path is None:
+            return None
+
+        try:
+            with open(self.__file(key), 'rb') as f:
+                return pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+
+    def __file(self, key):
+        name = hashlib.md5(key.encode('utf-8')).hexdigest()
+
+        return os.path.join(self.__path, '%s.cache' % name)
@@ -6,11 +6,10 @@ Created on 2019/01/10
 @group : GuGu
 @contact: 16621596@qq.com
 """
-import time
 import json
 import re
 import pandas as pd
-from base import Base, cf
+from base import Base, Collector, cf
 
 class Classify(Base):        
     def byIndustry(self, std='sina', retry=3, pause=0.001):
@@ -36,16 +35,18 @@ class Classify(Base):
         
         if std == 'sw':
             # http://vip.stock.finance.sina.com.cn/q/view/SwHy.php
-            df = self.__getTypeData(cf.SINA_INDUSTRY_INDEX_URL % 'SwHy.php')
+            df = self.__getTypeData(cf.SINA_INDUSTRY_INDEX_URL % 'SwHy.php', retry, pause)
         else:
             # http://vip.stock.finance.sina.com.cn/q/view/newSinaHy.php
-            df = self.__getTypeData(cf.SINA_INDUSTRY_INDEX_URL % 'newSinaHy.php')
+            df = self.__getTypeData(cf.SINA_INDUSTRY_INDEX_URL % 'newSinaHy.php', retry, pause)
             
         self._writeHead()
+        dataArr = Collector()
         for row in df.values:
             rowDf =  self.__getDetail(row[0], retry, pause)
             rowDf['c_name'] = row[1]
-            self._data = self._data.append(rowDf, ignore_index=True)
+            dataArr.add(rowDf)
+        self._data = dataArr.result()
         
         return self._result()
     
@@ -70,50 +71,47 @@ class Classify(Base):
         
         self._writeHead()
         # http://money.finance.sina.com.cn/q/view/newFLJK.php?param=class
-        df = self.__getTypeData( cf.SINA_CONCEPTS_INDEX_URL )
+        df = self.__getTypeData( cf.SINA_CONCEPTS_INDEX_URL, retry, pause )
         
+        dataArr = Collector()
         for row in df.values:
             rowDf = self.__getDetail(row[0], retry, pause)
             rowDf['c_name'] = row[1]
-            self._data = self._data.append(rowDf)
+            dataArr.add(rowDf)
+        self._data = dataArr.result(ignore_index=False)
             
         return self._result()
     
             
-    def __getTypeData(self, url):
-        try:
+    def __getTypeData(self, url, retry=3, pause=0.001):
+        def fetch():
             request = self._session.get(url, timeout=10)
             request.encoding = 'gbk'
-            text = request.text.split('=')[1]
-            dataJson = json.loads(text)
-            df = pd.DataFrame([[row.split(',')[0], row.split(',')[1]] for row in dataJson.values()], columns=['tag', 'name'])
             
-            return df
-        except Exception as e:
-            print(str(e))
+            return request.text.split('=')[1]
+        
+        dataJson = json.loads(self._retry(fetch, retry, pause))
+        df = pd.DataFrame([[row.split(',')[0], row.split(',')[1]] for row in dataJson.values()], columns=['tag', 'name'])
+        
+        return df
     
     def __getDetail(self, tag, retry=3, pause=0.001):
         self._writeConsole()
         
-        for retryCount in range(retry):
-            time.sleep(pause)
+        def fetch():
+            # http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/Market_Center.getHQNodeData?page=1&num=1000&sort=symbol&asc=1&node=new_zhhy&symbol=&_s_r_a=page
+            request = self._session.get( cf.SINA_DATA_DETAIL_URL % tag, timeout=10 )
+            reg = re.compile(r'\,(.*?)\:')
+            text = reg.sub(r',"\1":', request.text)
+            text = text.replace('"{symbol', '{"symbol')
+            text = text.replace('{symbol', '{"symbol"')
+            jstr = json.dumps(text)
+            js = json.loads(jstr)
             
-            try:
-                # http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/Market_Center.getHQNodeData?page=1&num=1000&sort=symbol&asc=1&node=new_zhhy&symbol=&_s_r_a=page
-                request = self._session.get( cf.SINA_DATA_DETAIL_URL % tag, timeout=10 )
-                reg = re.compile(r'\,(.*?)\:')
-                text = reg.sub(r',"\1":', request.text)
-                text = text.replace('"{symbol', '{"symbol')
-                text = text.replace('{symbol', '{"symbol"')
-                jstr = json.dumps(text)
-                js = json.loads(jstr)
-                
-                df = pd.DataFrame(pd.read_json(js, dtype={'code':object}), columns=cf.FOR_CLASSIFY_B_COLS)
-                
-                return df
-            except:
-                time.sleep((retryCount+1)*10)
+            df = pd.DataFrame(pd.read_json(js, dtype={'code':object}), columns=cf.FOR_CLASSIFY_B_COLS)
             
-        raise IOError(cf.NETWORK_ERR_MSG)
+            return df
+        
+        return self._retry(fetch, retry, pause)
     
     
@@ -9,6 +9,26 @@ Created on 2018/12/26
 
 VERSION = '0.1.0'
 HOLIDAY_URL = 'http://timor.tech/api/holiday/info/%s'
+# 沪深交易所休市日（不含周末），按年份列出 月-日
+HOLIDAYS = {
+    2010: '01-01 02-15 02-16 02-17 02-18 02-19 04-05 05-03 06-14 06-15 06-16 09-22 09-23 09-24 10-01 10-04 10-05 10-06 10-07',
+    2011: '01-03 02-02 02-03 02-04 02-07 02-08 04-04 04-05 05-02 06-06 09-12 10-03 10-04 10-05 10-06 10-07',
+    2012: '01-02 01-03 01-23 01-24 01-25 01-26 01-27 04-02 04-03 04-04 04-30 05-01 06-22 10-01 10-02 10-03 10-04 10-05',
+    2013: '01-01 01-02 01-03 02-11 02-12 02-13 02-14 02-15 04-04 04-05 04-29 04-30 05-01 06-10 06-11 06-12 09-19 09-20 10-01 10-02 10-03 10-04 10-07',
+    2014: '01-01 01-31 02-03 02-04 02-05 02-06 04-07 05-01 05-02 06-02 09-08 10-01 10-02 10-03 10-06 10-07',
+    2015: '01-01 01-02 02-18 02-19 02-20 02-23 02-24 04-06 05-01 06-22 09-03 09-04 10-01 10-02 10-05 10-06 10-07',
+    2016: '01-01 02-08 02-09 02-10 02-11 02-12 04-04 05-02 06-09 06-10 09-15 09-16 10-03 10-04 10-05 10-06 10-07',
+    2017: '01-02 01-27 01-30 01-31 02-01 02-02 04-03 04-04 05-01 05-29 05-30 10-02 10-03 10-04 10-05 10-06',
+    2018: '01-01 02-15 02-16 02-19 02-20 02-21 04-05 04-06 04-30 05-01 06-18 09-24 10-01 10-02 10-03 10-04 10-05 12-31',
+    2019: '01-01 02-04 02-05 02-06 02-07 02-08 04-05 05-01 05-02 05-03 06-07 09-13 10-01 10-02 10-03 10-04 10-07',
+    2020: '01-01 01-24 01-27 01-28 01-29 01-30 01-31 04-06 05-01 05-04 05-05 06-25 06-26 10-01 10-02 10-05 10-06 10-07 10-08',
+    2021: '01-01 02-11 02-12 02-15 02-16 02-17 04-05 05-03 05-04 05-05 06-14 09-20 09-21 10-01 10-04 10-05 10-06 10-07',
+    2022: '01-03 01-31 02-01 02-02 02-03 02-04 04-04 04-05 05-02 05-03 05-04 06-03 09-12 10-03 10-04 10-05 10-06 10-07',
+    2023: '01-02 01-23 01-24 01-25 01-26 01-27 04-05 05-01 05-02 05-03 06-22 06-23 09-29 10-02 10-03 10-04 10-05 10-06',
+    2024: '01-01 02-09 02-12 02-13 02-14 02-15 02-16 04-04 04-05 05-01 05-02 05-03 06-10 09-16 09-17 10-01 10-02 10-03 10-04 10-07',
+    2025: '01-01 01-28 01-29 01-30 01-31 02-03 02-04 04-04 05-01 05-02 05-05 06-02 10-01 10-02 10-03 10-06 10-07 10-08',
+    2026: '01-01 01-02 02-16 02-17 02-18 02-19 02-20 02-23 04-06 05-01 05-04 05-05 06-19 09-25 10-01 10-02 10-05 10-06 10-07',
+}
 K_LABELS = ['D', 'W', 'M']
 K_MIN_LABELS = ['5', '15', '30', '60']
 K_TYPE = {'D': 'akdaily', 'W': 'akweekly', 'M': 'akmonthly'}
@@ -17,8 +37,40 @@ FQ_KEY = ['qfqday', 'hfqday', 'day']
 INDEX_LABELS = ['sh', 'sz', 'hs300', 'sz50', 'cyb', 'zxb', 'zx300', 'zh500']
 INDEX_LIST = {'sh': 'sh000001', 'sz': 'sz399001', 'hs300': 'sz399300',
               'sz50': 'sh000016', 'zxb': 'sz399005', 'cyb': 'sz399006', 'zx300': 'sz399008', 'zh500':'sh000905'}
+SH_CODE_PREFIX = ['5', '6', '9']
+CODE_PATTERN = r'(?<![\d-])(\d{1,6})(?!\d)'
+CODE_DIGITS = [100000, 10000, 1000, 100, 10, 1]
 P_TYPE = {'http': 'http://', 'ftp': 'ftp://'}
 PAGE_NUM = [40, 60, 80, 100]
+LATEST_PAGE_SIZE = 80
+POOL_SIZE = 16
+# 按URL前缀的连接池大小，与 RATE_LIMITS 的最大并发数一致，未列出的域名使用 POOL_SIZE
+POOL_SIZES = [('http://hq.sinajs.cn', 16), ('http://vip.stock.finance.sina.com.cn', 8),
+              ('http://market.finance.sina.com.cn', 8), ('http://money.finance.sina.com.cn', 8),
+              ('http://web.ifzq.gtimg.cn', 8), ('http://ifzq.gtimg.cn', 8), ('https://www.jisilu.cn', 2),
+              ('http://quotes.money.163.com', 4)]
+ASYNC_WORKERS = 64
+CACHE_TTL = [('hq.sinajs.cn', 1), ('getHQNodeData', 3), ('vMS_tradedetail', 3), ('getAllPageTime', 3),
+             ('mac/api', 86400), ('shibor.org', 86400), ('fpyg.html', 3600), ('EM_DataCenter', 3600),
+             ('jisilu.cn', 60), ('transHis.php', 86400)]
+CACHE_DEFAULT_TTL = 60
+RECORDER_MODES = ['record', 'replay']
+# 按域名限流：(域名后缀, 每秒请求数, 突发请求数, 最大并发数)，0为不限制
+RATE_LIMITS = [('sinajs.cn', 20, 40, 16), ('sina.com.cn', 10, 20, 8), ('gtimg.cn', 10, 20, 8),
+               ('eastmoney.com', 5, 10, 4), ('jisilu.cn', 2, 4, 2), ('163.com', 5, 10, 4)]
+RATE_LIMIT_DEFAULT = (5, 10, 4)
+# 重试退避（秒）：第n次重试前在 [pause, min(上限, 基数*2^n)] 内随机等待
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30
+# 视为可重试的HTTP状态码
+RETRY_STATUS = [429, 500, 502, 503, 504]
+# 按域名熔断：连续失败次数及熔断秒数
+CIRCUIT_FAILURES = 5
+CIRCUIT_COOLDOWN = 30
+METRICS_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+METRICS_NO_METHOD = 'other'
+CACHE_RANDOM_PARAMS = r'(?<=[/?&])(?:r|rn|rt|req|_)=[^&]*&?'
+CACHE_RANDOM_CALLBACK = r'(SINAREMOTECALLCALLBACK|jsonpCallback)\d+'
 FORMAT = lambda x: '%.2f' % x
 FORMAT4 = lambda x: '%.4f' % x
 INDEX_ETF_URL = 'https://www.jisilu.cn/jisiludata/etf.php?rp=25&page=%s'
@@ -96,6 +148,15 @@ INX_DAY_PRICE_COLUMNS = ['date', 'open', 'high', 'close', 'low', 'volume', 'pric
 LIVE_DATA_COLS = ['name', 'open', 'pre_close', 'price', 'high', 'low', 'bid', 'ask', 'volume', 'amount',
                   'b1_v', 'b1_p', 'b2_v', 'b2_p', 'b3_v', 'b3_p', 'b4_v', 'b4_p', 'b5_v', 'b5_p',
                   'a1_v', 'a1_p', 'a2_v', 'a2_p', 'a3_v', 'a3_p', 'a4_v', 'a4_p', 'a5_v', 'a5_p', 'date', 'time', 's']
+WATCH_COLS = ['price', 'volume', 'amount', 'bid', 'ask',
+              'b1_v', 'b1_p', 'b2_v', 'b2_p', 'b3_v', 'b3_p', 'b4_v', 'b4_p', 'b5_v', 'b5_p',
+              'a1_v', 'a1_p', 'a2_v', 'a2_p', 'a3_v', 'a3_p', 'a4_v', 'a4_p', 'a5_v', 'a5_p']
+TICK_OPEN_SECONDS = 9 * 3600 + 30 * 60
+TICK_PRICE_SCALE = 1000
+TICK_SIDES = {u'买盘': 1, u'卖盘': -1, u'中性盘': 0}
+TICK_STORE_COLS = [('time', 'int32'), ('price', 'int32'), ('volume', 'int64'), ('amount', 'int64'), ('side', 'int8')]
+TICK_JOB_MANIFEST = 'manifest.csv'
+TICK_JOB_COLS = ['code', 'date', 'status', 'rows', 'error']
 FOR_CLASSIFY_B_COLS = ['code','name']
 FOR_CLASSIFY_W_COLS = ['date','code', 'weight']
 FOR_CLASSIFY_W5_COLS = ['date','code', 'name', 'weight']
@@ -109,7 +170,8 @@ HISTORY_MIN_URL = 'http://ifzq.gtimg.cn/appstock/app/kline/mkline?param=%s,m%s,,
 DAY_PRICE_URL = '%sapi.finance.%s/%s/?code=%s&type=last'
 LIVE_DATA_URL = 'http://hq.sinajs.cn/rn=%s&list=%s'
 DAY_PRICE_MIN_URL = '%sapi.finance.%s/akmin?scode=%s&type=%s'
-LATEST_URL = 'http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/Market_Center.getHQNodeData?num=80&sort=code&asc=0&node=hs_a&symbol=&_s_r_a=page&page=%s'
+LATEST_COUNT_URL = 'http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/Market_Center.getHQNodeStockCount?node=hs_a'
+LATEST_URL = 'http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/Market_Center.getHQNodeData?num=%s&sort=code&asc=0&node=hs_a&symbol=&_s_r_a=page&page=%s'
 REPORT_URL = 'http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/mainindex/index.phtml?s_i=&s_a=&s_c=&reportdate=%s&quarter=%s&p=%s&num=%s'
 FORECAST_URL = 'http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/performance/index.phtml?s_i=&s_a=&s_c=&s_type=&reportdate=%s&quarter=%s&p=%s&num=%s'
 PROFIT_URL = 'http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/profit/index.phtml?s_i=&s_a=&s_c=&reportdate=%s&quarter=%s&p=%s&num=%s'
@@ -157,6 +219,11 @@ GETTING_TIPS = '[Progress:]'
 GETTING_FLAG = '#'
 DATA_INPUT_ERROR_MSG = 'date input error.'
 NETWORK_URL_ERROR_MSG = '获取失败，请检查网络和URL'
+RECORDER_MISSING_MSG = '回放模式下没有该URL的fixture：%s'
+RECORDER_MODE_ERR_MSG = '录制回放模式只能为 record 或 replay'
+CIRCUIT_OPEN_MSG = '%s 连续请求失败，暂停访问'
+RETRY_STATUS_MSG = 'HTTP %s：%s'
+ASYNC_UNSUPPORTED_MSG = '异步接口需要Python 3.7及以上版本'
 NETWORK_ERR_MSG = '获取失败，请检查网络和URL；或者您访问的过于频繁，被服务器拦截，请稍后再试'
 DATE_CHK_MSG = '年度输入错误：请输入1989年以后的年份数字，格式：YYYY'
 DATE_CHK_Q_MSG = '季度输入错误：请输入1、2、3或4数字'
@@ -165,6 +232,7 @@ LHB_MSG = '周期输入有误，请输入数字5、10、30或60'
 TOKEN_F_P = 'tk.csv'
 BOX_INPUT_ERR_MSG = '请输入YYYY-MM格式的年月数据'
 HOLIDAY_SERVE_ERR = '节假日查询服务出错'
+CALENDAR_UNCOVERED_MSG = '内置休市日表未覆盖%s年，交易日仅排除周末，请通过TradingCalendar.addHolidays补充'
 INDEX_SYMBOL = {"399990": "sz399990", "000006": "sh000006", "399998": "sz399998", 
                 "399436": "sz399436", "399678": "sz399678", "399804": "sz399804", 
                 "000104": "sh000104", "000070": "sh000070", "399613": "sz399613", 
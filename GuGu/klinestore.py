@@ -0,0 +1,112 @@
+# -*- coding:utf-8 -*-
+"""
+本地K线库
+Created on 2026/10/18
+@group : GuGu
+"""
+
+import os
+import tempfile
+import threading
+import pandas as pd
+
+try:
+    from importlib.util import find_spec
+    _PARQUET = find_spec('pyarrow') is not None
+except ImportError:
+    import imp
+    try:
+        _PARQUET = imp.find_module('pyarrow') is not None
+    except ImportError:
+        _PARQUET = False
+
+
+def _replace(src, dst):
+    """
+    原子地用src覆盖dst；py2没有os.replace，POSIX下os.rename本身即原子覆盖
+    """
+    if hasattr(os, 'replace'):
+        os.replace(src, dst)
+    elif os.name == 'nt' and os.path.exists(dst):
+        os.remove(dst)
+        os.rename(src, dst)
+    else:
+        os.rename(src, dst)
+
+
+class KlineStore():
+    """
+    按 ktype/autype/code 分区保存日、周、月K线，供StockData.history增量更新使用
+    安装pyarrow时使用Parquet格式，否则使用pickle格式
+    """
+    def __init__(self, path, fmt=None):
+        """
+        Parameters
+        ------
+            path: string
+                    本地存储目录
+            fmt: string
+                    存储格式 parquet 或 pickle，默认有pyarrow时为parquet
+        """
+        self.__path = path
+        self.__fmt = fmt if fmt is not None else ('parquet' if _PARQUET else 'pickle')
+        self.__lock = threading.Lock()
+
+
+    def read(self, code, ktype='D', autype='qfq'):
+        """
+        读取本地K线
+        return
+        ------
+            DataFrame or None 本地无数据时返回None
+        """
+        path = self.__file(code, ktype, autype)
+        if not os.path.exists(path):
+            return None
+
+        if self.__fmt == 'parquet':
+            return pd.read_parquet(path)
+        else:
+            return pd.read_pickle(path)
+
+
+    def write(self, code, ktype, autype, data):
+        """
+        保存K线，覆盖原有数据
+        """
+        path = self.__file(code, ktype, autype)
+        folder = os.path.dirname(path)
+        data = data.reset_index(drop=True)
+
+        with self.__lock:
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+
+        # 每次写入使用独立的临时文件，同一文件的并发写入互不覆盖，最后完成的一次生效
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=folder)
+        os.close(fd)
+        try:
+            if self.__fmt == 'parquet':
+                data.to_parquet(tmp, index=False)
+            else:
+                data.to_pickle(tmp)
+            _replace(tmp, path)
+        except Exception:
+            os.remove(tmp)
+            raise
+
+
+    def remove(self, code, ktype='D', autype='qfq'):
+        """
+        删除本地K线
+        """
+        path = self.__file(code, ktype, autype)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+    def __file(self, code, ktype, autype):
+        ext = 'parquet' if self.__fmt == 'parquet' else 'pkl'
+        autype = autype if autype else 'none'
+
+        return os.path.join(self.__path, ktype.upper(), autype, '%s.%s' % (code, ext))
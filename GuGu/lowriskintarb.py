@@ -46,7 +46,7 @@ class LowRiskIntArb(Base):
         self._data = pd.DataFrame()
         
         self._data = self.__parsePage(cf.RATING_FUNDA_URL, cf.RATING_FUNDA_COLS)
-        self._data[self._data=="-"] = np.NaN
+        self._data[self._data=="-"] = np.nan
         self._data['next_recalc_dt'] = self._data['next_recalc_dt'].map(self.__nextRecalcDt)
         for col in ['funda_current_price', 'funda_increase_rt', 'funda_volume', 'funda_value',
                     'funda_discount_rt', 'funda_coupon', 'funda_coupon_next', 'funda_profit_rt_next', 
@@ -108,7 +108,7 @@ class LowRiskIntArb(Base):
         self._data = pd.DataFrame()
         
         self._data = self.__parsePage(cf.RATING_FUNDB_URL, cf.RATING_FUNDB_COLS)
-        self._data[self._data=="-"] = np.NaN
+        self._data[self._data=="-"] = np.nan
         for col in ['coupon', 'manage_fee', 'funda_current_price', 'funda_upper_price', 'funda_lower_price',
                     'funda_increase_rt', 'fundb_current_price', 'fundb_upper_price', 'fundb_lower_price',
                     'fundb_increase_rt', 'fundb_volume', 'fundb_value', 'fundm_value', 'fundb_discount_rt',
@@ -150,7 +150,7 @@ class LowRiskIntArb(Base):
         self._data = pd.DataFrame()
         
         self._data = self.__parsePage(cf.RATING_FUNDM_URL, cf.RATING_FUNDM_COLS)
-        self._data[self._data=="-"] = np.NaN
+        self._data[self._data=="-"] = np.nan
         for col in ['manage_fee', 'lower_recalc_price', 'a_ratio', 'b_ratio', 'coupon', 'coupon_next',
                     'price', 'base_lower_recalc_rt']:
             self._data[col] = self._data[col].astype(float)
@@ -208,15 +208,37 @@ class LowRiskIntArb(Base):
         """
         self._data = pd.DataFrame()
         
-        self._data = self.__parsePage(cf.CON_BONDS_URL, cf.CON_BONDS_COLS)
-        self._data[self._data=="-"] = np.NaN
+        self._data = self.__conBonds(self.__parsePage(cf.CON_BONDS_URL, cf.CON_BONDS_COLS))
+            
+        return self._result()
+    
+    
+    def iterConBonds(self, retry=3, pause=0.001):
+        """
+        逐页获取可转债及其相关数据，内存占用不随页数增长
+        Parameters
+        ------
+            retry : int, 默认 3
+                        如遇网络等问题重复执行的次数
+            pause : int, 默认 0.001
+                        重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
+        return
+        ------
+        generator 每次产出一页 DataFrame or List，字段同conBonds
+        """
+        for rows in self.__iterPages(cf.CON_BONDS_URL, retry, pause):
+            yield self._page(self.__conBonds(pd.DataFrame(rows, columns=cf.CON_BONDS_COLS)))
+            
+            
+    def __conBonds(self, data):
+        data[data=="-"] = np.nan
         for col in ['convert_price', 'put_price', 'redeem_price', 'redeem_price_ratio', 'orig_iss_amt',
                     'curr_iss_amt', 'ration_rt', 'pb', 'sprice', 'sincrease_rt', 'convert_value', 'premium_rt',
                     'year_left', 'ytm_rt', 'ytm_rt_tax', 'price', 'increase_rt', 'volume', 'force_redeem_price',
                     'put_convert_price', 'convert_amt_ratio']:
-            self._data[col] = self._data[col].astype(float)
+            data[col] = data[col].astype(float)
             
-        return self._result()
+        return data
     
     
     def closedStockFund(self):
@@ -250,7 +272,7 @@ class LowRiskIntArb(Base):
         self._data = pd.DataFrame()
         
         self._data = self.__parsePage(cf.CLOSED_STOCK_FUND_URL, cf.CLOSED_STOCK_FUND_COLS)
-        self._data[self._data=="-"] = np.NaN
+        self._data[self._data=="-"] = np.nan
         for col in ['price', 'increase_rt', 'volume', 'net_value', 'realtime_estimate_value', 'discount_rt',
                     'left_year', 'annualize_dscnt_rt', 'quote_incr_rt', 'nav_incr_rt', 'spread', 'stock_ratio',
                     'daily_nav_incr_rt', 'daily_spread']:
@@ -287,7 +309,7 @@ class LowRiskIntArb(Base):
         self._data = pd.DataFrame()
         
         self._data = self.__parsePage(cf.CLOSED_BOND_FUND_URL, cf.CLOSED_BOND_FUND_COLS)
-        self._data[self._data=="-"] = np.NaN
+        self._data[self._data=="-"] = np.nan
         for col in ['left_year', 'est_val', 'discount_rt', 'annual_discount_rt', 'trade_price',
                     'increase_rt', 'volume', 'fund_nav', 'price_incr_rt', 'stock_ratio', 'bond_ratio']:
             self._data[col] = self._data[col].astype(float)
@@ -318,7 +340,7 @@ class LowRiskIntArb(Base):
         self._data = pd.DataFrame()
         
         self._data = self.__parsePage(cf.AH_RATIO_URL, cf.AH_RATIO_COLS)
-        self._data[self._data=="-"] = np.NaN
+        self._data[self._data=="-"] = np.nan
         for col in ['a_price', 'a_increase_rt', 'h_price', 'h_increase_rt', 'rmb_price',
                     'hk_currency', 'ha_ratio', 'h_free_shares', 'a_free_shares']:
             self._data[col] = self._data[col].astype(float)
@@ -361,7 +383,7 @@ class LowRiskIntArb(Base):
         self._data = pd.DataFrame()
         
         self._data = self.__parsePage(cf.DIVIDEND_RATE_URL, cf.DIVIDEND_RATE_COLS)
-        self._data[self._data=="-"] = np.NaN
+        self._data[self._data=="-"] = np.nan
         for col in ['dividend_rate', 'dividend_rate2', 'price', 'volume', 'increase_rt', 'pe', 'pb', 'total_value',
                     'eps_growth_ttm', 'roe', 'revenue_average', 'profit_average', 'roe_average', 'pb_temperature',
                     'pe_temperature', 'int_debt_rate', 'cashflow_average', 'dividend_rate_average', 'dividend_rate5']:
@@ -435,26 +457,23 @@ class LowRiskIntArb(Base):
         return self._result()
     
     
-    def __parsePage(self, url, column):            
-        page = 1
-        while(True):
-            try:
-                request = self._session.get(url % page)
-                text = request.text.replace('%', '')
-                dataDict = json.loads(text)
-                if dataDict['page'] < page:
-                    break
-                
-                dataList = []
-                for row in dataDict['rows']:
-                    dataList.append(row['cell'])
-                  
-                self._data = self._data.append(pd.DataFrame(dataList, columns = column), ignore_index=True)
-                
-                page += 1
-            except Exception as e:
-                print(str(e))
+    def __parsePage(self, url, column, retry=3, pause=0.001):
+        return self._collectPages(self.__iterPages(url, retry, pause), column)
+    
+    
+    def __iterPages(self, url, retry, pause):
+        """
+        逐页产出行数据列表，返回的页码小于请求页码时结束
+        """
+        def fetch(page):
+            request = self._session.get(url % page, timeout=10)
+            text = request.text.replace('%', '')
+            dataDict = json.loads(text)
+            if dataDict['page'] < page:
+                return None, None
             
-        return self._data
+            return [row['cell'] for row in dataDict['rows']], page + 1
+        
+        return self._iterPages(fetch, 1, retry, pause)
     
     
@@ -10,7 +10,7 @@ import pandas as pd
 import numpy as np
 import re
 import json
-import time
+from io import BytesIO
 from utility import Utility
 from base import Base, cf
 
@@ -48,7 +48,7 @@ class Macro(Base):
         datastr = datastr.replace('"', '').replace('null', '0')
         js = json.loads(datastr)
         self._data = pd.DataFrame(js, columns=cf.GDP_YEAR_COLS)
-        self._data[self._data==0] = np.NaN
+        self._data[self._data==0] = np.nan
         
         return self._result()
     
@@ -83,7 +83,7 @@ class Macro(Base):
         js = json.loads(datastr)
         self._data = pd.DataFrame(js, columns=cf.GDP_QUARTER_COLS)
         self._data['quarter'] = self._data['quarter'].astype(object)
-        self._data[self._data==0] = np.NaN
+        self._data[self._data==0] = np.nan
         
         return self._result()
     
@@ -115,7 +115,7 @@ class Macro(Base):
         datastr = datastr.replace('"','').replace('null','0')
         js = json.loads(datastr)
         self._data = pd.DataFrame(js,columns=cf.GDP_FOR_COLS)
-        self._data[self._data==0] = np.NaN
+        self._data[self._data==0] = np.nan
         
         return self._result()
         
@@ -147,7 +147,7 @@ class Macro(Base):
         datastr = datastr.replace('"', '').replace('null', '0')
         js = json.loads(datastr)
         self._data = pd.DataFrame(js, columns=cf.GDP_PULL_COLS)
-        self._data[self._data==0] = np.NaN
+        self._data[self._data==0] = np.nan
         
         return self._result()
     
@@ -179,7 +179,7 @@ class Macro(Base):
         datastr = datastr.replace('"', '').replace('null', '0')
         js = json.loads(datastr)
         self._data = pd.DataFrame(js, columns=cf.GDP_CONTRIB_COLS)
-        self._data[self._data==0] = np.NaN
+        self._data[self._data==0] = np.nan
         
         return self._result()
     
@@ -242,7 +242,7 @@ class Macro(Base):
         js = json.loads(datastr)
         self._data = pd.DataFrame(js, columns=cf.PPI_COLS)
         for i in self._data.columns:
-            self._data[i] = self._data[i].apply(lambda x:np.where(x is None, np.NaN, x))
+            self._data[i] = self._data[i].apply(lambda x:np.where(x is None, np.nan, x))
             if i != 'month':
                 self._data[i] = self._data[i].astype(float)
                 
@@ -419,25 +419,19 @@ class Macro(Base):
     
     
     def __parsePage(self, cate='', event=0, num=0, retry=3, pause=0.001):
-        for _ in range(retry):
-            time.sleep(pause)
-            
-            try:
-                rdInt = Utility.random()
-                request = self._session.get( cf.MACRO_URL % (rdInt, cate, event, num, rdInt), timeout=10 )
-                if self._PY3:
-                    request.encoding = 'gbk'
-                    
-                regSym = re.compile(r'\,count:(.*?)\}')
-                datastr = regSym.findall(request.text)
-                datastr = datastr[0]
-                datastr = datastr.split('data:')[1]
-            except Exception as e:
-                print(e)
-            else:
-                return datastr
+        def fetch():
+            rdInt = Utility.random()
+            request = self._session.get( cf.MACRO_URL % (rdInt, cate, event, num, rdInt), timeout=10 )
+            if self._PY3:
+                request.encoding = 'gbk'
+                
+            regSym = re.compile(r'\,count:(.*?)\}')
+            datastr = regSym.findall(request.text)
+            datastr = datastr[0]
             
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+            return datastr.split('data:')[1]
+        
+        return self._retry(fetch, retry, pause)
     
     
     def shibor(self, year=None):
@@ -566,16 +560,17 @@ class Macro(Base):
         
     def __parseExcel(self, year, datatype, lab, column):
         year = Utility.getYear() if year is None else year
-        lab = lab.encode('utf-8') if self._PY3 else lab
-        
-        try:
-            df = pd.read_excel( cf.SHIBOR_DATA_URL % (datatype, year, lab, year), skiprows=[0] )
-            df.columns = column
-            df['date'] = df['date'].map(lambda x: x.date())
-            df['date'] = df['date'].astype('datetime64[ns]')
-        except Exception as e:
-            print(e)
-        else:
-            return df
+        
+        def fetch():
+            request = self._session.get( cf.SHIBOR_DATA_URL % (datatype, year, lab, year), timeout=10 )
+            
+            return request.content
+        
+        df = pd.read_excel( BytesIO(self._retry(fetch)), skiprows=[0] )
+        df.columns = column
+        df['date'] = df['date'].map(lambda x: x.date())
+        df['date'] = df['date'].astype('datetime64[ns]')
+        
+        return df
         
         
@@ -8,11 +8,11 @@ Created on 2018/12/26
 """
 
 import pandas as pd
-from pandas.compat import StringIO
-import re
+from io import StringIO
 import json
 import numpy as np
-from base import Base, cf
+from base import Base, Collector, cf
+from utility import Utility
 
 
 class MarketData(Base):
@@ -48,16 +48,24 @@ class MarketData(Base):
         self._data['change'] = self._data['change'].map(cf.FORMAT)
         self._data['amount'] = self._data['amount'].map(cf.FORMAT4)
         self._data = self._data[cf.INDEX_COLS]
-        self._data['code'] = self._data['code'].map(lambda x:str(x).zfill(6))
+        self._data['code'] = Utility.codes(self._data['code'])
         self._data['change'] = self._data['change'].astype(float)
         self._data['amount'] = self._data['amount'].astype(float)
         
         return self._result()
     
     
-    def latest(self):
+    def latest(self, retry=3, pause=0.001, workers=8):
         """
         一次性获取最近一个日交易日所有股票的交易数据
+        Parameters
+        ------
+            retry : int, 默认 3
+                    如遇网络等问题重复执行的次数
+            pause : int, 默认 0
+                    重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
+            workers : int, 默认 8
+                    并发抓取分页的线程数
         return
         -------
           DataFrame or list: [{'code':, 'name':, ...}, ...]
@@ -67,49 +75,73 @@ class MarketData(Base):
         
         self._writeHead()
         
-        self._data = self.__handleLatest(1)
-        if self._data is not None:
-            for i in range(2, cf.PAGE_NUM[0]):
-                newData = self.__handleLatest(i)
-                self._data = self._data.append(newData, ignore_index=True)
+        columns = [col for col in cf.DAY_TRADING_COLUMNS if col != 'symbol']
+        dataArr = Collector(columns)
+        pages = self.__latestPages(retry, pause)
+        for rows in self._mapPages(lambda pageNum: self.__handleLatest(pageNum, columns, retry, pause), range(1, pages+1), workers):
+            dataArr.add(rows)
+        
+        data = dataArr.result().drop_duplicates('code')
+        for col in columns[2:]:
+            data[col] = pd.to_numeric(data[col], errors='coerce')
+        self._data = data
         
         return self._result()
     
     
-    def __handleLatest(self, pageNum=1):
+    def __latestPages(self, retry, pause):
         """
-        处理当日行情分页数据，格式为json
+        获取当日行情分页数，获取失败时抛出异常，不按固定页数抓取以免静默截断结果
+        """
+        def fetch():
+            # http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/Market_Center.getHQNodeStockCount?node=hs_a
+            request = self._session.get( cf.LATEST_COUNT_URL, timeout=10 )
+            
+            return int(Utility.str2Dict(request.text))
+        
+        count = self._retry(fetch, retry, pause)
+        
+        return max(1, (count + cf.LATEST_PAGE_SIZE - 1) // cf.LATEST_PAGE_SIZE)
+    
+    
+    def __handleLatest(self, pageNum, columns, retry, pause):
+        """
+        处理当日行情分页数据，格式为JS对象数组
         Parameters
         ------
             pageNum:页码
+            columns:返回的字段
         return
         -------
-            DataFrame 当日所有股票交易数据(DataFrame)
+            list 当日股票交易数据行，无数据时返回None
         """
         self._writeConsole()
-        # http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/Market_Center.getHQNodeData?num=80&sort=code&asc=0&node=hs_a&symbol=&_s_r_a=page&page=1
-        request = self._session.get( cf.LATEST_URL % pageNum, timeout=10 )
-        if self._PY3:
-            request.encoding = 'gbk'
-        text = request.text
-        if text == 'null':
-            return None
         
-        reg = re.compile(r'\,(.*?)\:')
-        text = reg.sub(r',"\1":', text)
-        text = text.replace('"{symbol', '{"symbol')
-        text = text.replace('{symbol', '{"symbol"')
-        jstr = json.dumps(text)
-        js = json.loads(jstr)
-        df = pd.DataFrame(pd.read_json(js, dtype={'code':object}), columns=cf.DAY_TRADING_COLUMNS)
-        df = df.drop('symbol', axis=1)
-
-        return df
+        def fetch():
+            # http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/Market_Center.getHQNodeData?num=80&sort=code&asc=0&node=hs_a&symbol=&_s_r_a=page&page=1
+            request = self._session.get( cf.LATEST_URL % (cf.LATEST_PAGE_SIZE, pageNum), timeout=10 )
+            if self._PY3:
+                request.encoding = 'gbk'
+            text = request.text
+            if text.strip() in ('null', '', '[]'):
+                return None
+            
+            items = Utility.str2Dict(text)
+            
+            return [[item.get(col) for col in columns] for item in items]
+        
+        return self._retry(fetch, retry, pause)
     
     
-    def indexETF(self):
+    def indexETF(self, retry=3, pause=0.001):
         """
         获取指数ETF及其相关数据
+        Parameters
+        ------
+            retry : int, 默认 3
+                        如遇网络等问题重复执行的次数
+            pause : int, 默认 0.001
+                        重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
         return
         ------
         DataFrame or List: [{'fund_id':, 'fund_nm':, ...}, ...]
@@ -134,25 +166,17 @@ class MarketData(Base):
         """
         self._data = pd.DataFrame()
         
-        page = 1
-        while(True):
-            try:
-                request = self._session.get( cf.INDEX_ETF_URL % page )
-                text = request.text.replace('%', '')
-                dataDict = json.loads(text)
-                if dataDict['page'] < page:
-                    break
-                
-                dataList = []
-                for row in dataDict['rows']:
-                    dataList.append(row['cell'])            
-                self._data = self._data.append(pd.DataFrame(dataList, columns = cf.INDEX_ETF_COLS), ignore_index=True)
-                
-                page += 1
-            except Exception as e:
-                print(str(e))
+        def fetch(page):
+            request = self._session.get( cf.INDEX_ETF_URL % page, timeout=10 )
+            text = request.text.replace('%', '')
+            dataDict = json.loads(text)
+            if dataDict['page'] < page:
+                return None, None
+            
+            return [row['cell'] for row in dataDict['rows']], page + 1
         
-        self._data[self._data=="-"] = np.NaN
+        self._data = self._collectPages(self._iterPages(fetch, 1, retry, pause), cf.INDEX_ETF_COLS)
+        self._data[self._data=="-"] = np.nan
         for col in ['creation_unit', 'amount', 'unit_total', 'unit_incr', 'price', 'volume', 'increase_rt',
                     'estimate_value', 'discount_rt', 'fund_nav', 'index_increase_rt', 'pe', 'pb']:
             self._data[col] = self._data[col].astype(float)
@@ -0,0 +1,216 @@
+# -*- coding:utf-8 -*-
+"""
+请求与调用统计类
+Created on 2026/10/18
+@group : GuGu
+"""
+
+import re
+import threading
+import config as cf
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+
+def _families():
+    """
+    由config中的 *_URL 模板生成URL类别的匹配规则（模板按占位符拆分的字面部分），字面部分较长的模板优先
+    """
+    families = []
+    for name in dir(cf):
+        template = getattr(cf, name)
+        if name.endswith('_URL') and isinstance(template, str):
+            parts = re.split(r'%[sd]', template)
+            families.append((len(''.join(parts)), name, parts))
+
+    return [(name, parts) for _, name, parts in sorted(families, key=lambda item: -item[0])]
+
+
+def _match(url, parts):
+    """
+    URL是否由模板生成：首尾字面部分对齐，中间部分依次出现，线性时间
+    """
+    if len(parts) == 1:
+        return url == parts[0]
+
+    if not url.startswith(parts[0]) or not url.endswith(parts[-1]):
+        return False
+
+    pos = len(parts[0])
+    end = len(url) - len(parts[-1])
+    for part in parts[1:-1]:
+        pos = url.find(part, pos, end)
+        if pos < 0:
+            return False
+        pos += len(part)
+
+    return pos <= end
+
+
+_FAMILIES = _families()
+
+
+class Metrics():
+    """
+    按公共方法及URL类别统计：请求数、字节数、延迟分布、重试、错误、解析耗时及返回行数
+    通过 Base.setMetrics 启用，可导出为dict或Prometheus文本格式
+    """
+    def __init__(self, buckets=None):
+        """
+        Parameters
+        ------
+            buckets: list
+                    延迟分布的区间上限（秒），默认 cf.METRICS_BUCKETS
+        """
+        self.__buckets = sorted(buckets or cf.METRICS_BUCKETS)
+        self.__lock = threading.Lock()
+        self.reset()
+
+
+    @staticmethod
+    def family(url):
+        """
+        获取URL所属类别：匹配的config模板名，未匹配时为域名
+        """
+        for name, parts in _FAMILIES:
+            if _match(url, parts):
+                return name
+
+        return urlparse(url).netloc
+
+
+    def observeRequest(self, method, url, seconds, size=0, error=False, retries=0):
+        """
+        记录一次网络请求
+        Parameters
+        ------
+            method: string 发起请求的公共方法 e.g. StockData.history
+            url: string
+            seconds: float 耗时
+            size: int 响应字节数
+            error: bool 是否失败
+            retries: int 重试次数
+        """
+        key = (method, self.family(url))
+
+        with self.__lock:
+            stat = self.__requests.get(key)
+            if stat is None:
+                stat = {'requests': 0, 'bytes': 0, 'errors': 0, 'retries': 0, 'seconds': 0.0,
+                        'buckets': [0] * len(self.__buckets)}
+                self.__requests[key] = stat
+
+            stat['requests'] += 1
+            stat['bytes'] += size
+            stat['errors'] += 1 if error else 0
+            stat['retries'] += retries
+            stat['seconds'] += seconds
+            for i, bound in enumerate(self.__buckets):
+                if seconds <= bound:
+                    stat['buckets'][i] += 1
+
+
+    def observeCall(self, method, seconds, parse, rows=0, error=False):
+        """
+        记录一次公共方法调用
+        Parameters
+        ------
+            method: string 公共方法 e.g. StockData.history
+            seconds: float 总耗时
+            parse: float 网络请求以外的耗时（解析、组装），并发抓取时为各线程合计
+            rows: int 返回行数
+            error: bool 是否失败
+        """
+        with self.__lock:
+            stat = self.__calls.get(method)
+            if stat is None:
+                stat = {'calls': 0, 'errors': 0, 'seconds': 0.0, 'parse_seconds': 0.0, 'rows': 0}
+                self.__calls[method] = stat
+
+            stat['calls'] += 1
+            stat['errors'] += 1 if error else 0
+            stat['seconds'] += seconds
+            stat['parse_seconds'] += parse
+            stat['rows'] += rows
+
+
+    def reset(self):
+        """
+        清空统计
+        """
+        with self.__lock:
+            self.__requests = {}
+            self.__calls = {}
+
+
+    def toDict(self):
+        """
+        导出统计
+        return
+        ------
+            dict {方法: {'calls':, 'errors':, 'seconds':, 'parse_seconds':, 'rows':,
+                         'families': {URL类别: {'requests':, 'bytes':, 'errors':, 'retries':, 'seconds':,
+                                                'latency': {区间上限: 累计请求数}}}}}
+        """
+        result = {}
+
+        with self.__lock:
+            for method, stat in self.__calls.items():
+                result[method] = dict(stat, families={})
+
+            for (method, family), stat in self.__requests.items():
+                item = result.setdefault(method, {'calls': 0, 'errors': 0, 'seconds': 0.0, 'parse_seconds': 0.0,
+                                                  'rows': 0, 'families': {}})
+                data = dict((k, v) for k, v in stat.items() if k != 'buckets')
+                data['latency'] = dict(zip(self.__buckets, stat['buckets']))
+                item['families'][family] = data
+
+        return result
+
+
+    def toPrometheus(self, prefix='gugu'):
+        """
+        导出为Prometheus文本格式
+        """
+        lines = []
+        metrics = self.toDict()
+
+        def add(name, kind, helpText, samples):
+            lines.append('# HELP %s_%s %s' % (prefix, name, helpText))
+            lines.append('# TYPE %s_%s %s' % (prefix, name, kind))
+            for labels, value in samples:
+                label = ','.join(['%s="%s"' % (k, str(v).replace('"', '\\"')) for k, v in labels])
+                lines.append('%s_%s{%s} %s' % (prefix, name, label, value))
+
+        calls = sorted(metrics.items())
+        add('calls_total', 'counter', 'Public method calls', [([('method', m)], s['calls']) for m, s in calls])
+        add('call_errors_total', 'counter', 'Public method calls that raised', [([('method', m)], s['errors']) for m, s in calls])
+        add('call_seconds_total', 'counter', 'Wall time spent in public methods', [([('method', m)], s['seconds']) for m, s in calls])
+        add('parse_seconds_total', 'counter', 'Time spent outside network requests', [([('method', m)], s['parse_seconds']) for m, s in calls])
+        add('rows_total', 'counter', 'Rows returned by public methods', [([('method', m)], s['rows']) for m, s in calls])
+
+        families = [(m, f, s) for m, item in calls for f, s in sorted(item['families'].items())]
+        for name, key, helpText in [('requests_total', 'requests', 'HTTP requests'),
+                                    ('response_bytes_total', 'bytes', 'Response body bytes'),
+                                    ('request_errors_total', 'errors', 'HTTP requests that failed'),
+                                    ('request_retries_total', 'retries', 'Repeated requests for the same URL')]:
+            add(name, 'counter', helpText, [([('method', m), ('family', f)], s[key]) for m, f, s in families])
+
+        samples = []
+        for m, f, s in families:
+            for bound in self.__buckets:
+                samples.append(([('method', m), ('family', f), ('le', bound)], s['latency'][bound]))
+            samples.append(([('method', m), ('family', f), ('le', '+Inf')], s['requests']))
+        lines.append('# HELP %s_request_seconds HTTP request latency' % prefix)
+        lines.append('# TYPE %s_request_seconds histogram' % prefix)
+        for labels, value in samples:
+            label = ','.join(['%s="%s"' % (k, v) for k, v in labels])
+            lines.append('%s_request_seconds_bucket{%s} %s' % (prefix, label, value))
+        for m, f, s in families:
+            lines.append('%s_request_seconds_sum{method="%s",family="%s"} %s' % (prefix, m, f, s['seconds']))
+            lines.append('%s_request_seconds_count{method="%s",family="%s"} %s' % (prefix, m, f, s['requests']))
+
+        return '\n'.join(lines) + '\n'
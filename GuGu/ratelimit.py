@@ -0,0 +1,120 @@
+# -*- coding:utf-8 -*-
+"""
+按域名限流类
+Created on 2026/10/18
+@group : GuGu
+"""
+
+import time
+import threading
+import config as cf
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+
+class _Bucket():
+    """
+    令牌桶及并发数限制
+    """
+    def __init__(self, rate, burst, concurrency):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.concurrency = concurrency
+        self.__tokens = float(self.burst)
+        self.__stamp = time.time()
+        self.__inflight = 0
+        self.__cond = threading.Condition()
+
+
+    def acquire(self):
+        with self.__cond:
+            while True:
+                now = time.time()
+                if self.rate > 0:
+                    self.__tokens = min(self.burst, self.__tokens + (now - self.__stamp) * self.rate)
+                self.__stamp = now
+
+                free = self.concurrency <= 0 or self.__inflight < self.concurrency
+                if free and (self.rate <= 0 or self.__tokens >= 1):
+                    if self.rate > 0:
+                        self.__tokens -= 1
+                    self.__inflight += 1
+                    return
+
+                # 缺令牌时等到下一个令牌生成，并发已满时等待释放
+                self.__cond.wait((1 - self.__tokens) / self.rate if free else None)
+
+
+    def release(self):
+        with self.__cond:
+            self.__inflight -= 1
+            # 等待者可能是在等令牌而非并发额度，只唤醒一个时真正等额度的线程会一直阻塞，因此全部唤醒后各自重新检查
+            self.__cond.notify_all()
+
+
+class RateLimiter():
+    """
+    按域名的令牌桶限流及并发数限制，通过 Base.setRateLimiter 作用于所有对象的实际网络请求
+    缓存命中及回放的响应不占用额度
+    """
+    def __init__(self, rules=None, default=None):
+        """
+        Parameters
+        ------
+            rules: list
+                    [(域名后缀, 每秒请求数, 突发请求数, 最大并发数), ...]，优先于 cf.RATE_LIMITS，
+                    每秒请求数或最大并发数为0时不限制
+            default: tuple
+                    未匹配任何域名时的 (每秒请求数, 突发请求数, 最大并发数)，默认 cf.RATE_LIMIT_DEFAULT
+        """
+        self.__rules = list(rules or []) + cf.RATE_LIMITS
+        self.__default = default or cf.RATE_LIMIT_DEFAULT
+        self.__buckets = {}
+        self.__lock = threading.Lock()
+
+
+    def acquire(self, url):
+        """
+        等待URL所属域名的请求额度
+        return
+        ------
+            额度标识，请求结束后传给 release
+        """
+        bucket = self.__bucket(urlparse(url).hostname or '')
+        bucket.acquire()
+
+        return bucket
+
+
+    def release(self, bucket):
+        """
+        释放并发额度
+        """
+        bucket.release()
+
+
+    def __bucket(self, host):
+        bucket = self.__buckets.get(host)
+        if bucket is not None:
+            return bucket
+
+        with self.__lock:
+            for suffix, rate, burst, concurrency in self.__rules:
+                if host == suffix or host.endswith('.' + suffix):
+                    key = suffix
+                    break
+            else:
+                key = host
+                rate, burst, concurrency = self.__default
+
+            # 同一规则下的子域名共用一个令牌桶
+            bucket = self.__buckets.get(key)
+            if bucket is None:
+                bucket = _Bucket(rate, burst, concurrency)
+                self.__buckets[key] = bucket
+            self.__buckets[host] = bucket
+
+        return bucket
@@ -0,0 +1,171 @@
+# -*- coding:utf-8 -*-
+"""
+网络响应录制回放类
+Created on 2026/10/18
+@group : GuGu
+"""
+
+import os
+import pickle
+import hashlib
+import threading
+import config as cf
+from cache import Cache, _dump
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+
+class Recorder():
+    """
+    录制与回放接口响应，通过 Base.setRecorder 挂到所有会话的传输适配器上
+        record: 正常请求网络并把响应保存为fixture文件
+        replay: 只从fixture文件返回响应，不访问网络，缺少fixture时请求失败
+    以去掉随机参数后的URL（同 Cache.key）为键，每个响应保存为 path/md5(key).fixture
+    """
+    def __init__(self, path, mode='replay'):
+        """
+        Parameters
+        ------
+            path: string
+                    fixture目录
+            mode: string
+                    record 或 replay，默认 replay
+        """
+        if mode not in cf.RECORDER_MODES:
+            raise TypeError(cf.RECORDER_MODE_ERR_MSG)
+
+        self.mode = mode
+        self.__path = path
+
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+
+    def load(self, url):
+        """
+        读取URL对应的响应
+        return
+        ------
+            tuple (status, headers, content) or None
+        """
+        try:
+            with open(self.__file(url), 'rb') as f:
+                item = pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        return item['status'], item['headers'], item['content']
+
+
+    def save(self, url, content, status=200, headers=None):
+        """
+        保存响应，也可用于手工构造fixture
+        Parameters
+        ------
+            url: string
+            content: bytes or string 响应内容，字符串按utf-8编码
+            status: int, 默认 200
+            headers: dict
+        """
+        if not isinstance(content, bytes):
+            content = content.encode('utf-8')
+
+        item = {'url': Cache.key(url), 'status': status, 'headers': dict(headers or {}), 'content': content}
+        _dump(item, self.__file(url))
+
+
+    def urls(self):
+        """
+        获取已录制的URL（已去掉随机参数）
+        """
+        urls = []
+        for name in sorted(os.listdir(self.__path)):
+            if name.endswith('.fixture'):
+                with open(os.path.join(self.__path, name), 'rb') as f:
+                    urls.append(pickle.load(f)['url'])
+
+        return urls
+
+
+    def __file(self, url):
+        name = hashlib.md5(Cache.key(url).encode('utf-8')).hexdigest()
+
+        return os.path.join(self.__path, '%s.fixture' % name)
+
+
+class _ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FixtureServer():
+    """
+    本地桩服务器：以HTTP代理方式返回Recorder中的fixture，不访问网络
+    设置环境变量 http_proxy 为 start() 返回的地址后，所有http接口的请求都由桩服务器应答，
+    https接口（如集思录）请使用 Base.setRecorder 回放
+    """
+    def __init__(self, recorder, host='127.0.0.1', port=0):
+        """
+        Parameters
+        ------
+            recorder: Recorder
+            host: string 监听地址，默认 127.0.0.1
+            port: int 监听端口，默认 0 为随机端口
+        """
+        self.__recorder = recorder
+        self.__address = (host, port)
+        self.__server = None
+
+
+    def start(self):
+        """
+        在后台线程启动服务
+        return
+        ------
+            string 代理地址 e.g. http://127.0.0.1:8080
+        """
+        recorder = self.__recorder
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = self.path
+                if not url.startswith('http'):
+                    url = 'http://%s%s' % (self.headers.get('Host', ''), self.path)
+
+                hit = recorder.load(url)
+                if hit is None:
+                    self.send_error(404)
+                    return
+
+                status, headers, content = hit
+                self.send_response(status)
+                for name, value in headers.items():
+                    if name.lower() not in ('content-length', 'transfer-encoding', 'content-encoding', 'connection'):
+                        self.send_header(name, value)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.__server = _ThreadingServer(self.__address, Handler)
+        thread = threading.Thread(target=self.__server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        return 'http://%s:%s' % self.__server.server_address[:2]
+
+
+    def stop(self):
+        """
+        停止服务
+        """
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
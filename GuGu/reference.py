@@ -10,15 +10,11 @@ Created on 2019/01/03
 from __future__ import division
 
 import math
-import time
 import pandas as pd
-from pandas.compat import StringIO
-import lxml.html
-from lxml import etree
 import re
 import json
 from utility import Utility
-from base import Base, cf
+from base import Base, Collector, cf
 
 class Reference(Base):
     def distriPlan(self, year=2015, top=25, retry=3, pause=0.001):
@@ -48,9 +44,12 @@ class Reference(Base):
         if top == 'all':
             self._writeHead()
             
-            self._data, pages = self.__handleDistriPlan(year, 0, retry, pause)
+            df, pages = self.__handleDistriPlan(year, 0, retry, pause)
+            dataArr = Collector()
+            dataArr.add(df)
             for i in range(1, int(pages)):
-                self._data = self._data.append(self.__handleDistriPlan(year, i, retry, pause), ignore_index=True)
+                dataArr.add(self.__handleDistriPlan(year, i, retry, pause))
+            self._data = dataArr.result()
                 
             return self._result()
         elif top <= 25:
@@ -63,12 +62,14 @@ class Reference(Base):
                 self._writeHead()
                 
                 allPages = int(math.ceil(top/25))
-                self._data, pages = self.__handleDistriPlan(year, 0, retry, pause)
+                df, pages = self.__handleDistriPlan(year, 0, retry, pause)
                 pages = min(allPages, int(pages))
+                dataArr = Collector()
+                dataArr.add(df)
                 for i in range(1, pages):
-                    self._data = self._data.append(self.__handleDistriPlan(year, i, retry, pause), ignore_index=True)
+                    dataArr.add(self.__handleDistriPlan(year, i, retry, pause))
                 
-                self._data = self._data.head(top)
+                self._data = dataArr.result().head(top)
                 
                 return self._result()
             else:
@@ -76,45 +77,34 @@ class Reference(Base):
     
     
     def __handleDistriPlan(self, year, pageNo, retry, pause):
-        for _ in range(retry):
-            time.sleep(pause)
+        if pageNo > 0:
+            self._writeConsole()
             
-            try:
-                if pageNo > 0:
-                    self._writeConsole()
+        def fetch():
+            # http://quotes.money.163.com/data/caibao/fpyg.html?reportdate=2018&sort=declaredate&order=desc&page=0
+            html = self._getHtml(cf.DP_163_URL % (year, pageNo))
+            res = html.xpath('//table[@class=\"fn_cm_table\"]/tr')
+            df = self._parseTable(res)
+            df = df.drop(0, axis=1)
+            df.columns = cf.DP_163_COLS
+            df['divi'] = df['plan'].map(self.__bonus)
+            df['shares'] = df['plan'].map(self.__gift)
+            df = df.drop('plan', axis=1)
+            df['code'] = df['code'].astype(object)
+            df['code'] = Utility.codes(df['code'])
+            pages = []
+            if pageNo == 0:
+                page = html.xpath('//div[@class=\"mod_pages\"]/a')
+                if len(page)>1:
+                    asr = page[len(page)-2]
+                    pages = asr.xpath('text()')
                     
-                # http://quotes.money.163.com/data/caibao/fpyg.html?reportdate=2018&sort=declaredate&order=desc&page=0
-                html = lxml.html.parse(cf.DP_163_URL % (year, pageNo))  
-                res = html.xpath('//table[@class=\"fn_cm_table\"]/tr')
-                if self._PY3:
-                    sarr = [etree.tostring(node).decode('utf-8') for node in res]
-                else:
-                    sarr = [etree.tostring(node) for node in res]
-                sarr = ''.join(sarr)
-                sarr = '<table>%s</table>' % sarr
-                df = pd.read_html(sarr)[0]
-                df = df.drop(0, axis=1)
-                df.columns = cf.DP_163_COLS
-                df['divi'] = df['plan'].map(self.__bonus)
-                df['shares'] = df['plan'].map(self.__gift)
-                df = df.drop('plan', axis=1)
-                df['code'] = df['code'].astype(object)
-                df['code'] = df['code'].map(lambda x : str(x).zfill(6))
-                pages = []
-                if pageNo == 0:
-                    page = html.xpath('//div[@class=\"mod_pages\"]/a')
-                    if len(page)>1:
-                        asr = page[len(page)-2]
-                        pages = asr.xpath('text()')
-            except Exception as e:
-                print(e)
+            if pageNo == 0:
+                return df, pages[0] if len(pages)>0 else 0
             else:
-                if pageNo == 0:
-                    return df, pages[0] if len(pages)>0 else 0
-                else:
-                    return df
-                
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+                return df
+            
+        return self._retry(fetch, retry, pause)
     
     
     def __bonus(self, x):
@@ -186,46 +176,27 @@ class Reference(Base):
         
         if Utility.checkQuarter(year, quarter) is True:
             self._writeHead()
-            self._data =  self.__handleForecast(year, quarter, 1, pd.DataFrame(), retry, pause)
-            self._data = pd.DataFrame(self._data, columns=cf.FORECAST_COLS)
-            self._data['code'] = self._data['code'].map(lambda x: str(x).zfill(6))
+            self._data = self._collectPages(self.__iterForecast(year, quarter, retry, pause), cf.FORECAST_COLS)
+            self._data['code'] = Utility.codes(self._data['code'])
             
             return self._result()
         
         
-    def __handleForecast(self, year, quarter, pageNo, dataArr, retry, pause):
-        self._writeConsole()
-        
-        for _ in range(retry):
-            time.sleep(pause)
+    def __iterForecast(self, year, quarter, retry, pause):
+        def fetch(pageNo):
+            # http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/performance/index.phtml?s_i=&s_a=&s_c=&s_type=&reportdate=2018&quarter=3&p=1&num=60
+            html = self._getHtml(cf.FORECAST_URL%( year, quarter, pageNo, cf.PAGE_NUM[1]), 'gbk', [('--', '')])
+            res = html.xpath("//table[@class=\"list_table\"]/tr")
+            df = self._parseTable(res)
+            if len(df) == 0:
+                return None, None
+            df = df.drop([4, 5, 8], axis=1)
+            df.columns = cf.FORECAST_COLS
+            nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
             
-            try:
-                # http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/performance/index.phtml?s_i=&s_a=&s_c=&s_type=&reportdate=2018&quarter=3&p=1&num=60
-                request = self._session.get( cf.FORECAST_URL%( year, quarter, pageNo, cf.PAGE_NUM[1]), timeout=10 )
-                request.encoding = 'gbk'
-                text = request.text.replace('--', '')
-                html = lxml.html.parse(StringIO(text))
-                res = html.xpath("//table[@class=\"list_table\"]/tr")
-                if self._PY3:
-                    sarr = [etree.tostring(node).decode('utf-8') for node in res]
-                else:
-                    sarr = [etree.tostring(node) for node in res]
-                sarr = ''.join(sarr)
-                sarr = '<table>%s</table>'%sarr
-                df = pd.read_html(sarr)[0]
-                df = df.drop([4, 5, 8], axis=1)
-                df.columns = cf.FORECAST_COLS
-                dataArr = dataArr.append(df, ignore_index=True)
-                nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-                if len(nextPage)>0:
-                    pageNo = re.findall(r'\d+',nextPage[0])[0]
-                    return self.__handleForecast(year, quarter, pageNo, dataArr, retry, pause)
-                else:
-                    return dataArr
-            except Exception as e:
-                    print(e)
-                    
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+            return df, (re.findall(r'\d+',nextPage[0])[0] if len(nextPage)>0 else None)
+        
+        return self._iterPages(fetch, 1, retry, pause)
     
     
     def restrictedLift(self, year=None, month=None, retry=3, pause=0.001):
@@ -254,35 +225,30 @@ class Reference(Base):
         year = Utility.getYear() if year is None else year
         month = Utility.getMonth() if month is None else month
         
-        for _ in range(retry):
-            time.sleep(pause)
-            
-            try:
-                # http://datainterface.eastmoney.com/EM_DataCenter/JS.aspx?type=FD&sty=BST&st=3&sr=true&fd=2019&stat=1
-                request = self._session.get( cf.RL_URL % (year, month), timeout = 10 )
-                if self._PY3:
-                    request.encoding = 'utf-8'
-                lines = request.text
-            except Exception as e:
-                print(e)
-            else:
-                da = lines[3:len(lines)-3]
-                list =  []
-                for row in da.split('","'):
-                    list.append([data for data in row.split(',')])
-                self._data = pd.DataFrame(list)
-                self._data = self._data[[1, 3, 4, 5, 6]]
-                for col in [5, 6]:
-                    self._data[col] = self._data[col].astype(float)
-                self._data[5] = self._data[5]/10000
-                self._data[6] = self._data[6]*100
-                self._data[5] = self._data[5].map(cf.FORMAT)
-                self._data[6] = self._data[6].map(cf.FORMAT)
-                self._data.columns = cf.RL_COLS
+        def fetch():
+            # http://datainterface.eastmoney.com/EM_DataCenter/JS.aspx?type=FD&sty=BST&st=3&sr=true&fd=2019&stat=1
+            request = self._session.get( cf.RL_URL % (year, month), timeout = 10 )
+            if self._PY3:
+                request.encoding = 'utf-8'
                 
-                return self._result()
-            
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+            return request.text
+        
+        lines = self._retry(fetch, retry, pause)
+        da = lines[3:len(lines)-3]
+        list =  []
+        for row in da.split('","'):
+            list.append([data for data in row.split(',')])
+        self._data = pd.DataFrame(list)
+        self._data = self._data[[1, 3, 4, 5, 6]]
+        for col in [5, 6]:
+            self._data[col] = self._data[col].astype(float)
+        self._data[5] = self._data[5]/10000
+        self._data[6] = self._data[6]*100
+        self._data[5] = self._data[5].map(cf.FORMAT)
+        self._data[6] = self._data[6].map(cf.FORMAT)
+        self._data.columns = cf.RL_COLS
+        
+        return self._result()
 
 
     def fundHoldings(self, year, quarter, retry=3, pause=0.001):
@@ -321,51 +287,51 @@ class Reference(Base):
 
         self._writeHead()
 
-        self._data, pages = self.__handleFoundHoldings(start, end, 0, retry, pause)
+        df, pages = self.__handleFoundHoldings(start, end, 0, retry, pause)
+        dataArr = Collector()
+        dataArr.add(df)
         for idx in range(1, pages):
-            self._data = self._data.append(self.__handleFoundHoldings(start, end, idx, retry, pause), ignore_index=True)
+            dataArr.add(self.__handleFoundHoldings(start, end, idx, retry, pause))
+        self._data = dataArr.result()
 
         return self._result()
 
 
     def __handleFoundHoldings(self, start, end, pageNo, retry, pause):
-        for _ in range(retry):
-            time.sleep(pause)
-            if pageNo>0:
-                    self._writeConsole()
-            try:
-                # http://quotes.money.163.com/hs/marketdata/service/jjcgph.php?host=/hs/marketdata/service/jjcgph.php&page=0&query=start:2018-06-30;end:2018-09-30&order=desc&count=60&type=query&req=73259
-                request = self._session.get( cf.FUND_HOLDS_URL % (pageNo, start, end, Utility.random(5)), timeout=10 )
-                if self._PY3:
-                    request.encoding = 'utf-8'
-                lines = request.text
-                lines = lines.replace('--', '0')
-                lines = json.loads(lines)
-                data = lines['list']
-                df = pd.DataFrame(data)
-                df = df.drop(['CODE', 'ESYMBOL', 'EXCHANGE', 'NAME', 'RN', 'SHANGQIGUSHU', 'SHANGQISHIZHI', 'SHANGQISHULIANG'], axis=1)
-                for col in ['GUSHU', 'GUSHUBIJIAO', 'SHIZHI', 'SCSTC27']:
-                    df[col] = df[col].astype(float)
-                df['SCSTC27'] = df['SCSTC27']*100
-                df['GUSHU'] = df['GUSHU']/10000
-                df['GUSHUBIJIAO'] = df['GUSHUBIJIAO']/10000
-                df['SHIZHI'] = df['SHIZHI']/10000
-                df['GUSHU'] = df['GUSHU'].map(cf.FORMAT)
-                df['GUSHUBIJIAO'] = df['GUSHUBIJIAO'].map(cf.FORMAT)
-                df['SHIZHI'] = df['SHIZHI'].map(cf.FORMAT)
-                df['SCSTC27'] = df['SCSTC27'].map(cf.FORMAT)
-                df.columns = cf.FUND_HOLDS_COLS
-                df = df[['code', 'name', 'date', 'nums', 'nlast', 'count', 
-                            'clast', 'amount', 'ratio']]
-            except Exception as e:
-                print(e)
+        if pageNo>0:
+            self._writeConsole()
+            
+        def fetch():
+            # http://quotes.money.163.com/hs/marketdata/service/jjcgph.php?host=/hs/marketdata/service/jjcgph.php&page=0&query=start:2018-06-30;end:2018-09-30&order=desc&count=60&type=query&req=73259
+            request = self._session.get( cf.FUND_HOLDS_URL % (pageNo, start, end, Utility.random(5)), timeout=10 )
+            if self._PY3:
+                request.encoding = 'utf-8'
+            lines = request.text
+            lines = lines.replace('--', '0')
+            lines = json.loads(lines)
+            data = lines['list']
+            df = pd.DataFrame(data)
+            df = df.drop(['CODE', 'ESYMBOL', 'EXCHANGE', 'NAME', 'RN', 'SHANGQIGUSHU', 'SHANGQISHIZHI', 'SHANGQISHULIANG'], axis=1)
+            for col in ['GUSHU', 'GUSHUBIJIAO', 'SHIZHI', 'SCSTC27']:
+                df[col] = df[col].astype(float)
+            df['SCSTC27'] = df['SCSTC27']*100
+            df['GUSHU'] = df['GUSHU']/10000
+            df['GUSHUBIJIAO'] = df['GUSHUBIJIAO']/10000
+            df['SHIZHI'] = df['SHIZHI']/10000
+            df['GUSHU'] = df['GUSHU'].map(cf.FORMAT)
+            df['GUSHUBIJIAO'] = df['GUSHUBIJIAO'].map(cf.FORMAT)
+            df['SHIZHI'] = df['SHIZHI'].map(cf.FORMAT)
+            df['SCSTC27'] = df['SCSTC27'].map(cf.FORMAT)
+            df.columns = cf.FUND_HOLDS_COLS
+            df = df[['code', 'name', 'date', 'nums', 'nlast', 'count', 
+                        'clast', 'amount', 'ratio']]
+            
+            if pageNo == 0:
+                return df, int(lines['pagecount'])
             else:
-                if pageNo == 0:
-                    return df, int(lines['pagecount'])
-                else:
-                    return df
-
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+                return df
+            
+        return self._retry(fetch, retry, pause)
 
 
     def ipo(self, retry=3, pause=0.001):
@@ -398,49 +364,56 @@ class Reference(Base):
 
         self._writeHead()
 
-        self._data = self.__handleIpo(self._data, 1, retry, pause)
+        self._data = self._collectPages(self.__iterIpo(retry, pause))
 
         return self._result()
+    
+    
+    def iterIpo(self, retry=3, pause=0.001):
+        """
+        逐页获取新股上市数据，内存占用不随页数增长
+        Parameters
+        --------
+        retry : int, 默认 3
+                     如遇网络等问题重复执行的次数 
+        pause : int, 默认 0
+                    重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
+        
+        Return
+        ------
+        generator 每次产出一页 DataFrame or List，字段同ipo
+        """
+        self._writeHead()
+        
+        for df in self.__iterIpo(retry, pause):
+            yield self._page(df)
 
 
-    def __handleIpo(self, data, pageNo, retry, pause):
-        self._writeConsole()
-
-        for _ in range(retry):
-            time.sleep(pause)
-
-            try:
-                # http://vip.stock.finance.sina.com.cn/corp/view/vRPD_NewStockIssue.php?page=1&cngem=0&orderBy=NetDate&orderType=desc
-                html = lxml.html.parse(cf.NEW_STOCKS_URL % pageNo)
-                res = html.xpath('//table[@id=\"NewStockTable\"]/tr')
-                if not res:
-                    return data
-                
-                if self._PY3:
-                    sarr = [etree.tostring(node).decode('utf-8') for node in res]
-                else:
-                    sarr = [etree.tostring(node) for node in res]
-                sarr = ''.join(sarr)
-                sarr = sarr.replace('<font color="red">*</font>', '')
-                sarr = '<table>%s</table>'%sarr
-                df = pd.read_html(StringIO(sarr), skiprows=[0, 1])[0]
-                df = df.drop([df.columns[idx] for idx in [12, 13, 14]], axis=1)
-                df.columns = cf.NEW_STOCKS_COLS
-                df['code'] = df['code'].map(lambda x : str(x).zfill(6))
-                df['xcode'] = df['xcode'].map(lambda x : str(x).zfill(6))
-                res = html.xpath('//table[@class=\"table2\"]/tr[1]/td[1]/a/text()')
-                tag = '下一页' if self._PY3 else unicode('下一页', 'utf-8')
-                hasNext = True if tag in res else False 
-                data = data.append(df, ignore_index=True)
-                pageNo += 1
-                if hasNext:
-                    data = self.__handleIpo(data, pageNo, retry, pause)
-            except Exception as ex:
-                print(ex)
-            else:
-                return data
+    def __iterIpo(self, retry, pause):
+        def fetch(pageNo):
+            # http://vip.stock.finance.sina.com.cn/corp/view/vRPD_NewStockIssue.php?page=1&cngem=0&orderBy=NetDate&orderType=desc
+            html = self._getHtml(cf.NEW_STOCKS_URL % pageNo)
+            # 只去掉 <font color="red">*</font> 标记，其余红色字体的单元格保留内容
+            for node in html.xpath('//table[@id=\"NewStockTable\"]//font[@color=\"red\"]'):
+                if (node.text or '').strip() == '*' and len(node) == 0:
+                    node.drop_tree()
+            res = html.xpath('//table[@id=\"NewStockTable\"]/tr')
+            if not res:
+                return None, None
             
+            df = self._parseTable(res, skiprows=[0, 1])
+            df = df.drop([df.columns[idx] for idx in [12, 13, 14]], axis=1)
+            df.columns = cf.NEW_STOCKS_COLS
+            df['code'] = Utility.codes(df['code'])
+            df['xcode'] = Utility.codes(df['xcode'])
+            res = html.xpath('//table[@class=\"table2\"]/tr[1]/td[1]/a/text()')
+            tag = '下一页' if self._PY3 else unicode('下一页', 'utf-8')
             
+            return df, (pageNo + 1 if tag in res else None)
+        
+        return self._iterPages(fetch, 1, retry, pause)
+    
+    
     def shMargins(self, retry=3, pause=0.001):
         """
         沪市融资融券历史数据
@@ -474,12 +447,31 @@ class Reference(Base):
         
         self._writeHead()
         
-        self._data = self.__handleMargins(self._data, 1, 'SH', Utility.random(8), cf.MAR_COLS, retry, pause)
-        self._data.rename(columns={'tdate':'date'}, inplace=True)
+        self._data = self._collectPages(self.__iterMargins('SH', retry, pause))
         
         return self._result()
     
     
+    def iterShMargins(self, retry=3, pause=0.001):
+        """
+        逐页获取沪市融资融券历史数据，内存占用不随页数增长
+        Parameters
+        --------
+        retry : int, 默认 3
+                     如遇网络等问题重复执行的次数 
+        pause : int, 默认 0
+                    重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
+        
+        Return
+        ------
+        generator 每次产出一页 DataFrame or List，字段同shMargins
+        """
+        self._writeHead()
+        
+        for df in self.__iterMargins('SH', retry, pause):
+            yield self._page(df)
+    
+    
     def szMargins(self, retry=3, pause=0.001):
         """
         深市融资融券历史数据
@@ -513,38 +505,49 @@ class Reference(Base):
         
         self._writeHead()
         
-        self._data = self.__handleMargins(self._data, 1, 'SZ', Utility.random(8), cf.MAR_COLS, retry, pause)
-        self._data.rename(columns={'tdate':'date'}, inplace=True)
+        self._data = self._collectPages(self.__iterMargins('SZ', retry, pause))
         
         return self._result()
     
     
-    def __handleMargins(self, dataArr, page, market, randInt, column, retry, pause):
-        self._writeConsole()
+    def iterSzMargins(self, retry=3, pause=0.001):
+        """
+        逐页获取深市融资融券历史数据，内存占用不随页数增长
+        Parameters
+        --------
+        retry : int, 默认 3
+                     如遇网络等问题重复执行的次数 
+        pause : int, 默认 0
+                    重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
         
-        for _ in range(retry):
-            time.sleep(pause)
+        Return
+        ------
+        generator 每次产出一页 DataFrame or List，字段同szMargins
+        """
+        self._writeHead()
+        
+        for df in self.__iterMargins('SZ', retry, pause):
+            yield self._page(df)
+    
+    
+    def __iterMargins(self, market, retry, pause):
+        randInt = Utility.random(8)
+        
+        def fetch(page):
+            request = self._session.get( cf.MAR_URL % (page, market, randInt) )
+            text = request.text.split('=')[1]
+            text = text.replace('{pages:', '{"pages":').replace(',data:', ',"data":').replace('T00:00:00', '').replace('"-"', '0')
+            dataDict = Utility.str2Dict(text)
+            data = dataDict['data']
+            df = pd.DataFrame(data, columns=cf.MAR_COLS)
             
-            try:
-                request = self._session.get( cf.MAR_URL % (page, market, randInt) )
-                text = request.text.split('=')[1]
-                text = text.replace('{pages:', '{"pages":').replace(',data:', ',"data":').replace('T00:00:00', '').replace('"-"', '0')
-                dataDict = Utility.str2Dict(text)
-                data = dataDict['data']
-                df = pd.DataFrame(data, columns=column)
-                
-                df['close'] = df['close'].map(cf.FORMAT)
-                df['rzyezb'] = df['rzyezb'].astype(float)
-                
-                dataArr = dataArr.append(df, ignore_index=True)
-                if page < dataDict['pages']:
-                    dataArr = self.__handleMargins(dataArr, page+1, market, randInt, column, retry, pause)
-            except Exception as e:
-                print(e)
-            else:
-                return dataArr
-                
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+            df['close'] = df['close'].map(cf.FORMAT)
+            df['rzyezb'] = df['rzyezb'].astype(float)
+            df = df.rename(columns={'tdate':'date'})
+            
+            return df, (page + 1 if page < dataDict['pages'] else None)
+        
+        return self._iterPages(fetch, 1, retry, pause)
     
     
     def marginDetailsAllByDate(self, date, retry=3, pause=0.001):
@@ -581,38 +584,29 @@ class Reference(Base):
         
         self._writeHead()
         
-        self._data = self.__handleMarginDetailsAllByDate(self._data, date, 1, Utility.random(8), retry, pause)
-        self._data.rename(columns={'scode':'code', 'sname':'name'}, inplace=True)
+        self._data = self._collectPages(self.__iterMarginDetailsAllByDate(date, retry, pause))
         
         return self._result()
     
     
-    def __handleMarginDetailsAllByDate(self, dataArr, date, page, randInt, retry, pause):
-        self._writeConsole()
+    def __iterMarginDetailsAllByDate(self, date, retry, pause):
+        randInt = Utility.random(8)
         
-        for _ in range(retry):
-            time.sleep(pause)
+        def fetch(page):
+            request = self._session.get(cf.MAR_BOTH_DETAIL % (date, page, randInt))
+            text = request.text.split('=')[1]
+            text = text.replace('{pages:', '{"pages":').replace(',data:', ',"data":').replace('"-"', '0')
+            dataDict = Utility.str2Dict(text)
+            data = dataDict['data']
+            df = pd.DataFrame(data, columns=cf.MAR_DET_All_COLS)
             
-            try:
-                request = self._session.get(cf.MAR_BOTH_DETAIL % (date, page, randInt))
-                text = request.text.split('=')[1]
-                text = text.replace('{pages:', '{"pages":').replace(',data:', ',"data":').replace('"-"', '0')
-                dataDict = Utility.str2Dict(text)
-                data = dataDict['data']
-                df = pd.DataFrame(data, columns=cf.MAR_DET_All_COLS)
-                
-                df['date'] = date
-                df['rzyezb'] = df['rzyezb'].astype(float)
-                    
-                dataArr = dataArr.append(df, ignore_index=True)
-                if page < dataDict['pages']:
-                    dataArr = self.__handleMarginDetailsAllByDate(dataArr, date, page+1, randInt, retry, pause)
-            except Exception as e:
-                print(e)
-            else:
-                return dataArr
+            df['date'] = date
+            df['rzyezb'] = df['rzyezb'].astype(float)
+            df = df.rename(columns={'scode':'code', 'sname':'name'})
             
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+            return df, (page + 1 if page < dataDict['pages'] else None)
+        
+        return self._iterPages(fetch, 1, retry, pause)
     
     
     def marginTotal(self, retry=3, pause=0.001):
@@ -648,36 +642,47 @@ class Reference(Base):
         
         self._writeHead()
         
-        self._data = self.__handleMarginTotal(self._data, 1, Utility.random(8), retry, pause)
-        self._data.rename(columns={'tdate':'date'}, inplace=True)
+        self._data = self._collectPages(self.__iterMarginTotal(retry, pause))
         
         return self._result()
     
     
-    def __handleMarginTotal(self, dataArr, page, randInt, retry, pause):
-        self._writeConsole()
+    def iterMarginTotal(self, retry=3, pause=0.001):
+        """
+        逐页获取两市合计融资融券历史数据，内存占用不随页数增长
+        Parameters
+        --------
+        retry : int, 默认 3
+                     如遇网络等问题重复执行的次数 
+        pause : int, 默认 0
+                    重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
+        
+        Return
+        ------
+        generator 每次产出一页 DataFrame or List，字段同marginTotal
+        """
+        self._writeHead()
+        
+        for df in self.__iterMarginTotal(retry, pause):
+            yield self._page(df)
+    
+    
+    def __iterMarginTotal(self, retry, pause):
+        randInt = Utility.random(8)
         
-        for _ in range(retry):
-            time.sleep(pause)
+        def fetch(page):
+            request = self._session.get(cf.MAR_TOTAL_URL % (page, randInt), timeout=10)
+            text = request.text.split('=')[1]
+            text = text.replace('{pages:', '{"pages":').replace(',data:', ',"data":').replace('T00:00:00', '').replace('"-"', '0')
+            dataDict = Utility.str2Dict(text)
+            data = dataDict['data']
+            df = pd.DataFrame(data, columns=cf.MAR_TOTAL_COLS)
             
-            try:
-                request = self._session.get(cf.MAR_TOTAL_URL % (page, randInt), timeout=10)
-                text = request.text.split('=')[1]
-                text = text.replace('{pages:', '{"pages":').replace(',data:', ',"data":').replace('T00:00:00', '').replace('"-"', '0')
-                dataDict = Utility.str2Dict(text)
-                data = dataDict['data']
-                df = pd.DataFrame(data, columns=cf.MAR_TOTAL_COLS)
-                
-                df['close'] = df['close'].map(cf.FORMAT)
-                df['rzyezb'] = df['rzyezb'].astype(float)
-                
-                dataArr = dataArr.append(df, ignore_index=True)
-                if page < dataDict['pages']:
-                    dataArr = self.__handleMarginTotal(dataArr, page+1, randInt, retry, pause)
-            except Exception as e:
-                print(e)
-            else:
-                return dataArr
+            df['close'] = df['close'].map(cf.FORMAT)
+            df['rzyezb'] = df['rzyezb'].astype(float)
+            df = df.rename(columns={'tdate':'date'})
             
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+            return df, (page + 1 if page < dataDict['pages'] else None)
+        
+        return self._iterPages(fetch, 1, retry, pause)
     
@@ -0,0 +1,156 @@
+# -*- coding:utf-8 -*-
+"""
+重试调度与熔断类
+Created on 2026/10/18
+@group : GuGu
+"""
+
+import time
+import random
+import threading
+import requests
+import config as cf
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    域名处于熔断状态，请求未发出
+    """
+    pass
+
+
+class Retrier():
+    """
+    统一的重试调度：网络类错误按带抖动的指数退避重试，解析错误及熔断直接失败
+    """
+    RETRYABLE = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                 requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError,
+                 requests.exceptions.HTTPError)
+
+    def __init__(self, base=None, cap=None):
+        """
+        Parameters
+        ------
+            base: float
+                    退避基数（秒），默认 cf.RETRY_BASE_DELAY
+            cap: float
+                    单次退避上限（秒），默认 cf.RETRY_MAX_DELAY
+        """
+        self.__base = cf.RETRY_BASE_DELAY if base is None else base
+        self.__cap = cf.RETRY_MAX_DELAY if cap is None else cap
+        self.__local = threading.local()
+
+
+    def retryable(self, error):
+        """
+        判断错误是否值得重试
+        """
+        if isinstance(error, CircuitOpenError):
+            return False
+
+        return isinstance(error, self.RETRYABLE)
+
+
+    def delay(self, attempt, pause=0):
+        """
+        第attempt次重试前的等待秒数：在 [pause, min(cap, base*2^attempt)] 内随机
+        """
+        ceiling = min(self.__cap, self.__base * (2 ** attempt))
+
+        return random.uniform(min(pause, ceiling), max(pause, ceiling))
+
+
+    def retried(self):
+        """
+        取出当前线程自上次调用以来开始的重试次数并清零，供传输层记入随后发出的请求
+        """
+        count = getattr(self.__local, 'retries', 0)
+        self.__local.retries = 0
+
+        return count
+
+
+    def run(self, func, retry=3, pause=0.001):
+        """
+        执行抓取函数，失败时按策略重试
+        Parameters
+        ------
+            func: function 无参数的抓取函数
+            retry: int 最多执行次数
+            pause: float 首次执行前及重试间隔的最小等待秒数
+        return
+        ------
+            func的返回值；不可重试的错误（含 CircuitOpenError）原样抛出，
+            重试次数用尽时抛出 IOError(cf.NETWORK_URL_ERROR_MSG, 最后一次错误)
+        """
+        error = None
+        for attempt in range(max(retry, 1)):
+            if attempt == 0:
+                time.sleep(pause)
+            else:
+                time.sleep(self.delay(attempt - 1, pause))
+                self.__local.retries = getattr(self.__local, 'retries', 0) + 1
+
+            try:
+                return func()
+            except Exception as e:
+                if not self.retryable(e):
+                    raise
+                error = e
+
+        failure = IOError(cf.NETWORK_URL_ERROR_MSG, error)
+        failure.__cause__ = error
+        raise failure
+
+
+class CircuitBreaker():
+    """
+    按域名熔断：连续失败达到阈值后，冷却期内的请求直接失败；冷却期后放行，再次失败立即重新熔断
+    """
+    def __init__(self, failures=None, cooldown=None):
+        """
+        Parameters
+        ------
+            failures: int
+                    触发熔断的连续失败次数，默认 cf.CIRCUIT_FAILURES
+            cooldown: float
+                    熔断持续秒数，默认 cf.CIRCUIT_COOLDOWN
+        """
+        self.__failures = cf.CIRCUIT_FAILURES if failures is None else failures
+        self.__cooldown = cf.CIRCUIT_COOLDOWN if cooldown is None else cooldown
+        self.__hosts = {}
+        self.__lock = threading.Lock()
+
+
+    def before(self, host):
+        """
+        请求前检查，熔断中抛出 CircuitOpenError
+        """
+        with self.__lock:
+            state = self.__hosts.get(host)
+            if state is not None and state[0] >= self.__failures and time.time() < state[1]:
+                raise CircuitOpenError(cf.CIRCUIT_OPEN_MSG % host)
+
+
+    def success(self, host):
+        with self.__lock:
+            self.__hosts.pop(host, None)
+
+
+    def failure(self, host):
+        with self.__lock:
+            failures = self.__hosts.get(host, (0, 0))[0] + 1
+            self.__hosts[host] = (failures, time.time() + self.__cooldown)
+
+
+    def state(self):
+        """
+        获取处于熔断中的域名
+        return
+        ------
+            dict {域名: 剩余秒数}
+        """
+        now = time.time()
+        with self.__lock:
+            return dict((host, state[1] - now) for host, state in self.__hosts.items()
+                        if state[0] >= self.__failures and state[1] > now)
@@ -10,21 +10,23 @@ from __future__ import division
 
 import time
 import json
+import threading
 import re
-import lxml.html
-from lxml import etree
+import numpy as np
 import pandas as pd
-from pandas.compat import StringIO
-from base import Base, cf
+from io import StringIO
+from base import Base, Collector, cf
 from utility import Utility
 
 class StockData(Base):
     def __init__(self, code=None, pandas=True, inter=True):
         Base.__init__(self, pandas, inter)
         self.__code = code
+        self.__lastTick = None
+        self.__tickLock = threading.Lock()
         
     
-    def history(self, start='', end='', ktype='D', autype='qfq', index=False, retry=3, pause=0.001):
+    def history(self, start='', end='', ktype='D', autype='qfq', index=False, retry=3, pause=0.001, store=None):
         """
         获取股票交易历史数据
         ---------
@@ -41,6 +43,8 @@ class StockData(Base):
                      如遇网络等问题重复执行的次数 
           pause : int, 默认 0
                     重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
+          store : KlineStore, 默认 None
+                    本地K线库，传入时只下载本地最后一根K线之后的数据，前复权价格因除权除息变化时重新下载
         return
         -------
           DataFrame or list: [{'date':, 'open':, ...}, ...]
@@ -54,9 +58,82 @@ class StockData(Base):
         """
         self._data = pd.DataFrame()
         
+        self._data = self.__history(self.__code, start, end, ktype, autype, index, retry, pause, store)
+        
+        return self._result()
+    
+    
+    def histories(self, codes=None, start='', end='', ktype='D', autype='qfq', index=False, retry=3, pause=0.001, workers=8, store=None, withFailed=False):
+        """
+        批量获取多只股票交易历史数据
+        ---------
+        Parameters:
+          codes:list
+                      股票代码列表，为空时取创建对象时传入的代码列表
+          start, end, ktype, autype, index, retry, pause, store:
+                      同history
+          workers : int, 默认 8
+                      并发抓取的线程数
+          withFailed : bool, 默认 False
+                      为True时返回 (数据, 失败信息) 元组，historiesAsync等跨线程调用时应使用此方式获取失败信息
+        return
+        -------
+          DataFrame or list: [{'date':, 'open':, ...}, ...]
+              所有股票的长格式数据，以code列区分，字段同history
+              抓取失败的股票不影响其它股票，失败信息 dict {code: 错误信息}
+              随withFailed一并返回，或在同一线程内通过getFailed()获取
+        """
+        self._data = pd.DataFrame()
+        failed = self._threadLocal.failed = {}
+        
+        codes = self.__code if codes is None else codes
+        codes = [codes] if isinstance(codes, str) else list(codes)
+        
+        self._writeHead()
+        
+        def fetch(code):
+            self._writeConsole()
+            
+            try:
+                return code, self.__history(code, start, end, ktype, autype, index, retry, pause, store), None
+            except Exception as e:
+                return code, None, str(e)
+            
+        dataArr = Collector(cf.KLINE_TT_COLS + ['code'])
+        for code, df, err in self._mapPages(fetch, codes, workers):
+            if err is not None:
+                failed[code] = err
+            else:
+                dataArr.add(df)
+        self._data = dataArr.result()
+        
+        return (self._result(), failed) if withFailed else self._result()
+    
+    
+    def getFailed(self):
+        """
+        获取当前线程最近一次批量抓取中失败的股票
+        historiesAsync在线程池中执行，其失败信息需通过histories的withFailed参数获取
+        return
+        ------
+            dict {code: 错误信息}
+        """
+        return getattr(self._threadLocal, 'failed', {})
+    
+    
+    def __history(self, code, start, end, ktype, autype, index, retry, pause, store=None):
+        if store is not None and ktype.upper() in cf.K_LABELS:
+            data = self.__syncStore(store, code, start, ktype, autype, index, retry, pause)
+            if (start is not None) & (start != ''):
+                data = data[data.date >= start]
+            if (end is not None) & (end != ''):
+                data = data[data.date <= end]
+                
+            return data.reset_index(drop=True)
+        
         url = ''
         dataflag = ''
-        symbol = cf.INDEX_SYMBOL[self.__code] if index else Utility.symbol(self.__code)
+        symbol = cf.INDEX_SYMBOL[code] if index else Utility.symbol(code)
         autype = '' if autype is None else autype
         
         if (start is not None) & (start != ''):
@@ -64,7 +141,7 @@ class StockData(Base):
             
         if ktype.upper() in cf.K_LABELS:
             fq = autype if autype is not None else ''
-            if self.__code[:1] in ('1', '5') or index:
+            if code[:1] in ('1', '5') or index:
                 fq = ''
                 
             kline = '' if autype is None else 'fq'
@@ -88,50 +165,79 @@ class StockData(Base):
         else:
             raise TypeError('ktype input error.')
         
+        dataArr = Collector(cf.KLINE_TT_COLS + ['code'])
         for url in urls:
-            self._data = self._data.append(self.__handleHistory(url, dataflag, symbol, index, ktype, retry, pause), ignore_index=True)
+            dataArr.add(self.__handleHistory(url, code, dataflag, symbol, index, ktype, retry, pause))
+        data = dataArr.result()
         if ktype not in cf.K_MIN_LABELS:
             if ((start is not None) & (start != '')) & ((end is not None) & (end != '')):
-                self._data = self._data[(self._data.date >= start) & (self._data.date <= end)]
+                data = data[(data.date >= start) & (data.date <= end)]
         
-        return self._result()
+        return data
     
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
     
-    
-    def __handleHistory(self, url, dataflag='', symbol='', index = False, ktype = '', retry=3, pause=0.001):
-        for _ in range(retry):
-            time.sleep(pause)
+    def __syncStore(self, store, code, start, ktype, autype, index, retry, pause):
+        """
+        增量更新本地K线：从本地倒数第二根K线起下载至今日，并用下载结果替换最后一根K线
+        （最后一根可能是未走完的日、周、月K线）；
+        前复权时以已走完的倒数第二根K线比对价格，发生变化（除权除息）则重新下载全部数据
+        """
+        stored = store.read(code, ktype, autype)
+        today = Utility.getToday()
+        
+        if stored is None or stored.empty or ((start is not None) & (start != '') and start < stored['date'].iloc[0]):
+            first = start if (start is not None) & (start != '') else ''
+            data = self.__history(code, first, today if first else '', ktype, autype, index, retry, pause)
+        else:
+            first = stored['date'].iloc[0]
+            last = stored['date'].iloc[-1]
+            anchor = stored.iloc[-2] if len(stored) > 1 else stored.iloc[-1]
+            delta = self.__history(code, anchor['date'], today, ktype, autype, index, retry, pause)
+            overlap = delta[delta.date == anchor['date']]
             
-            try:
-                request = self._session.get(url, timeout=10)
-                if self._PY3:
-                    request.encoding = 'gbk'
-                lines = request.text
-                if len(lines) < 100: #no data
-                    return None
-            except Exception as e:
-                print(e)
+            if autype == 'qfq' and (overlap.empty or 
+                                    abs(overlap['close'].iloc[0] - anchor['close']) > 1e-6):
+                data = self.__history(code, first, today, ktype, autype, index, retry, pause)
             else:
-                lines = lines.split('=')[1]
-                reg = re.compile(r',{"nd.*?}') 
-                lines = re.subn(reg, '', lines) 
-                js = json.loads(lines[0])
-                dataflag = dataflag if dataflag in list(js['data'][symbol].keys()) else cf.TT_K_TYPE[ktype.upper()]
+                data = pd.concat([stored[stored.date < last], delta[delta.date >= last]], ignore_index=True)
                 
-                if ktype in cf.K_MIN_LABELS:
-                    for value in js['data'][symbol][dataflag]:
-                        value.pop()
-                        value.pop()
-                        
-                df = pd.DataFrame(js['data'][symbol][dataflag], columns=cf.KLINE_TT_COLS)
-                df['code'] = symbol if index else self.__code
-                if ktype in cf.K_MIN_LABELS:
-                    df['date'] = df['date'].map(lambda x: '%s-%s-%s %s:%s'%(x[0:4], x[4:6], x[6:8], x[8:10], x[10:12]))
-                for col in df.columns[1:6]:
-                    df[col] = df[col].astype(float)
-                    
-                return df
+        if not data.empty:
+            store.write(code, ktype, autype, data)
+            
+        return data
+    
+    
+    def __handleHistory(self, url, code, dataflag='', symbol='', index = False, ktype = '', retry=3, pause=0.001):
+        def fetch():
+            request = self._session.get(url, timeout=10)
+            if self._PY3:
+                request.encoding = 'gbk'
+                
+            return request.text
+        
+        lines = self._retry(fetch, retry, pause)
+        if len(lines) < 100: #no data
+            return None
+        
+        lines = lines.split('=')[1]
+        reg = re.compile(r',{"nd.*?}') 
+        lines = re.subn(reg, '', lines) 
+        js = json.loads(lines[0])
+        dataflag = dataflag if dataflag in list(js['data'][symbol].keys()) else cf.TT_K_TYPE[ktype.upper()]
+        
+        if ktype in cf.K_MIN_LABELS:
+            for value in js['data'][symbol][dataflag]:
+                value.pop()
+                value.pop()
+                
+        df = pd.DataFrame(js['data'][symbol][dataflag], columns=cf.KLINE_TT_COLS)
+        df['code'] = symbol if index else code
+        if ktype in cf.K_MIN_LABELS:
+            df['date'] = df['date'].map(lambda x: '%s-%s-%s %s:%s'%(x[0:4], x[4:6], x[6:8], x[8:10], x[10:12]))
+        for col in df.columns[1:6]:
+            df[col] = df[col].astype(float)
+            
+        return df
             
             
     def xrxd(self, date='', retry=3, pause=0.001):
@@ -155,38 +261,33 @@ class StockData(Base):
                 cqr, 除权日
                 FHcontent, 除权除息信息
         """
-        data = None
-        
         if not date:
             date = Utility.getToday()
             
         symbol = Utility.symbol(self.__code)
         
-        for _ in range(retry):
-            time.sleep(pause)
-            
+        def fetch():
             url = cf.HISTORY_URL % ('fq', 'qfq', symbol, 'day', date, date, 'qfq', Utility.random(17))
-            try:
-                request = self._session.get(url, timeout=10)
-                pattern = re.compile(r'({"nd".+?})')
-                result = re.search(pattern, request.text)
-                if result:
-                    data = eval(result.group(1))
-            except Exception as e:
-                print(str(e))
-                
-            return data
-                
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+            request = self._session.get(url, timeout=10)
+            pattern = re.compile(r'({"nd".+?})')
+            result = re.search(pattern, request.text)
+            
+            return Utility.str2Dict(result.group(1)) if result else None
+        
+        return self._retry(fetch, retry, pause)
     
     
-    def realtime(self):
+    def realtime(self, chunk=800, workers=8):
         """
         获取实时交易数据 getting real time quotes data
         用于跟踪交易情况（本次执行的结果-上一次执行的数据）
         Parameters
         ------
             stockdata(code) code : string, array-like object (list, tuple, Series).
+            chunk : int, 默认 800
+                    单次请求的最大股票数，股票较多时分批并发请求，结果按输入顺序合并
+            workers : int, 默认 8
+                    并发请求的线程数
         return
         -------
             DataFrame 实时交易数据 or list: [{'name':, 'open':, ...}, ...]
@@ -218,27 +319,17 @@ class StockData(Base):
         """
         self._data = pd.DataFrame()
         
-        symbols_list = ''
         if isinstance(self.__code, list) or isinstance(self.__code, set) or isinstance(self.__code, tuple) or isinstance(self.__code, pd.Series):
-            for code in self.__code:
-                symbols_list += Utility.symbol(code) + ','
+            symbols = list(Utility.symbols(list(self.__code)))
         else:
-            symbols_list = Utility.symbol(self.__code)
-        symbols_list = symbols_list[:-1] if len(symbols_list) > 8 else symbols_list
+            symbols = [Utility.symbol(self.__code)]
+        chunks = [symbols[i:i+chunk] for i in range(0, len(symbols), chunk)]
         
-        # http://hq.sinajs.cn/rn=4879967949085&list=sh600000,sh600004
-        request = self._session.get( cf.LIVE_DATA_URL % (Utility.random(), symbols_list), timeout=10 )
-        request.encoding = 'gbk'
-        reg = re.compile(r'\="(.*?)\";')
-        data = reg.findall(request.text)
-        regSym = re.compile(r'(?:sh|sz)(.*?)\=')
-        syms = regSym.findall(request.text)
         data_list = []
         syms_list = []
-        for index, row in enumerate(data):
-            if len(row)>1:
-                data_list.append([astr for astr in row.split(',')])
-                syms_list.append(syms[index])
+        for data, syms in self._mapPages(self.__handleRealtime, chunks, workers):
+            data_list.extend(data)
+            syms_list.extend(syms)
         if len(syms_list) == 0:
             return None
         
@@ -252,7 +343,93 @@ class StockData(Base):
         return self._result()
     
     
-    def historyTicks(self, date=None, retry=3, pause=0.001):
+    def watch(self, interval=3, count=None, callback=None, chunk=800, workers=8, onError=None):
+        """
+        持续轮询实时行情，只返回价格、成交量或盘口发生变化的股票
+        Parameters
+        ------
+            interval : int, 默认 3
+                    轮询间隔秒数
+            count : int, 默认 None
+                    轮询次数，为空时一直轮询
+            callback : function, 默认 None
+                    为空时返回生成器，逐次yield变化的行；否则每次有变化时调用callback(changed)
+            chunk, workers :
+                    同realtime
+            onError : function, 默认 None
+                    某次轮询出错时调用onError(e)并继续轮询；为空时直接抛出该错误，结束轮询
+        return
+        -------
+            generator or None
+                每次yield发生变化的行，DataFrame or list: [{'name':, 'open':, ...}, ...]，字段同realtime
+        """
+        changes = self.__watch(interval, count, chunk, workers, onError)
+        if callback is None:
+            return changes
+        
+        for changed in changes:
+            callback(changed)
+            
+            
+    def __watch(self, interval, count, chunk, workers, onError):
+        # 上一次快照：每只股票一行，列为cf.WATCH_COLS
+        index = {}
+        table = np.zeros((0, len(cf.WATCH_COLS)))
+        
+        polls = 0
+        while count is None or polls < count:
+            start = time.time()
+            polls += 1
+            
+            try:
+                self.realtime(chunk, workers)
+            except Exception as e:
+                if onError is None:
+                    raise
+                onError(e)
+                self._data = pd.DataFrame()
+                
+            if not self._data.empty:
+                df = self._data.drop_duplicates('code')
+                values = df[cf.WATCH_COLS].apply(pd.to_numeric, errors='coerce').fillna(0).values
+                
+                newCodes = [code for code in df['code'] if code not in index]
+                for code in newCodes:
+                    index[code] = len(index)
+                if newCodes:
+                    table = np.vstack([table, np.full((len(newCodes), table.shape[1]), np.nan)])
+                    
+                rows = np.array([index[code] for code in df['code']])
+                mask = (table[rows] != values).any(axis=1)
+                table[rows] = values
+                
+                if mask.any():
+                    self._data = df[mask].reset_index(drop=True)
+                    yield self._result()
+                    
+            if count is None or polls < count:
+                time.sleep(max(0, interval - (time.time() - start)))
+    
+    
+    def __handleRealtime(self, symbols):
+        # http://hq.sinajs.cn/rn=4879967949085&list=sh600000,sh600004
+        request = self._session.get( cf.LIVE_DATA_URL % (Utility.random(), ','.join(symbols)), timeout=10 )
+        request.encoding = 'gbk'
+        reg = re.compile(r'\="(.*?)\";')
+        data = reg.findall(request.text)
+        regSym = re.compile(r'(?:sh|sz)(.*?)\=')
+        syms = regSym.findall(request.text)
+        data_list = []
+        syms_list = []
+        for index, row in enumerate(data):
+            if len(row)>1:
+                data_list.append([astr for astr in row.split(',')])
+                syms_list.append(syms[index])
+                
+        return data_list, syms_list
+    
+    
+    def historyTicks(self, date=None, retry=3, pause=0.001, workers=8):
         """
         获取历史分笔明细数据
         Parameters
@@ -263,6 +440,8 @@ class StockData(Base):
                     如遇网络等问题重复执行的次数
             pause : int, 默认 0
                     重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
+            workers : int, 默认 8
+                    每次并发预取的页数，遇到第一个空页即停止；为1时逐页抓取
          return
          -------
             DataFrame 当日所有股票交易数据(DataFrame) or list: [{'time':, 'price':, ...}, ...]
@@ -273,58 +452,45 @@ class StockData(Base):
         symbol = Utility.symbol(self.__code)
         date = Utility.lastTradeDate() if date is None else date
             
-        try:
-            self._writeHead()
-            
-            page = 1
-            while(True):
-                # http://vip.stock.finance.sina.com.cn/quotes_service/view/vMS_tradehistory.php?symbol=sh600000&date=2018-12-26&page=1
-                # http://market.finance.sina.com.cn/transHis.php?date=2019-01-25&symbol=sh600000&page=1
-                url = cf.HISTORY_TICKS_URL % (date, symbol, page)
-                tick_data = self.__handleTicks(url, cf.HISTORY_TICK_COLUMNS, retry, pause)
-                if tick_data is not None:
-                    self._data = self._data.append(tick_data, ignore_index=True)
-                    page = page + 1
-                else:
+        self._writeHead()
+        
+        dataArr = Collector()
+        page = 1
+        finished = False
+        while not finished:
+            # http://vip.stock.finance.sina.com.cn/quotes_service/view/vMS_tradehistory.php?symbol=sh600000&date=2018-12-26&page=1
+            # http://market.finance.sina.com.cn/transHis.php?date=2019-01-25&symbol=sh600000&page=1
+            window = range(page, page + max(workers, 1))
+            ticks = self._mapPages(lambda pNo: self.__handleTicks(cf.HISTORY_TICKS_URL % (date, symbol, pNo), cf.HISTORY_TICK_COLUMNS, retry, pause), 
+                                   window, workers)
+            for tick_data in ticks:
+                if tick_data is None:
+                    finished = True
                     break
-        except Exception as er:
-            print(str(er))
-        else:
-            return self._result()
-            
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+                dataArr.add(tick_data)
+            page += len(window)
+        self._data = dataArr.result()
+        
+        return self._result()
         
         
     def __handleTicks(self, url, column, retry, pause):
         self._writeConsole()
         
-        for _ in range(retry):
-            time.sleep(pause)
+        def fetch():
+            html = self._getHtml(url)
+            res = html.xpath('//table[@id=\"datatbl\"]/tbody/tr')
+            if not res:
+                return None
             
-            try:
-                html = lxml.html.parse(url)
-                res = html.xpath('//table[@id=\"datatbl\"]/tbody/tr')
-                if not res:
-                    return None
+            df = self._parseTable(res, replace=[('--', '0')])
+            df.columns = column
+            if 'pchange' in column:
+                df['pchange'] = df['pchange'].map(lambda x : x.replace('%', ''))
                 
-                if self._PY3:
-                    sarr = [etree.tostring(node).decode('utf-8') for node in res]
-                else:
-                    sarr = [etree.tostring(node) for node in res]
-                sarr = ''.join(sarr)
-                sarr = '<table>%s</table>'%sarr
-                sarr = sarr.replace('--', '0')
-                df = pd.read_html(StringIO(sarr), parse_dates=False)
-                df = pd.read_html(StringIO(sarr), parse_dates=False)[0]
-                df.columns = column
-                if 'pchange' in column:
-                    df['pchange'] = df['pchange'].map(lambda x : x.replace('%', ''))
-            except Exception as e:
-                print(e)
-            else:
-                return df
-            
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+            return df
+        
+        return self._retry(fetch, retry, pause)
     
     def todayTicks(self, retry=3, pause=0.001):
         """
@@ -342,6 +508,92 @@ class StockData(Base):
         """
         self._data = pd.DataFrame()
         
+        date = self.__tickDate()
+        if date is None:
+            return None
+        
+        symbol = Utility.symbol(self.__code)
+        
+        self._writeHead()
+        self._data = self.__todayTicks(symbol, date, retry, pause)
+        
+        return self._result()
+    
+    
+    def tailTicks(self, retry=3, pause=0.001):
+        """
+        增量获取当日分笔明细数据，首次调用返回当日全部分笔，此后只抓取并返回上次调用之后的新成交
+        Parameters
+        ------
+            retry : int, 默认 3
+                      如遇网络等问题重复执行的次数
+            pause : int, 默认 0
+                     重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
+         return
+         -------
+            DataFrame 新增分笔数据(DataFrame) or list: [{'time':, 'price':, ...}, ...]，无新成交时返回None
+                  属性:成交时间、成交价格、涨跌幅、价格变动，成交手、成交金额(元)，买卖类型
+        """
+        self._data = pd.DataFrame()
+        
+        date = self.__tickDate()
+        if date is None:
+            return None
+        
+        self._writeHead()
+        # 多线程调用时依次进行，每笔新成交只返回一次
+        with self.__tickLock:
+            self._data = self.__tailTicks(date, retry, pause)
+        
+        return self._result()
+    
+    
+    def __tailTicks(self, date, retry, pause):
+        symbol = Utility.symbol(self.__code)
+        # 换日后重新从头获取
+        if self.__lastTick is None or self.__lastTick[0] != date:
+            data = self.__todayTicks(symbol, date, retry, pause)
+            if len(data) > 0:
+                self.__setLastTick(date, data)
+                
+            return data
+        
+        # 第1页为最新成交，逐页向前抓取，遇到早于上次最后成交时间的记录即停止
+        _, last, seen = self.__lastTick
+        dataArr = Collector(cf.TODAY_TICK_COLUMNS)
+        pNo = 1
+        while True:
+            ticks = self.__handleTicks(cf.TODAY_TICKS_URL % (symbol, date, pNo), cf.TODAY_TICK_COLUMNS, retry, pause)
+            if ticks is None:
+                break
+            
+            recent = ticks[ticks['time'] >= last]
+            dataArr.add(recent)
+            if len(recent) < len(ticks):
+                break
+            pNo += 1
+        data = dataArr.result()
+        
+        if len(data) == 0:
+            return data
+        
+        # 与上次最后成交同一秒的记录中，前面（较新）超出已返回条数的部分为新成交
+        same = (data['time'] == last).values
+        fresh = ~same | (same.cumsum() <= same.sum() - seen)
+        self.__setLastTick(date, data)
+        
+        return data[fresh].reset_index(drop=True)
+    
+    
+    def __setLastTick(self, date, data):
+        """
+        记录tailTicks当日已返回的最后成交时间及该秒内的成交笔数，只由__tailTicks调用
+        """
+        last = data['time'].max()
+        self.__lastTick = (date, last, int((data['time'] == last).sum()))
+    
+    
+    def __tickDate(self):
         if self.__code is None or len(self.__code)!=6 :
             return None
         
@@ -354,31 +606,27 @@ class StockData(Base):
         if now < openTime:
             return None
         
-        symbol = Utility.symbol(self.__code)
-        date = Utility.getToday()
-        
-        for _ in range(retry):
-            time.sleep(pause)
-            
-            try:
-                # http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/CN_Transactions.getAllPageTime?date=2018-12-26&symbol=sh600000
-                request = self._session.get( cf.TODAY_TICKS_PAGE_URL % (date, symbol), timeout=10 )
-                request.encoding = 'gbk'
-                text = request.text[1:-1]
-                data_dict = Utility.str2Dict(text)
-                pages = len(data_dict['detailPages'])
-                
-                self._writeHead()
-                for pNo in range(1, pages+1):
-                    # http://vip.stock.finance.sina.com.cn/quotes_service/view/vMS_tradedetail.php?symbol=sh600000&date=2018-12-26&page=1
-                    url = cf.TODAY_TICKS_URL % (symbol, date, pNo)
-                    self._data = self._data.append(self.__handleTicks(url, cf.TODAY_TICK_COLUMNS, retry, pause), ignore_index=True)
-            except Exception as e:
-                print(str(e))
-            else:
-                return self._result()
+        return Utility.getToday()
+    
+    
+    def __todayTicks(self, symbol, date, retry, pause):
+        def fetch():
+            # http://vip.stock.finance.sina.com.cn/quotes_service/api/json_v2.php/CN_Transactions.getAllPageTime?date=2018-12-26&symbol=sh600000
+            request = self._session.get( cf.TODAY_TICKS_PAGE_URL % (date, symbol), timeout=10 )
+            request.encoding = 'gbk'
+            text = request.text[1:-1]
             
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+            return len(Utility.str2Dict(text)['detailPages'])
+        
+        pages = self._retry(fetch, retry, pause)
+        
+        dataArr = Collector(cf.TODAY_TICK_COLUMNS)
+        for pNo in range(1, pages+1):
+            # http://vip.stock.finance.sina.com.cn/quotes_service/view/vMS_tradedetail.php?symbol=sh600000&date=2018-12-26&page=1
+            url = cf.TODAY_TICKS_URL % (symbol, date, pNo)
+            dataArr.add(self.__handleTicks(url, cf.TODAY_TICK_COLUMNS, retry, pause))
+        
+        return dataArr.result()
     
     
     def bigDeal(self, date=None, vol=400, retry=3, pause=0.001):
@@ -405,24 +653,20 @@ class StockData(Base):
         symbol = Utility.symbol(self.__code)
         vol = vol*100
         
-        for _ in range(retry):
-            time.sleep(pause)
+        def fetch():
+            # http://vip.stock.finance.sina.com.cn/quotes_service/view/cn_bill_download.php?symbol=sh600000&num=60&page=1&sort=ticktime&asc=0&volume=40000&amount=0&type=0&day=2018-12-26
+            request = self._session.get( cf.SINA_DD % (symbol, vol, date), timeout=10 )
+            request.encoding = 'gbk'
             
-            try:
-                # http://vip.stock.finance.sina.com.cn/quotes_service/view/cn_bill_download.php?symbol=sh600000&num=60&page=1&sort=ticktime&asc=0&volume=40000&amount=0&type=0&day=2018-12-26
-                request = self._session.get( cf.SINA_DD % (symbol, vol, date), timeout=10 )
-                request.encoding = 'gbk'
-                lines = request.text
-                if len(lines) < 100:
-                    return None
-                self._data = pd.read_csv(StringIO(lines), names=cf.SINA_DD_COLS, skiprows=[0])    
-                if self._data is not None:
-                    self._data['code'] = self._data['code'].map(lambda x: x[2:])
-            except Exception as e:
-                print(e)
-            else:
-                return self._result()
+            return request.text
+        
+        lines = self._retry(fetch, retry, pause)
+        if len(lines) < 100:
+            return None
+        self._data = pd.read_csv(StringIO(lines), names=cf.SINA_DD_COLS, skiprows=[0])    
+        if self._data is not None:
+            self._data['code'] = self._data['code'].map(lambda x: x[2:])
             
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+        return self._result()
     
     
@@ -8,11 +8,7 @@ Created on 2019/01/02
 """
 from __future__ import division
 
-import time
 import pandas as pd
-from pandas.compat import StringIO
-import lxml.html
-from lxml import etree
 import re
 from utility import Utility
 from base import Base, cf
@@ -45,45 +41,30 @@ class StockInfo(Base):
         self._writeHead()
         
         date = '%s-12-31' % Utility.getYear()
-        self._data = pd.DataFrame()
         
-        self._data = self.__handleStockProfiles(self._data, date, 1, retry, pause)
+        self._data = self._collectPages(self.__iterStockProfiles(date, retry, pause))
         
         return self._result()
     
     
-    def __handleStockProfiles(self, dataArr, date, page, retry, pause):
-        self._writeConsole()
-        
-        for _ in range(retry):
-            time.sleep(pause)
+    def __iterStockProfiles(self, date, retry, pause):
+        def fetch(page):
+            html = self._getHtml(cf.ALL_STOCK_PROFILES_URL % (date, page))
+            res = html.xpath('//table[@id="myTable04"]/tbody/tr')
+            if not res:
+                return None, None
             
-            try:
-                html = lxml.html.parse(cf.ALL_STOCK_PROFILES_URL % (date, page))
-                res = html.xpath('//table[@id="myTable04"]/tbody/tr')
-                if not res:
-                    return dataArr
-                
-                if self._PY3:
-                    sarr = [etree.tostring(node).decode('utf-8') for node in res]
-                else:
-                    sarr = [etree.tostring(node) for node in res]
-                sarr = ''.join(sarr)
-                sarr = '<table>%s</table>' % sarr
-                
-                df = pd.read_html(sarr)[0]
-                df = df.drop([0, 3, 5, 6, 7, 10, 11], axis = 1)
-                df.columns = cf.ALL_STOCK_PROFILES_COLS
-                df['code'] = df['code'].map(lambda x: str(x).zfill(6))
-                
-                dataArr = dataArr.append(df, ignore_index=True)
-            except Exception as e:
-                print(e)
-            else:
-                return self.__handleStockProfiles(dataArr, date, page+1, retry, pause)
+            df = self._parseTable(res)
+            df = df.drop([0, 3, 5, 6, 7, 10, 11], axis = 1)
+            df.columns = cf.ALL_STOCK_PROFILES_COLS
+            df['code'] = Utility.codes(df['code'])
+            
+            return df, page + 1
+        
+        return self._iterPages(fetch, 1, retry, pause)
         
     
-    def report(self, year, quarter, retry=3, pause=0.001):
+    def report(self, year, quarter, retry=3, pause=0.001, workers=8):
         """
         获取业绩报表数据
         Parameters
@@ -95,6 +76,8 @@ class StockInfo(Base):
                      如遇网络等问题重复执行的次数 
         pause : int, 默认 0.001
                     重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题   
+        workers : int, 默认 8
+                    并发抓取分页的线程数
         Return
         --------
         DataFrame or List: [{'code':, 'name':, ...}, ...]
@@ -116,13 +99,36 @@ class StockInfo(Base):
             self._writeHead()
             
             # http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/mainindex/index.phtml?s_i=&s_a=&s_c=&reportdate=2018&quarter=3&p=1&num=60
-            self._data = self.__parsePage(cf.REPORT_URL, year, quarter, 1, cf.REPORT_COLS, pd.DataFrame(), retry, pause, 11)
-            if self._data is not None:
-                self._data['code'] = self._data['code'].map(lambda x:str(x).zfill(6))
+            self._data = self.__parsePage(cf.REPORT_URL, year, quarter, cf.REPORT_COLS, retry, pause, workers, 11)
+            self._data['code'] = Utility.codes(self._data['code'])
                 
             return self._result()
         
-    def profit(self, year, quarter, retry=3, pause=0.001):
+        
+    def iterReport(self, year, quarter, retry=3, pause=0.001, workers=8):
+        """
+        逐批获取业绩报表数据，同时在内存中的只有一批并发抓取的分页
+        Parameters
+        --------
+        year, quarter, retry, pause:
+                    同report
+        workers : int, 默认 8
+                    并发抓取分页的线程数，也是每批的页数
+        Return
+        --------
+        generator 按页码顺序每次产出一页 DataFrame or List，字段同report
+        """
+        if Utility.checkQuarter(year, quarter) is not True:
+            return
+        
+        self._writeHead()
+        
+        for df in self.__iterPages(cf.REPORT_URL, year, quarter, cf.REPORT_COLS, retry, pause, workers, 11):
+            df['code'] = Utility.codes(df['code'])
+            yield self._page(df)
+            
+            
+    def profit(self, year, quarter, retry=3, pause=0.001, workers=8):
         """
         获取盈利能力数据
         Parameters
@@ -134,6 +140,8 @@ class StockInfo(Base):
                      如遇网络等问题重复执行的次数 
         pause : int, 默认 0.001
                     重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题   
+        workers : int, 默认 8
+                    并发抓取分页的线程数
         Return
         --------
         DataFrame or List: [{'code':, 'name':, ...}, ...]
@@ -153,13 +161,12 @@ class StockInfo(Base):
             self._writeHead()
             
             # http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/profit/index.phtml?s_i=&s_a=&s_c=&reportdate=2018&quarter=3&p=1&num=60
-            self._data = self.__parsePage(cf.PROFIT_URL, year, quarter, 1, cf.PROFIT_COLS, pd.DataFrame(), retry, pause)
-            if self._data is not None:
-                self._data['code'] = self._data['code'].map(lambda x: str(x).zfill(6))
+            self._data = self.__parsePage(cf.PROFIT_URL, year, quarter, cf.PROFIT_COLS, retry, pause, workers)
+            self._data['code'] = Utility.codes(self._data['code'])
                 
             return self._result()
         
-    def operation(self, year, quarter, retry=3, pause=0.001):
+    def operation(self, year, quarter, retry=3, pause=0.001, workers=8):
         """
         获取营运能力数据
         Parameters
@@ -171,6 +178,8 @@ class StockInfo(Base):
                      如遇网络等问题重复执行的次数 
         pause : int, 默认 0.001
                     重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题   
+        workers : int, 默认 8
+                    并发抓取分页的线程数
         Return
         --------
         DataFrame or List: [{'code':, 'name':, ...}, ...]
@@ -189,13 +198,12 @@ class StockInfo(Base):
             self._writeHead()
             
             # http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/operation/index.phtml?s_i=&s_a=&s_c=&reportdate=2018&quarter=3&p=1&num=60
-            self._data = self.__parsePage(cf.OPERATION_URL, year, quarter, 1, cf.OPERATION_COLS, pd.DataFrame(), retry, pause)
-            if self._data is not None:
-                self._data['code'] = self._data['code'].map(lambda x: str(x).zfill(6))
+            self._data = self.__parsePage(cf.OPERATION_URL, year, quarter, cf.OPERATION_COLS, retry, pause, workers)
+            self._data['code'] = Utility.codes(self._data['code'])
                 
             return self._result()
         
-    def growth(self, year, quarter, retry=3, pause=0.001):
+    def growth(self, year, quarter, retry=3, pause=0.001, workers=8):
         """
         获取成长能力数据
         Parameters
@@ -207,6 +215,8 @@ class StockInfo(Base):
                      如遇网络等问题重复执行的次数 
         pause : int, 默认 0.001
                     重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题   
+        workers : int, 默认 8
+                    并发抓取分页的线程数
         Return
         --------
         DataFrame or List: [{'code':, 'name':, ...}, ...]
@@ -225,13 +235,12 @@ class StockInfo(Base):
             self._writeHead()
             
             # http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/grow/index.phtml?s_i=&s_a=&s_c=&reportdate=2018&quarter=3&p=1&num=60
-            self._data = self.__parsePage(cf.GROWTH_URL, year, quarter, 1, cf.GROWTH_COLS, pd.DataFrame(), retry, pause)
-            if self._data is not None:
-                self._data['code'] = self._data['code'].map(lambda x: str(x).zfill(6))
+            self._data = self.__parsePage(cf.GROWTH_URL, year, quarter, cf.GROWTH_COLS, retry, pause, workers)
+            self._data['code'] = Utility.codes(self._data['code'])
                  
             return self._result()
         
-    def debtPaying(self, year, quarter, retry=3, pause=0.001):
+    def debtPaying(self, year, quarter, retry=3, pause=0.001, workers=8):
         """
         获取偿债能力数据
         Parameters
@@ -243,6 +252,8 @@ class StockInfo(Base):
                      如遇网络等问题重复执行的次数 
         pause : int, 默认 0.001
                     重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题   
+        workers : int, 默认 8
+                    并发抓取分页的线程数
         Return
         --------
         DataFrame or List: [{'code':, 'name':, ...}, ...]
@@ -261,13 +272,12 @@ class StockInfo(Base):
             self._writeHead()
             
             # http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/debtpaying/index.phtml?s_i=&s_a=&s_c=&reportdate=2018&quarter=3&p=1&num=60
-            self._data = self.__parsePage(cf.DEBTPAYING_URL, year, quarter, 1, cf.DEBTPAYING_COLS, pd.DataFrame(), retry, pause)
-            if self._data is not None:
-                self._data['code'] = self._data['code'].map(lambda x: str(x).zfill(6))
+            self._data = self.__parsePage(cf.DEBTPAYING_URL, year, quarter, cf.DEBTPAYING_COLS, retry, pause, workers)
+            self._data['code'] = Utility.codes(self._data['code'])
                 
             return self._result()
         
-    def cashFlow(self, year, quarter, retry=3, pause=0.001):
+    def cashFlow(self, year, quarter, retry=3, pause=0.001, workers=8):
         """
         获取现金流量数据
         Parameters
@@ -279,6 +289,8 @@ class StockInfo(Base):
                      如遇网络等问题重复执行的次数 
         pause : int, 默认 0.001
                     重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题   
+        workers : int, 默认 8
+                    并发抓取分页的线程数
         Return
         --------
         DataFrame or List: [{'code':, 'name':, ...}, ...]
@@ -296,44 +308,56 @@ class StockInfo(Base):
             self._writeHead()
             
             # http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/cashflow/index.phtml?s_i=&s_a=&s_c=&reportdate=2018&quarter=3&p=1&num=60
-            self._data = self.__parsePage(cf.CASHFLOW_URL, year, quarter, 1, cf.CASHFLOW_COLS, pd.DataFrame(), retry, pause)
-            if self._data is not None:
-                self._data['code'] = self._data['code'].map(lambda x: str(x).zfill(6))
+            self._data = self.__parsePage(cf.CASHFLOW_URL, year, quarter, cf.CASHFLOW_COLS, retry, pause, workers)
+            self._data['code'] = Utility.codes(self._data['code'])
                 
             return self._result()
         
-    def __parsePage(self, url, year, quarter, page, column, dataArr, retry, pause, drop_column=None):
-        self._writeConsole()
+    def __parsePage(self, url, year, quarter, column, retry, pause, workers, drop_column=None):
+        """
+        抓取所有分页并按页码顺序合并
+        """
+        return self._collectPages(self.__iterPages(url, year, quarter, column, retry, pause, workers, drop_column), column)
+    
+    
+    def __iterPages(self, url, year, quarter, column, retry, pause, workers, drop_column=None):
+        """
+        抓取首页并由分页链接得到总页数，其余页面每批并发抓取workers页，按页码顺序产出，遇到空页即结束
+        """
+        df, pages = self.__handlePage(url, year, quarter, 1, column, retry, pause, drop_column)
+        if df is None:
+            return
+        yield df
+        fetched = 1
         
-        for _ in range(retry):
-            time.sleep(pause)
-            
-            try:
-                request = self._session.get( url % (year, quarter, page, cf.PAGE_NUM[1]), timeout=10 )
-                request.encoding = 'gbk'
-                text = request.text.replace('--', '')
-                html = lxml.html.parse(StringIO(text))
-                res = html.xpath("//table[@class=\"list_table\"]/tr")
-                if self._PY3:
-                    sarr = [etree.tostring(node).decode('utf-8') for node in res]
-                else:
-                    sarr = [etree.tostring(node) for node in res]
-                sarr = ''.join(sarr)
-                sarr = '<table>%s</table>'%sarr
-                df = pd.read_html(sarr)[0]
-                if drop_column is not None:
-                    df = df.drop(drop_column, axis=1)
-                df.columns = column
-                dataArr = dataArr.append(df, ignore_index=True)
-                nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-                if len(nextPage) > 0:
-                    page = re.findall(r'\d+', nextPage[0])[0]
-                    return self.__parsePage(url, year, quarter, page, column, dataArr, retry, pause, drop_column)
-                else:
-                    return dataArr
-            except Exception as e:
-                print(e)
-                
-        raise IOError(cf.NETWORK_URL_ERROR_MSG)
+        # 分页栏可能只显示部分页码，抓取完已知页后继续检查是否还有后续页
+        while pages > fetched:
+            window = list(range(fetched+1, min(pages, fetched+max(workers, 1))+1))
+            results = self._mapPages(lambda page: self.__handlePage(url, year, quarter, page, column, retry, pause, drop_column), 
+                                     window, workers)
+            fetched = window[-1]
+            pages = max([pages] + [res[1] for res in results])
+            for res in results:
+                if res[0] is None:
+                    return
+                yield res[0]
     
     
+    def __handlePage(self, url, year, quarter, page, column, retry, pause, drop_column=None):
+        self._writeConsole()
+        
+        def fetch():
+            html = self._getHtml(url % (year, quarter, page, cf.PAGE_NUM[1]), 'gbk', [('--', '')])
+            res = html.xpath("//table[@class=\"list_table\"]/tr")
+            df = self._parseTable(res)
+            if len(df) == 0:
+                return None, int(page)
+            if drop_column is not None:
+                df = df.drop(drop_column, axis=1)
+            df.columns = column
+            links = html.xpath('//div[@class=\"pages\"]/a/@onclick')
+            pages = [int(re.findall(r'\d+', link)[0]) for link in links if re.search(r'\d+', link)]
+            
+            return df, max(pages + [int(page)])
+        
+        return self._retry(fetch, retry, pause)
@@ -0,0 +1,154 @@
+# -*- coding:utf-8 -*-
+"""
+批量分笔数据下载类
+Created on 2026/10/18
+@group : GuGu
+"""
+
+import os
+import threading
+import pandas as pd
+from base import Base, cf
+from stockdata import StockData
+
+
+class TickJob(Base):
+    """
+    按 股票 x 交易日 批量下载历史分笔数据
+    每完成一个股票日即写入磁盘并记录到清单文件，中断后重新执行时跳过已完成的部分
+    """
+    def __init__(self, path, store=None, pandas=True, inter=True):
+        """
+        Parameters
+        ------
+            path: string
+                    分笔数据存储目录，按 path/code/date.pkl 保存
+            store: TickStore
+                    指定时分笔数据以紧凑格式写入该存储，path只保存清单文件
+        """
+        Base.__init__(self, pandas, inter)
+        self.__path = path
+        self.__store = store
+        self.__manifest = os.path.join(path, cf.TICK_JOB_MANIFEST)
+        self.__lock = threading.Lock()
+
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+
+    def run(self, codes, dates, workers=8, retry=3, pause=0.001):
+        """
+        下载分笔数据
+        Parameters
+        ------
+            codes : list
+                    股票代码列表
+            dates : list
+                    交易日列表 format：YYYY-MM-DD
+            workers : int, 默认 8
+                    并发下载的股票日数
+            retry : int, 默认 3
+                    如遇网络等问题重复执行的次数
+            pause : int, 默认 0
+                    重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
+        return
+        ------
+            DataFrame or list: [{'code':, 'date':, ...}, ...]
+                code: 股票代码
+                date: 日期
+                status: done 本次完成 / skipped 此前已完成 / failed 失败，下次执行时重试
+                rows: 分笔条数
+                error: 失败原因
+        """
+        self._data = pd.DataFrame()
+
+        done = self.done()
+        tasks = [(code, date) for code in codes for date in dates]
+
+        self._writeHead()
+
+        def fetch(task):
+            code, date = task
+            if task in done:
+                return [code, date, 'skipped', done[task], None]
+
+            self._writeConsole()
+            try:
+                data = StockData(code, inter=False).historyTicks(date, retry, pause, workers=1)
+                rows = self.__save(code, date, data)
+            except Exception as e:
+                return [code, date, 'failed', 0, str(e)]
+
+            return [code, date, 'done', rows, None]
+
+        self._data = pd.DataFrame(self._mapPages(fetch, tasks, workers), columns=cf.TICK_JOB_COLS)
+
+        return self._result()
+
+
+    def done(self):
+        """
+        读取清单中已完成的股票日
+        return
+        ------
+            dict {(code, date): 分笔条数}
+        """
+        done = {}
+        if not os.path.exists(self.__manifest):
+            return done
+
+        with open(self.__manifest) as f:
+            for line in f:
+                fields = line.strip().split(',')
+                if len(fields) == 3:
+                    done[(fields[0], fields[1])] = int(fields[2])
+
+        return done
+
+
+    def read(self, code, date):
+        """
+        读取已下载的分笔数据
+        return
+        ------
+            DataFrame or None 无数据（如停牌）时返回None
+        """
+        if self.__store is not None:
+            return self.__store.read(code, date, decode=True)
+
+        filename = self.__file(code, date)
+        if not os.path.exists(filename):
+            return None
+
+        return pd.read_pickle(filename)
+
+
+    def __save(self, code, date, data):
+        rows = 0
+        if self.__store is not None:
+            self.__store.write(code, date, data)
+            rows = 0 if data is None else len(data)
+        elif data is not None and len(data) > 0:
+            data = pd.DataFrame(data)
+            rows = len(data)
+            filename = self.__file(code, date)
+            folder = os.path.dirname(filename)
+            with self.__lock:
+                if not os.path.exists(folder):
+                    os.makedirs(folder)
+            data.to_pickle(filename + '.tmp')
+            if os.path.exists(filename):
+                os.remove(filename)
+            os.rename(filename + '.tmp', filename)
+
+        # 数据文件写入完成后再记入清单，中断时未记录的股票日会重新下载
+        with self.__lock:
+            with open(self.__manifest, 'a') as f:
+                f.write('%s,%s,%s\n' % (code, date, rows))
+                f.flush()
+
+        return rows
+
+
+    def __file(self, code, date):
+        return os.path.join(self.__path, code, '%s.pkl' % date)
@@ -0,0 +1,196 @@
+# -*- coding:utf-8 -*-
+"""
+分笔数据紧凑存储类
+Created on 2026/10/18
+@group : GuGu
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+import config as cf
+
+
+class TickStore():
+    """
+    分笔数据按股票分目录、按列保存为定长二进制文件，读取时内存映射，只加载所需的交易日
+        time:   int32 距开盘(09:30:00)的秒数，集合竞价为负数
+        price:  int32 价格 x cf.TICK_PRICE_SCALE
+        volume: int64 成交量(手)
+        amount: int64 成交金额(元)
+        side:   int8  买卖类型 1 买盘 / -1 卖盘 / 0 中性盘
+    每个股票目录下的 index.csv 记录 date,start,count，数据先写入列文件再登记索引
+    """
+    def __init__(self, path):
+        """
+        Parameters
+        ------
+            path: string
+                    本地存储目录
+        """
+        self.__path = path
+        self.__lock = threading.Lock()
+
+
+    @staticmethod
+    def encode(data):
+        """
+        将historyTicks/todayTicks返回的数据转换为定长数组
+        return
+        ------
+            dict {列名: numpy数组}
+        """
+        data = pd.DataFrame(data)
+
+        times = data['time'].astype(str).str.split(':', expand=True).astype(np.int32)
+        seconds = times[0] * 3600 + times[1] * 60 + times[2] - cf.TICK_OPEN_SECONDS
+        price = np.round(pd.to_numeric(data['price']).values * cf.TICK_PRICE_SCALE)
+        side = data['type'].map(cf.TICK_SIDES).fillna(0)
+
+        return {'time': seconds.values.astype(np.int32),
+                'price': price.astype(np.int32),
+                'volume': pd.to_numeric(data['volume']).values.astype(np.int64),
+                'amount': np.round(pd.to_numeric(data['amount']).values).astype(np.int64),
+                'side': side.values.astype(np.int8)}
+
+
+    @staticmethod
+    def decode(data):
+        """
+        将定长数组还原为historyTicks格式的字段：成交时间、成交价格、成交手、成交金额(元)、买卖类型
+        """
+        seconds = data['time'].astype(np.int64) + cf.TICK_OPEN_SECONDS
+        times = ['%02d:%02d:%02d' % (s // 3600, s // 60 % 60, s % 60) for s in seconds]
+        sides = dict((v, k) for k, v in cf.TICK_SIDES.items())
+
+        result = pd.DataFrame({'time': times,
+                               'price': data['price'] / float(cf.TICK_PRICE_SCALE),
+                               'volume': data['volume'],
+                               'amount': data['amount'],
+                               'type': [sides[s] for s in data['side']]},
+                              columns=['time', 'price', 'volume', 'amount', 'type'])
+        if 'date' in data:
+            result.insert(0, 'date', data['date'])
+
+        return result
+
+
+    def write(self, code, date, data):
+        """
+        保存一个交易日的分笔数据，已存在的交易日将被替换
+        Parameters
+        ------
+            code: string 股票代码
+            date: string 日期 format：YYYY-MM-DD
+            data: DataFrame historyTicks/todayTicks返回的数据
+        """
+        if data is None or len(data) == 0:
+            return
+
+        arrays = self.encode(data)
+
+        with self.__lock:
+            folder = os.path.join(self.__path, code)
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+
+            index = self.__readIndex(code)
+            if date in index:
+                self.__compact(code, index, date)
+                index = self.__readIndex(code)
+
+            start = max([s + c for s, c in index.values()] or [0])
+            for name, dtype in cf.TICK_STORE_COLS:
+                filename = self.__file(code, name)
+                # 截掉上次中断时未登记索引的数据
+                with open(filename, 'ab') as f:
+                    f.truncate(start * np.dtype(dtype).itemsize)
+                    f.write(arrays[name].astype(dtype).tobytes())
+
+            with open(self.__file(code, 'index.csv'), 'a') as f:
+                f.write('%s,%s,%s\n' % (date, start, len(arrays['time'])))
+
+
+    def dates(self, code):
+        """
+        获取已保存的交易日列表
+        """
+        return sorted(self.__readIndex(code).keys())
+
+
+    def read(self, code, date=None, start=None, end=None, decode=False):
+        """
+        读取分笔数据
+        Parameters
+        ------
+            code: string 股票代码
+            date: string 日期 format：YYYY-MM-DD，指定时只读取该交易日
+            start: string 开始日期，为空时不限
+            end: string 结束日期，为空时不限
+            decode: bool, 默认 False
+                    为True时还原为成交时间字符串、浮点价格和中文买卖类型
+        return
+        ------
+            DataFrame 属性：date(int32 YYYYMMDD)、time、price、volume、amount、side，无数据时返回None
+        """
+        index = self.__readIndex(code)
+        if date is not None:
+            start = end = date
+
+        days = [d for d in sorted(index) if (start is None or d >= start) and (end is None or d <= end)]
+        if not days:
+            return None
+
+        data = {}
+        for name, dtype in cf.TICK_STORE_COLS:
+            mm = np.memmap(self.__file(code, name), dtype=dtype, mode='r')
+            data[name] = np.concatenate([mm[index[d][0]:index[d][0] + index[d][1]] for d in days])
+        data['date'] = np.repeat(np.array([int(d.replace('-', '')) for d in days], dtype=np.int32),
+                                 [index[d][1] for d in days])
+
+        if decode:
+            return self.decode(data)
+
+        return pd.DataFrame(data, columns=['date'] + [name for name, _ in cf.TICK_STORE_COLS])
+
+
+    def __compact(self, code, index, drop):
+        days = sorted(d for d in index if d != drop)
+        columns = {}
+        for name, dtype in cf.TICK_STORE_COLS:
+            mm = np.memmap(self.__file(code, name), dtype=dtype, mode='r')
+            columns[name] = [np.array(mm[index[d][0]:index[d][0] + index[d][1]]) for d in days]
+            del mm
+
+        lines = []
+        start = 0
+        for d in days:
+            lines.append('%s,%s,%s\n' % (d, start, index[d][1]))
+            start += index[d][1]
+
+        for name, dtype in cf.TICK_STORE_COLS:
+            with open(self.__file(code, name), 'wb') as f:
+                for arr in columns[name]:
+                    f.write(arr.tobytes())
+        with open(self.__file(code, 'index.csv'), 'w') as f:
+            f.writelines(lines)
+
+
+    def __readIndex(self, code):
+        index = {}
+        filename = self.__file(code, 'index.csv')
+        if not os.path.exists(filename):
+            return index
+
+        with open(filename) as f:
+            for line in f:
+                fields = line.strip().split(',')
+                if len(fields) == 3:
+                    index[fields[0]] = (int(fields[1]), int(fields[2]))
+
+        return index
+
+
+    def __file(self, code, name):
+        return os.path.join(self.__path, code, name)
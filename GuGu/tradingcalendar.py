@@ -0,0 +1,225 @@
+# -*- coding:utf-8 -*-
+"""
+交易日历类
+Created on 2026/10/18
+@group : GuGu
+"""
+
+import datetime
+import warnings
+import numpy as np
+import config as cf
+
+_STR_TYPES = (str, type(u''))
+
+
+class TradingCalendar():
+    """
+    基于内置休市日表（cf.HOLIDAYS）的沪深交易日历，不访问网络
+    单个日期的判断结果按日期缓存，日期数组的运算使用numpy工作日函数
+    休市日表未覆盖的年份只排除周末，并对每个未覆盖的年份给出一次警告
+    """
+    def __init__(self, holidays=None, path=None):
+        """
+        Parameters
+        ------
+            holidays: list
+                    追加的休市日 format：YYYY-MM-DD
+            path: string
+                    追加休市日的文本文件，每行一个日期 format：YYYY-MM-DD
+        """
+        self.__holidays = set()
+        self.__years = set(cf.HOLIDAYS)
+        self.__warned = set()
+        for year, days in cf.HOLIDAYS.items():
+            self.__holidays.update('%s-%s' % (year, day) for day in days.split())
+
+        self.addHolidays(holidays or [])
+        if path is not None:
+            with open(path) as f:
+                self.addHolidays([line.strip() for line in f if line.strip()])
+
+
+    def addHolidays(self, dates):
+        """
+        追加休市日，用于更新内置休市日表，所涉年份视为已覆盖
+        Parameters
+        ------
+            dates: list 日期列表 format：YYYY-MM-DD
+        """
+        dates = [str(date)[:10] for date in dates]
+        self.__holidays.update(dates)
+        self.__years.update(int(date[:4]) for date in dates)
+        self.__busday = np.busdaycalendar(weekmask='1111100',
+                                          holidays=np.array(sorted(self.__holidays), dtype='datetime64[D]'))
+        self.__cache = {}
+
+
+    def holidays(self):
+        """
+        获取所有休市日（不含周末）
+        return
+        ------
+            list 日期列表 format：YYYY-MM-DD
+        """
+        return sorted(self.__holidays)
+
+
+    def covers(self, date=None):
+        """
+        休市日表是否覆盖指定日期所在年份
+        Parameters
+        ------
+            date: string
+                format：YYYY-MM-DD 为空时取当前日期
+        return
+        ------
+            True or False
+        """
+        if date is None:
+            date = str(datetime.date.today())
+
+        return int(str(date)[:4]) in self.__years
+
+
+    def isTradeDay(self, date=None):
+        """
+        交易日判断
+        Parameters
+        ------
+            date: string or 日期数组
+                查询日期 format：YYYY-MM-DD 为空时取当前日期
+        return
+        ------
+            True or False，传入数组时返回bool数组
+        """
+        if date is None:
+            date = str(datetime.date.today())
+
+        if isinstance(date, _STR_TYPES):
+            trade = self.__cache.get(date)
+            if trade is None:
+                self.__check(np.datetime64(date, 'D'))
+                trade = bool(np.is_busday(np.datetime64(date, 'D'), busdaycal=self.__busday))
+                self.__cache[date] = trade
+            return trade
+
+        days = self.__toArray(date)
+        self.__check(days)
+
+        return np.is_busday(days, busdaycal=self.__busday)
+
+
+    def previousTradeDay(self, date=None, n=1):
+        """
+        获取指定日期之前第n个交易日
+        Parameters
+        ------
+            date: string or 日期数组
+                format：YYYY-MM-DD 为空时取当前日期
+            n: int, 默认 1
+        return
+        ------
+            string format：YYYY-MM-DD，传入数组时返回datetime64[D]数组
+        """
+        return self.__offset(date, -n, 'forward')
+
+
+    def nextTradeDay(self, date=None, n=1):
+        """
+        获取指定日期之后第n个交易日
+        Parameters
+        ------
+            date: string or 日期数组
+                format：YYYY-MM-DD 为空时取当前日期
+            n: int, 默认 1
+        return
+        ------
+            string format：YYYY-MM-DD，传入数组时返回datetime64[D]数组
+        """
+        return self.__offset(date, n, 'backward')
+
+
+    def tradeDays(self, start, end):
+        """
+        获取区间内的所有交易日（含首尾）
+        Parameters
+        ------
+            start: string 开始日期 format：YYYY-MM-DD
+            end: string 结束日期 format：YYYY-MM-DD
+        return
+        ------
+            list 日期列表 format：YYYY-MM-DD
+        """
+        days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+        self.__check(days)
+        days = days[np.is_busday(days, busdaycal=self.__busday)]
+
+        return [str(day) for day in days]
+
+
+    def countTradeDays(self, start, end):
+        """
+        统计区间内的交易日数（含首尾）
+        Parameters
+        ------
+            start: string or 日期数组
+            end: string or 日期数组
+        return
+        ------
+            int，传入数组时返回int数组
+        """
+        start, end = self.__toArray(start), self.__toArray(end)
+        self.__check(start)
+        self.__check(end)
+        count = np.busday_count(start, end + 1, busdaycal=self.__busday)
+
+        return int(count) if np.ndim(count) == 0 else count
+
+
+    def __offset(self, date, n, roll):
+        if date is None:
+            date = str(datetime.date.today())
+
+        days = np.busday_offset(self.__toArray(date), n, roll=roll, busdaycal=self.__busday)
+        self.__check(days)
+
+        return str(days) if isinstance(date, _STR_TYPES) else days
+
+
+    def __check(self, days):
+        """
+        对未覆盖且尚未警告过的年份给出警告（区间两端之间的年份一并检查）
+        """
+        days = np.asarray(days, dtype='datetime64[D]')
+        if days.size == 0:
+            return
+
+        first, last = [int(str(day)[:4]) for day in (days.min(), days.max())]
+        for year in range(first, last + 1):
+            if year not in self.__years and year not in self.__warned:
+                self.__warned.add(year)
+                warnings.warn(cf.CALENDAR_UNCOVERED_MSG % year, stacklevel=3)
+
+
+    @staticmethod
+    def __toArray(date):
+        if isinstance(date, _STR_TYPES):
+            return np.datetime64(date, 'D')
+
+        return np.asarray(date, dtype='datetime64[D]')
+
+
+_calendar = None
+
+
+def getCalendar():
+    """
+    获取进程内共用的交易日历
+    """
+    global _calendar
+
+    if _calendar is None:
+        _calendar = TradingCalendar()
+
+    return _calendar
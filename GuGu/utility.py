@@ -7,20 +7,74 @@ Created on 2019/01/15
 @contact: 16621596@qq.com
 """
 
+import re
 import datetime
 import json
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
+import numpy as np
+import pandas as pd
 import config as cf
+from base import Base
+from tradingcalendar import getCalendar
+
+# JS对象字面量的词法单元：双引号字符串原样保留，单引号字符串、裸标识符及 .5 / 5. 形式的数字需转换，末尾多余的逗号去掉
+_JS_TOKEN = re.compile(r'''"(?:[^"\\]|\\.)*"|'((?:[^'\\]|\\.)*)'|(-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|([A-Za-z_$][\w$]*)|,\s*(?=[}\]])''', re.S)
+_JS_ESCAPE = re.compile(r'\\(.)|"', re.S)
+_JS_VAR = re.compile(r'^\s*var\s+[\w$]+\s*=\s*')
+_JS_LITERALS = ('true', 'false', 'null', 'NaN', 'Infinity')
+
+
+def _jsEscape(match):
+    if match.group(1) is None:
+        return '\\"'
+    
+    return "'" if match.group(1) == "'" else match.group(0)
+
+
+def _jsNumber(number):
+    """
+    补全 .5、5.、-.5e3 形式的数字，使其符合JSON
+    """
+    mantissa, e, exp = number.partition('e') if 'e' in number else number.partition('E')
+    sign = '-' if mantissa[0] == '-' else ''
+    mantissa = mantissa.lstrip('-')
+    if mantissa[0] == '.':
+        mantissa = '0' + mantissa
+    if mantissa[-1] == '.':
+        mantissa += '0'
+        
+    return sign + mantissa + e + exp
+
+
+def _jsToken(match):
+    kind = match.lastindex
+    if kind is None:
+        # 双引号字符串或末尾逗号
+        return '' if match.group(0)[0] == ',' else match.group(0)
+    elif kind == 1:
+        return '"%s"' % _JS_ESCAPE.sub(_jsEscape, match.group(1))
+    elif kind == 2:
+        number = match.group(2)
+        return _jsNumber(number) if '.' in number else number
+    elif match.group(3) in _JS_LITERALS:
+        return match.group(3)
+    else:
+        return '"%s"' % match.group(3)
+    
 
 class Utility():
     @staticmethod    
     def str2Dict(string):
-        string = eval(string, type('Dummy', (dict,), dict(__getitem__ = lambda s, n:n))())
-        string = json.dumps(string)
+        """
+        解析接口返回的JS对象字面量（裸键名、单引号字符串、var x= 前缀），不执行eval
+        裸标识符解析为同名字符串，true/false/null 解析为 True/False/None
+        """
+        string = _JS_VAR.sub('', string).strip().rstrip(';')
         
-        return json.loads(string)
+        # 已是JSON时由json.loads直接解析；裸键名等在首个非JSON字符处即失败，再经词法单元一次转换
+        try:
+            return json.loads(string)
+        except ValueError:
+            return json.loads(_JS_TOKEN.sub(_jsToken, string))
     
     
     @staticmethod
@@ -51,9 +105,90 @@ class Utility():
         elif len(code) != 6 :
             return ''
         else:
-            return 'sh%s' % code if code[:1] in ['5', '6', '9'] else 'sz%s' % code 
+            return 'sh%s' % code if code[:1] in cf.SH_CODE_PREFIX else 'sz%s' % code
+        
+        
+    @staticmethod
+    def codes(codes):
+        """
+        批量规范化股票代码为6位数字字符串，支持整数、浮点数及带交易所前后缀的代码 e.g. 1、'sh600000'、'000001.SZ'
+        Parameters
+        ------
+            codes: list、numpy数组或Series
+        return
+        ------
+            numpy数组，传入Series时返回同索引的Series，无法识别的代码为空字符串
+        """
+        values = np.asarray(codes)
+        
+        if values.dtype.kind in 'iuf':
+            # 直接按位计算数字字符，避免逐个格式化；负数及超过6位的数字无法识别
+            missing = np.isnan(values) if values.dtype.kind == 'f' else np.zeros(values.shape, dtype=bool)
+            missing |= (values < 0) | (values >= 10 ** len(cf.CODE_DIGITS))
+            digits = np.where(missing, 0, values).astype(np.int64).reshape(-1, 1) // cf.CODE_DIGITS % 10 + ord('0')
+            result = np.ascontiguousarray(digits.astype(np.uint32)).view('U6').reshape(values.shape)
+            result[missing] = ''
+        else:
+            result = values.astype('U')
+            # 已是6位数字的代码直接使用，其余用正则提取不超过6位的独立数字串后补零
+            valid = (np.char.str_len(result) == 6) & np.char.isdigit(result)
+            if not valid.all():
+                fixed = pd.Series(result[~valid], dtype=object).str.extract(cf.CODE_PATTERN, expand=False)
+                result = result.astype('U6')
+                result[~valid] = fixed.str.zfill(6).fillna('').values
+            result = result.astype('U6')
         
+        if isinstance(codes, pd.Series):
+            return pd.Series(result, index=codes.index, name=codes.name)
         
+        return result
+    
+    
+    @staticmethod
+    def exchanges(codes):
+        """
+        批量获取股票代码所属交易所，规则同 Utility.symbol
+        return
+        ------
+            numpy数组 sh 上交所 / sz 深交所 / 空字符串 无法识别
+        """
+        codes = Utility.codes(np.asarray(codes))
+        first = codes.astype('U1')
+        
+        return np.where(codes == '', '', np.where(np.isin(first, cf.SH_CODE_PREFIX), 'sh', 'sz'))
+    
+    
+    @staticmethod
+    def symbols(codes, index=False):
+        """
+        批量生成symbol代码标志，一次数组运算完成，结果同逐个调用 Utility.symbol
+        Parameters
+        ------
+            codes: list、numpy数组或Series
+                    股票代码，可包含 cf.INDEX_LABELS 中的指数简称
+            index: bool, 默认 False
+                    为True时按 cf.INDEX_SYMBOL 查找指数代码
+        return
+        ------
+            numpy数组 e.g. sh600000，无法识别的代码为空字符串
+        """
+        raw = np.asarray(codes)
+        normalized = Utility.codes(raw)
+        
+        if index:
+            result = pd.Series(normalized).map(cf.INDEX_SYMBOL).fillna('').values.astype('U')
+        else:
+            result = np.char.add(Utility.exchanges(normalized), normalized)
+        
+        if raw.dtype.kind not in 'iuf':
+            labels = np.isin(raw, cf.INDEX_LABELS)
+            if labels.any():
+                result = result.astype('U8')
+                result[labels] = [cf.INDEX_LIST[label] for label in raw[labels]]
+        
+        return result.astype('U')
+    
+    
     @staticmethod
     def random(n=13):
         from random import randint
@@ -124,52 +259,49 @@ class Utility():
     
     @staticmethod
     def lastTradeDate():
-        today = datetime.datetime.today().date()
-        today=int(today.strftime("%w"))
-        
-        if today == 0:
-            return Utility.getTodayHistory(-2)
-        elif today == 1:
-            return Utility.getTodayHistory(-3)
-        else:
-            return Utility.getTodayHistory(-1)
+        """
+        获取当前日期之前的最近一个交易日
+        return
+        ------
+            string format：YYYY-MM-DD
+        """
+        return getCalendar().previousTradeDay(Utility.getToday())
         
         
     @staticmethod
-    def isHoliday(date=str(datetime.datetime.today().date())):
+    def isHoliday(date=None, retry=3, pause=0.001):
         """
         节假日判断
         Parameters
         ------
             date: string
                 查询日期 format：YYYY-MM-DD 为空时取当前日期
+            retry: int, 默认 3
+                如遇网络等问题重复执行的次数
+            pause: float, 默认 0.001
+                重复请求数据过程中暂停的秒数
         return
         ------
-            True or False
+            True or False，查询失败时抛出异常
         """
-        session = requests.Session()
-        retry = Retry(connect=5, backoff_factor=1)
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount('http://', adapter)
-        session.keep_alive = False
+        date = Utility.getToday() if date is None else date
         
-        try:
-            request = session.get( cf.HOLIDAY_URL % date, timeout=10 )
-            dataDict = json.loads(request.text)
-            if dataDict['code'] != 0:
-                raise IOError(cf.HOLIDAY_SERVE_ERR)
-            elif dataDict['holiday'] is None:
-                return False
-            else:
-                return True
-        except Exception as e:
-                print(e)
+        def fetch():
+            request = Base.getSession().get( cf.HOLIDAY_URL % date, timeout=10 )
+            
+            return json.loads(request.text)
+        
+        dataDict = Base.getRetrier().run(fetch, retry, pause)
+        if dataDict['code'] != 0:
+            raise IOError(cf.HOLIDAY_SERVE_ERR)
+        
+        return dataDict['holiday'] is not None
     
     
     @staticmethod
-    def isTradeDay(date=str(datetime.datetime.today().date())):
+    def isTradeDay(date=None):
         """
-        交易日判断
+        交易日判断，使用内置休市日表，不访问网络；休市日表未覆盖的年份只排除周末并给出警告
         Parameters
         ------
             date: string
@@ -178,11 +310,4 @@ class Utility():
         ------
             True or False
         """
-        date = datetime.datetime.strptime(date, '%Y-%m-%d')
-        w = int(date.strftime('%w'))
-        
-        if w in [6, 0]:
-            return False
-        else: 
-            return not Utility.isHoliday(date)
-        
+        return getCalendar().isTradeDay(date)
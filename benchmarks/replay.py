@@ -0,0 +1,158 @@
+# -*- coding:utf-8 -*-
+"""
+接口解析与组装性能测试：在固定fixture上回放，不访问网络
+运行：python benchmarks/replay.py [-n 次数] [--fixtures 目录] [--server]
+    默认在临时目录生成各接口格式的合成fixture
+    --fixtures 使用 Recorder(path, 'record') 录制的真实响应（需包含下列用例的URL）
+    --server   经本地桩服务器(FixtureServer)以HTTP代理方式回放，https接口的用例跳过
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'GuGu'))
+
+import config as cf
+from base import Base
+from recorder import Recorder, FixtureServer
+from stockdata import StockData
+from marketdata import MarketData
+from stockinfo import StockInfo
+from lowriskintarb import LowRiskIntArb
+from billboard import BillBoard
+
+
+CODES = ['%06d' % (600000 + i) for i in range(400)] + ['%06d' % (1 + i) for i in range(400)]
+TICK_DATE = '2019-01-25'
+LHB_DATE = '2019-01-10'
+
+
+def historyFixtures(recorder):
+    rows = ','.join(['["%s","%.2f","%.2f","%.2f","%.2f","%d.000"]' %
+                     ('20%02d-%02d-%02d' % (10 + i // 240, i // 20 % 12 + 1, i % 20 + 1), 10 + i % 7 * 0.1, 10.05 + i % 5 * 0.1,
+                      10.3 + i % 3 * 0.1, 9.8 - i % 4 * 0.1, 100000 + i) for i in range(640)])
+    text = 'kline_dayqfq={"code":0,"msg":"","data":{"sh600000":{"qfqday":[%s],"qt":{}}}}' % rows
+    recorder.save(cf.HISTORY_URL % ('fq', 'qfq', 'sh600000', 'day', '', '', 'qfq', '0'), text)
+
+
+def realtimeFixtures(recorder):
+    lines = []
+    symbols = []
+    for code in CODES:
+        symbol = ('sh%s' if code[0] in cf.SH_CODE_PREFIX else 'sz%s') % code
+        symbols.append(symbol)
+        fields = ['name%s' % code] + ['%.2f' % (10 + i * 0.01) for i in range(7)] + ['1234500', '12345678.90']
+        fields += ['%d00' % (i + 1) if i % 2 == 0 else '%.2f' % (10 - i * 0.01) for i in range(20)]
+        fields += ['2019-01-25', '15:00:00', '00']
+        lines.append('var hq_str_%s="%s";' % (symbol, ','.join(fields)))
+    recorder.save(cf.LIVE_DATA_URL % ('0', ','.join(symbols)), '\n'.join(lines).encode('gbk'))
+
+
+def latestFixtures(recorder):
+    count = 400
+    recorder.save(cf.LATEST_COUNT_URL, '"%s"' % count)
+    for page in range(1, count // cf.LATEST_PAGE_SIZE + 1):
+        items = ['{symbol:"sh%s",code:"%s",name:"n%s",trade:"10.10",pricechange:"0.10",changepercent:"1.0",'
+                 'buy:"10.09",sell:"10.10",settlement:"10.00",open:"10.00",high:"10.20",low:"9.90",volume:1234500,'
+                 'amount:12345678,ticktime:"15:00:00",per:12.3,pb:1.2,mktcap:1234567.8,nmc:1234567.8,turnoverratio:0.5}' %
+                 (code, code, code) for code in CODES[(page - 1) * cf.LATEST_PAGE_SIZE:page * cf.LATEST_PAGE_SIZE]]
+        recorder.save(cf.LATEST_URL % (cf.LATEST_PAGE_SIZE, page), ('[%s]' % ','.join(items)).encode('gbk'))
+
+
+def ticksFixtures(recorder, pages=20):
+    html = u'<html><head><meta http-equiv="Content-Type" content="text/html; charset=gbk"></head><body>' \
+           u'<table id="datatbl"><thead><tr><th>成交时间</th><th>成交价</th></tr></thead><tbody>%s</tbody></table></body></html>'
+    for page in range(1, pages + 17):
+        rows = ''
+        if page <= pages:
+            rows = ''.join([u'<tr><th>%02d:%02d:%02d</th><td>10.%02d</td><td>%s</td><td>%d</td><td>%d</td><th><h6>%s</h6></th></tr>' %
+                            (14 - page // 5, 59 - i // 20, 59 - i % 60, i % 100, '--' if i % 9 == 0 else '0.01', 100 + i, 101000 + i,
+                             [u'买盘', u'卖盘', u'中性盘'][i % 3]) for i in range(60)])
+        recorder.save(cf.HISTORY_TICKS_URL % (TICK_DATE, 'sh600000', page), (html % rows).encode('gbk'))
+
+
+def reportFixtures(recorder, pages=10):
+    links = ''.join([u'<a onclick="set_page_num(\'%s\')">%s</a>' % (page, page) for page in range(1, pages + 1)])
+    for page in range(1, pages + 1):
+        rows = ''.join([u'<tr><td>%06d</td><td>名称%s</td><td>0.%02d</td><td>1.5</td><td>5.2</td><td>10.1</td><td>0.3</td>'
+                        u'<td>12,345.6</td><td>3.2</td><td>10派1</td><td>2018-10-30</td><td>详细</td></tr>' % (page * 100 + i, i, i) for i in range(60)])
+        html = u'<html><body><table class="list_table"><tr><th>股票代码</th></tr>%s</table><div class="pages">%s</div></body></html>' % (rows, links)
+        recorder.save(cf.REPORT_URL % (2018, 3, page, cf.PAGE_NUM[1]), html.encode('gbk'))
+
+
+def conBondsFixtures(recorder, pages=5):
+    for page in range(1, pages + 2):
+        rows = []
+        if page <= pages:
+            for i in range(50):
+                cell = dict((col, '%s.%s' % (page, i)) for col in cf.CON_BONDS_COLS)
+                cell['bond_nm'] = u'转债%s' % i
+                cell['premium_rt'] = '12.3%'
+                rows.append({'id': '%s%02d' % (page, i), 'cell': cell})
+        recorder.save(cf.CON_BONDS_URL % page, json.dumps({'page': min(page, pages), 'rows': rows, 'total': pages * 50}))
+
+
+def topListFixtures(recorder):
+    data = [dict(zip(cf.LHB_TMP_COLS, ['%06d' % i, u'名称%s' % i, '5.1', '123456789', '23456789', '12345678',
+                                       u'日涨幅偏离值达7%', '987654321', u'解读%s' % i])) for i in range(150)]
+    text = u'var data_tab_1=%s' % json.dumps({'success': True, 'pages': 1, 'data': data})
+    recorder.save(cf.LHB_URL % (LHB_DATE, LHB_DATE), text.encode('gbk'))
+
+
+# (名称, 生成fixture, 调用, 是否https接口)
+CASES = [
+    ('history', historyFixtures, lambda: StockData('600000', inter=False).history(), False),
+    ('realtime', realtimeFixtures, lambda: StockData(CODES, inter=False).realtime(), False),
+    ('latest', latestFixtures, lambda: MarketData(inter=False).latest(), False),
+    ('historyTicks', ticksFixtures, lambda: StockData('600000', inter=False).historyTicks(TICK_DATE), False),
+    ('report', reportFixtures, lambda: StockInfo(inter=False).report(2018, 3), False),
+    ('conBonds', conBondsFixtures, lambda: LowRiskIntArb(inter=False).conBonds(), True),
+    ('topList', topListFixtures, lambda: BillBoard(inter=False).topList(LHB_DATE), False),
+]
+
+
+def run(number, path, server):
+    recorder = Recorder(path, 'replay')
+
+    if server:
+        address = FixtureServer(recorder).start()
+        os.environ['http_proxy'] = address
+        # 桩服务器不需要限流
+        Base.setRateLimiter(None)
+    else:
+        Base.setRecorder(recorder)
+
+    for name, _, func, https in CASES:
+        if server and https:
+            print('%-14s skipped (https)' % name)
+            continue
+
+        data = func()
+        rows = 0 if data is None else len(data)
+        seconds = timeit.timeit(func, number=number)
+        print('%-14s %10.2f ms   rows: %s' % (name, seconds / number * 1000, rows))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--number', type=int, default=20)
+    parser.add_argument('--fixtures', default=None)
+    parser.add_argument('--server', action='store_true')
+    args = parser.parse_args()
+
+    if args.fixtures is not None:
+        run(args.number, args.fixtures, args.server)
+    else:
+        path = tempfile.mkdtemp()
+        try:
+            recorder = Recorder(path, 'record')
+            for _, build, _, _ in CASES:
+                build(recorder)
+            run(args.number, path, args.server)
+        finally:
+            shutil.rmtree(path)
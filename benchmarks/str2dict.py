@@ -0,0 +1,49 @@
+# -*- coding:utf-8 -*-
+"""
+Utility.str2Dict 性能测试：对比原eval实现与词法解析实现
+运行：python benchmarks/str2dict.py
+"""
+
+import os
+import sys
+import json
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'GuGu'))
+
+from utility import Utility
+
+
+def evalStr2Dict(string):
+    """
+    原实现：eval后再经json.dumps/json.loads转换
+    """
+    string = eval(string, type('Dummy', (dict,), dict(__getitem__ = lambda s, n:n))())
+    string = json.dumps(string)
+    
+    return json.loads(string)
+
+
+# 融资融券接口格式（键名已加引号）
+MARGINS = '{"pages":40,"data":[%s]}' % ','.join(
+    ['{"tdate":"2019-01-%02d","close":2580.12,"zdf":0.51,"rzye":"523412345678","rzyezb":2.13,'
+     '"rzmre":"23412345678","rzche":"22412345678","rqye":"2341234567","rzrqye":"525753580245"}' % (i % 28 + 1)
+     for i in range(50)])
+
+# 分笔分页接口格式（裸键名、单引号）
+TICK_PAGES = "{detailPages:[%s],total:%s}" % (','.join(
+    ["['%s','09:%02d:00','10:%02d:00']" % (i, i % 60, i % 60) for i in range(60)]), 60)
+
+
+def run(name, text, number=2000):
+    assert evalStr2Dict(text) == Utility.str2Dict(text)
+    
+    old = timeit.timeit(lambda: evalStr2Dict(text), number=number)
+    new = timeit.timeit(lambda: Utility.str2Dict(text), number=number)
+    print('%-12s eval: %8.2f us   str2Dict: %8.2f us   x%.1f' % 
+          (name, old / number * 1e6, new / number * 1e6, old / new))
+
+
+if __name__ == '__main__':
+    run('margins', MARGINS)
+    run('tick pages', TICK_PAGES)
@@ -0,0 +1,23 @@
+# -*- coding:utf-8 -*-
+"""
+测试公共配置：模块按GuGu目录内的隐式导入方式加载，同benchmarks/replay.py
+"""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'GuGu'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import pytest
+from base import Base
+
+
+@pytest.fixture(autouse=True)
+def offline():
+    """
+    每个用例结束后撤销录制回放设置，避免影响其它用例
+    """
+    yield
+    Base.setRecorder(None)
@@ -0,0 +1,31 @@
+# -*- coding:utf-8 -*-
+"""
+Cache 磁盘缓存的并发写入
+"""
+
+import os
+import threading
+
+from cache import Cache
+
+
+def test_concurrent_set(tmp_path):
+    caches = [Cache(path=str(tmp_path)) for _ in range(4)]
+    values = ['x%s' % i * 100000 for i in range(len(caches))]
+    errors = []
+
+    def write(i):
+        try:
+            for _ in range(20):
+                caches[i].set('http://a/b', values[i], 60)
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(len(caches))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert Cache(path=str(tmp_path)).get('http://a/b') in values
+    assert [name for name in os.listdir(str(tmp_path)) if name.endswith('.tmp')] == []
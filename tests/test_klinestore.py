@@ -0,0 +1,125 @@
+# -*- coding:utf-8 -*-
+"""
+KlineStore 存取及 StockData.history 的增量更新
+"""
+
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+import klinestore
+from klinestore import KlineStore
+from stockdata import StockData
+
+
+def bars(dates, closes):
+    return pd.DataFrame({'date': dates, 'open': 1.0, 'close': closes, 'high': 1.0, 'low': 1.0,
+                         'volume': 100.0, 'code': '600000'})
+
+
+@pytest.mark.parametrize('fmt', ['pickle', pytest.param('parquet', marks=pytest.mark.skipif(
+    not klinestore._PARQUET, reason='pyarrow not installed'))])
+def test_roundtrip(tmp_path, fmt):
+    store = KlineStore(str(tmp_path), fmt)
+    data = bars(['2026-10-15', '2026-10-16'], [1.0, 2.0])
+
+    assert store.read('600000', 'D', 'qfq') is None
+    store.write('600000', 'D', 'qfq', data)
+    store.write('600000', 'D', 'qfq', data.iloc[:1])
+
+    assert store.read('600000', 'D', 'qfq').equals(data.iloc[:1])
+    store.remove('600000', 'D', 'qfq')
+    assert store.read('600000', 'D', 'qfq') is None
+
+
+def test_concurrent_writes(tmp_path):
+    stores = [KlineStore(str(tmp_path), 'pickle') for _ in range(4)]
+    frames = [bars(['2026-10-16'] * 2000, [float(i)] * 2000) for i in range(len(stores))]
+    errors = []
+
+    def write(i):
+        try:
+            for _ in range(20):
+                stores[i].write('600000', 'D', 'qfq', frames[i])
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(len(stores))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    data = stores[0].read('600000', 'D', 'qfq')
+    assert any(data.equals(frame) for frame in frames)
+    assert [name for root, _, names in os.walk(str(tmp_path)) for name in names if name.endswith('.tmp')] == []
+
+
+class Source():
+    """
+    代替网络下载的K线数据源，记录每次下载的起始日期
+    """
+    def __init__(self, data):
+        self.data = data
+        self.starts = []
+
+    def __call__(self, code, start, end, ktype, autype, index, retry, pause, store=None):
+        self.starts.append(start)
+        data = self.data[self.data.date >= start] if start else self.data
+
+        return data.reset_index(drop=True)
+
+
+def sync(stock, store, source, ktype='W', autype='qfq'):
+    stock._StockData__history = source
+
+    return stock._StockData__syncStore(store, '600000', None, ktype, autype, False, 3, 0)
+
+
+def test_sync_store_empty(tmp_path):
+    store = KlineStore(str(tmp_path), 'pickle')
+    source = Source(bars(['2026-10-15', '2026-10-16'], [1.0, 2.0]))
+
+    data = sync(StockData('600000', inter=False), store, source, 'D')
+
+    assert source.starts == ['']
+    assert list(data['close']) == [1.0, 2.0]
+    assert store.read('600000', 'D', 'qfq').equals(data)
+
+
+def test_sync_store_appends(tmp_path):
+    store = KlineStore(str(tmp_path), 'pickle')
+    store.write('600000', 'D', 'qfq', bars(['2026-10-15', '2026-10-16'], [1.0, 2.0]))
+    source = Source(bars(['2026-10-15', '2026-10-16', '2026-10-19'], [1.0, 2.0, 3.0]))
+
+    data = sync(StockData('600000', inter=False), store, source, 'D')
+
+    assert len(source.starts) == 1
+    assert list(data['date']) == ['2026-10-15', '2026-10-16', '2026-10-19']
+    assert list(data['close']) == [1.0, 2.0, 3.0]
+
+
+def test_sync_store_refreshes_last_bar(tmp_path):
+    store = KlineStore(str(tmp_path), 'pickle')
+    store.write('600000', 'W', 'qfq', bars(['2026-10-02', '2026-10-09', '2026-10-14'], [1.0, 2.0, 3.0]))
+    source = Source(bars(['2026-10-02', '2026-10-09', '2026-10-16', '2026-10-23'], [1.0, 2.0, 3.5, 4.0]))
+
+    data = sync(StockData('600000', inter=False), store, source)
+
+    assert source.starts == ['2026-10-09']
+    assert list(data['date']) == ['2026-10-02', '2026-10-09', '2026-10-16', '2026-10-23']
+    assert list(data['close']) == [1.0, 2.0, 3.5, 4.0]
+    assert store.read('600000', 'W', 'qfq').equals(data)
+
+
+def test_sync_store_qfq_adjusted(tmp_path):
+    store = KlineStore(str(tmp_path), 'pickle')
+    store.write('600000', 'D', 'qfq', bars(['2026-10-15', '2026-10-16'], [1.0, 2.0]))
+    source = Source(bars(['2026-10-14', '2026-10-15', '2026-10-16', '2026-10-19'], [0.4, 0.5, 1.0, 1.1]))
+
+    data = sync(StockData('600000', inter=False), store, source, 'D')
+
+    assert source.starts == ['2026-10-15', '2026-10-15']
+    assert list(data['close']) == [0.5, 1.0, 1.1]
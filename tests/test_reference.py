@@ -0,0 +1,44 @@
+# -*- coding:utf-8 -*-
+"""
+Reference 页面表格解析
+"""
+
+import config as cf
+from base import Base
+from recorder import Recorder
+from reference import Reference
+
+
+def ipoPage():
+    rows = ['<tr><td colspan="15">新股发行</td></tr>', '<tr>%s</tr>' % ''.join(['<td>h%s</td>' % i for i in range(15)])]
+    cells = ['<a>600001</a><font color="red">*</font>', '780001', '新股<font color="red">*</font>', '2026-10-16',
+             '2026-10-20', '3000', '1200', '<font color="red">12.50</font>', '22.99', '1.2', '3.75', '0.03',
+             'a', 'b', 'c']
+    rows.append('<tr>%s</tr>' % ''.join(['<td>%s</td>' % cell for cell in cells]))
+
+    return ('<html><head><meta http-equiv="Content-Type" content="text/html; charset=gb2312"></head>'
+            '<body><table id="NewStockTable">%s</table></body></html>' % ''.join(rows))
+
+
+def test_ipo_red_marker(tmp_path):
+    recorder = Recorder(str(tmp_path), 'replay')
+    recorder.save(cf.NEW_STOCKS_URL % 1, ipoPage().encode('gbk'))
+    Base.setRecorder(recorder)
+
+    data = Reference(inter=False).ipo(pause=0)
+
+    assert list(data.columns) == cf.NEW_STOCKS_COLS
+    assert data['code'][0] == '600001'
+    assert data['name'][0] == '新股'
+    assert data['price'][0] == 12.5
+
+
+def test_forecast_empty_quarter(tmp_path):
+    recorder = Recorder(str(tmp_path), 'replay')
+    recorder.save(cf.FORECAST_URL % (2018, 3, 1, cf.PAGE_NUM[1]),
+                  u'<html><body><table class="list_table"><tr><th>股票代码</th></tr></table></body></html>'.encode('gbk'))
+    Base.setRecorder(recorder)
+
+    data = Reference(inter=False).forecast(2018, 3, pause=0)
+
+    assert data is None
@@ -0,0 +1,54 @@
+# -*- coding:utf-8 -*-
+"""
+在benchmarks/replay.py的合成fixture上回放各接口，校验解析结果的行数及字段
+"""
+
+import pytest
+
+import config as cf
+from base import Base
+from recorder import Recorder
+import replay
+
+
+EXPECTED = {
+    'history': (640, cf.KLINE_TT_COLS + ['code']),
+    'realtime': (800, cf.LIVE_DATA_COLS[:-1] + ['code']),
+    'latest': (400, ['code', 'name', 'changepercent', 'trade', 'open', 'high', 'low', 'settlement',
+                     'volume', 'turnoverratio', 'amount', 'per', 'pb', 'mktcap', 'nmc']),
+    'historyTicks': (1200, cf.HISTORY_TICK_COLUMNS),
+    'report': (600, cf.REPORT_COLS),
+    'conBonds': (250, cf.CON_BONDS_COLS),
+    'topList': (150, ['code', 'name', 'pchange', 'amount', 'buy', 'sell', 'reason', 'unscramble',
+                      'bratio', 'sratio', 'date']),
+}
+
+
+@pytest.fixture(scope='module')
+def fixtures(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('fixtures'))
+    recorder = Recorder(path, 'record')
+    for _, build, _, _ in replay.CASES:
+        build(recorder)
+
+    return path
+
+
+@pytest.mark.parametrize('name, func', [(case[0], case[2]) for case in replay.CASES],
+                         ids=[case[0] for case in replay.CASES])
+def test_replay(fixtures, name, func):
+    Base.setRecorder(Recorder(fixtures, 'replay'))
+
+    data = func()
+    rows, columns = EXPECTED[name]
+
+    assert data is not None
+    assert len(data) == rows
+    assert list(data.columns) == columns
+
+
+def test_replay_missing_url(tmp_path):
+    Base.setRecorder(Recorder(str(tmp_path), 'replay'))
+
+    with pytest.raises(Exception):
+        replay.CASES[0][2]()
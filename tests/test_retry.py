@@ -0,0 +1,128 @@
+# -*- coding:utf-8 -*-
+"""
+Retrier 重试调度及 CircuitBreaker 熔断
+"""
+
+import json
+
+import pytest
+import requests
+
+import config as cf
+from base import Base
+from marketdata import MarketData
+from recorder import Recorder
+from retry import Retrier, CircuitBreaker, CircuitOpenError
+from stockdata import StockData
+import replay
+
+
+class Failing():
+    def __init__(self, error, times):
+        self.error = error
+        self.times = times
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.times:
+            raise self.error
+
+        return 'ok'
+
+
+def test_retry_until_success():
+    func = Failing(requests.exceptions.ConnectionError('down'), 2)
+
+    retrier = Retrier(0, 0)
+
+    assert retrier.run(func, 3, 0) == 'ok'
+    assert func.calls == 3
+    assert retrier.retried() == 2
+    assert retrier.retried() == 0
+
+
+def test_retry_exhausted():
+    error = requests.exceptions.Timeout('slow')
+    func = Failing(error, 5)
+
+    with pytest.raises(IOError) as info:
+        Retrier(0, 0).run(func, 3, 0)
+
+    assert func.calls == 3
+    assert info.value.__cause__ is error
+    assert info.value.args[1] is error
+
+
+@pytest.mark.parametrize('error', [ValueError('parse'), CircuitOpenError('open')])
+def test_fatal_errors_raised_unchanged(error):
+    func = Failing(error, 5)
+
+    with pytest.raises(type(error)) as info:
+        Retrier(0, 0).run(func, 3, 0)
+
+    assert info.value is error
+    assert func.calls == 1
+
+
+def test_delay_bounds():
+    retrier = Retrier(0.5, 2)
+
+    for attempt in range(6):
+        assert 0.1 <= retrier.delay(attempt, 0.1) <= 2
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(failures=2, cooldown=60)
+    breaker.failure('a.com')
+    breaker.before('a.com')
+    breaker.failure('a.com')
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before('a.com')
+    assert list(breaker.state()) == ['a.com']
+
+    breaker.success('a.com')
+    breaker.before('a.com')
+    assert breaker.state() == {}
+
+
+@pytest.fixture
+def replayer(tmp_path):
+    """
+    无fixture即失败的回放器，重试不等待
+    """
+    recorder = Recorder(str(tmp_path), 'replay')
+    Base.setRecorder(recorder)
+    Base.setRetrier(Retrier(0, 0))
+    yield recorder
+    Base.setRetrier(None)
+
+
+def test_errors_propagate_from_pages(replayer):
+    with pytest.raises(IOError) as info:
+        StockData('600000', inter=False).historyTicks('2019-01-25', pause=0, workers=1)
+
+    assert 'transHis.php' in str(info.value.__cause__)
+
+
+def test_indexETF_pages(replayer):
+    cell = dict((col, '1') for col in cf.INDEX_ETF_COLS)
+    for page in (1, 2, 3):
+        rows = [{'cell': cell}] * 2 if page < 3 else []
+        replayer.save(cf.INDEX_ETF_URL % page, json.dumps({'page': min(page, 2), 'rows': rows}))
+
+    assert len(MarketData(inter=False).indexETF(pause=0)) == 4
+
+
+def test_indexETF_gives_up(replayer):
+    with pytest.raises(IOError):
+        MarketData(inter=False).indexETF(pause=0)
+
+
+def test_latest_page_count_fails(replayer):
+    replay.latestFixtures(replayer)
+    replayer.save(cf.LATEST_COUNT_URL, 'null')
+
+    with pytest.raises(TypeError):
+        MarketData(inter=False).latest(pause=0)
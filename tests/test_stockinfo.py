@@ -0,0 +1,43 @@
+# -*- coding:utf-8 -*-
+"""
+StockInfo 分页报表的空页处理
+"""
+
+import pytest
+
+import config as cf
+from base import Base
+from recorder import Recorder
+from stockinfo import StockInfo
+import replay
+
+
+def emptyPage():
+    return u'<html><body><table class="list_table"><tr><th>股票代码</th></tr></table></body></html>'.encode('gbk')
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    recorder = Recorder(str(tmp_path), 'replay')
+    Base.setRecorder(recorder)
+
+    return recorder
+
+
+def test_empty_quarter(recorder):
+    recorder.save(cf.REPORT_URL % (2018, 3, 1, cf.PAGE_NUM[1]), emptyPage())
+
+    data = StockInfo(inter=False).report(2018, 3, pause=0)
+
+    assert data is None
+
+
+def test_empty_page_ends_pagination(recorder):
+    replay.reportFixtures(recorder, pages=3)
+    recorder.save(cf.REPORT_URL % (2018, 3, 3, cf.PAGE_NUM[1]), emptyPage())
+
+    data = StockInfo(inter=False).report(2018, 3, pause=0)
+    pages = list(StockInfo(inter=False).iterReport(2018, 3, pause=0))
+
+    assert len(data) == 120
+    assert [len(page) for page in pages] == [60, 60]
@@ -0,0 +1,67 @@
+# -*- coding:utf-8 -*-
+"""
+StockData.tailTicks 增量分笔
+"""
+
+import pandas as pd
+import pytest
+
+import config as cf
+from base import Base
+from recorder import Recorder
+from stockdata import StockData
+
+
+DATE = '2026-10-16'
+
+
+class Book():
+    """
+    按页提供当日分笔，第1页为最新成交，每页2笔
+    """
+    def __init__(self, times):
+        self.times = times
+
+    def __call__(self, url, column, retry, pause):
+        page = int(url.rsplit('=', 1)[1])
+        times = self.times[(page - 1) * 2:page * 2]
+        if not times:
+            return None
+
+        return pd.DataFrame({'time': times, 'price': '10.00', 'pchange': '0', 'change': '0',
+                             'volume': '1', 'amount': '1000', 'type': '买盘'}, columns=column)
+
+
+@pytest.fixture
+def stock(tmp_path):
+    recorder = Recorder(str(tmp_path), 'replay')
+    Base.setRecorder(recorder)
+
+    stock = StockData('600000', inter=False)
+    stock._StockData__tickDate = lambda: DATE
+    stock.book = Book(['10:00:02', '10:00:01', '10:00:01', '10:00:00'])
+    stock._StockData__handleTicks = lambda *args: stock.book(*args)
+
+    recorder.save(cf.TODAY_TICKS_PAGE_URL % (DATE, 'sh600000'), '({detailPages:[1,2]})')
+
+    return stock
+
+
+def test_first_call_returns_all(stock):
+    assert list(stock.tailTicks(pause=0)['time']) == ['10:00:02', '10:00:01', '10:00:01', '10:00:00']
+    assert stock.tailTicks(pause=0) is None
+
+
+def test_same_second_trades(stock):
+    stock.tailTicks(pause=0)
+
+    stock.book.times = ['10:00:03', '10:00:02', '10:00:02', '10:00:01', '10:00:01', '10:00:00']
+    assert list(stock.tailTicks(pause=0)['time']) == ['10:00:03', '10:00:02']
+
+    stock.book.times = ['10:00:03', '10:00:03'] + stock.book.times
+    assert list(stock.tailTicks(pause=0)['time']) == ['10:00:03', '10:00:03']
+
+
+def test_todayTicks_keeps_tail_cursor(stock):
+    assert len(stock.todayTicks(pause=0)) == 4
+    assert len(stock.tailTicks(pause=0)) == 4
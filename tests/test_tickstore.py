@@ -0,0 +1,53 @@
+# -*- coding:utf-8 -*-
+"""
+TickStore 编解码及存取
+"""
+
+import numpy as np
+import pandas as pd
+
+from tickstore import TickStore
+
+
+def ticks():
+    return pd.DataFrame({'time': ['09:25:00', '09:30:03', '13:00:00', '14:59:59'],
+                         'price': ['10.01', '10.02', '9.99', '10.00'],
+                         'change': ['--', '0.01', '-0.03', '0.01'],
+                         'volume': ['120', '5', '30', '1'],
+                         'amount': ['120120', '5010', '29970', '1000'],
+                         'type': ['中性盘', '买盘', '卖盘', '买盘']})
+
+
+def test_tick_encode_decode():
+    data = ticks()
+    decoded = TickStore.decode(TickStore.encode(data))
+
+    assert list(decoded['time']) == list(data['time'])
+    assert np.allclose(decoded['price'], data['price'].astype(float))
+    assert list(decoded['volume']) == [120, 5, 30, 1]
+    assert list(decoded['amount']) == [120120, 5010, 29970, 1000]
+    assert list(decoded['type']) == list(data['type'])
+
+
+def test_tick_store_roundtrip(tmp_path):
+    store = TickStore(str(tmp_path))
+    store.write('600000', '2026-10-15', ticks())
+    store.write('600000', '2026-10-16', ticks().iloc[:2])
+
+    assert store.dates('600000') == ['2026-10-15', '2026-10-16']
+    assert len(store.read('600000')) == 6
+
+    day = store.read('600000', '2026-10-16', decode=True)
+    assert list(day['date']) == [20261016, 20261016]
+    assert list(day['time']) == ['09:25:00', '09:30:03']
+
+
+def test_tick_store_replace_day(tmp_path):
+    store = TickStore(str(tmp_path))
+    store.write('600000', '2026-10-15', ticks())
+    store.write('600000', '2026-10-16', ticks())
+    store.write('600000', '2026-10-15', ticks().iloc[:1])
+
+    assert len(store.read('600000', '2026-10-15')) == 1
+    assert list(store.read('600000', '2026-10-16', decode=True)['time']) == list(ticks()['time'])
+
@@ -0,0 +1,100 @@
+# -*- coding:utf-8 -*-
+"""
+TradingCalendar 交易日计算
+"""
+
+import warnings
+
+import numpy as np
+import pytest
+
+from tradingcalendar import TradingCalendar
+
+
+@pytest.fixture
+def calendar():
+    return TradingCalendar()
+
+
+@pytest.mark.parametrize('date, trade', [
+    ('2026-10-09', True),
+    ('2026-10-01', False),     # 国庆
+    ('2026-10-10', False),     # 周六
+    ('2019-02-04', False),     # 春节
+    ('2019-02-11', True),
+])
+def test_isTradeDay(calendar, date, trade):
+    assert calendar.isTradeDay(date) is trade
+
+
+def test_isTradeDay_array(calendar):
+    result = calendar.isTradeDay(['2026-09-30', '2026-10-01', '2026-10-08'])
+
+    assert list(result) == [True, False, True]
+
+
+def test_offsets(calendar):
+    assert calendar.previousTradeDay('2026-10-08') == '2026-09-30'
+    assert calendar.nextTradeDay('2026-09-30') == '2026-10-08'
+    assert calendar.previousTradeDay('2026-10-12', n=2) == '2026-10-08'
+
+
+def test_tradeDays(calendar):
+    days = calendar.tradeDays('2026-09-28', '2026-10-09')
+
+    assert days == ['2026-09-28', '2026-09-29', '2026-09-30', '2026-10-08', '2026-10-09']
+    assert calendar.countTradeDays('2026-09-28', '2026-10-09') == len(days)
+
+
+def test_countTradeDays_array(calendar):
+    result = calendar.countTradeDays(np.array(['2026-09-28', '2026-10-08'], dtype='datetime64[D]'),
+                                     np.array(['2026-10-09', '2026-10-09'], dtype='datetime64[D]'))
+
+    assert list(result) == [5, 2]
+
+
+def test_addHolidays(calendar):
+    calendar.addHolidays(['2026-10-09'])
+
+    assert calendar.isTradeDay('2026-10-09') is False
+    assert '2026-10-09' in calendar.holidays()
+
+
+def test_uncovered_year_warns_once(calendar):
+    assert not calendar.covers('2030-01-02')
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        calendar.isTradeDay('2030-01-02')
+        calendar.isTradeDay('2030-01-03')
+        calendar.nextTradeDay('2030-01-03')
+
+    assert len(caught) == 1
+    assert '2030' in str(caught[0].message)
+
+
+def test_addHolidays_covers_year(calendar):
+    calendar.addHolidays(['2030-01-01'])
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        assert calendar.isTradeDay('2030-01-01') is False
+
+    assert calendar.covers('2030-06-01')
+    assert not caught
+
+
+def test_utility_uses_calendar_only(monkeypatch):
+    from utility import Utility
+
+    def offline(*args, **kwargs):
+        raise AssertionError('network')
+    monkeypatch.setattr(Utility, 'isHoliday', staticmethod(offline))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        assert Utility.isTradeDay('2031-01-02') is True
+        assert Utility.isTradeDay('2031-01-04') is False
+
+    assert Utility.isTradeDay('2026-10-01') is False
+    assert Utility.lastTradeDate() == TradingCalendar().previousTradeDay(Utility.getToday())
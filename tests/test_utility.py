@@ -0,0 +1,63 @@
+# -*- coding:utf-8 -*-
+"""
+Utility.str2Dict 及股票代码批量规范化
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utility import Utility
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('{"a": 1, "b": "x"}', {'a': 1, 'b': 'x'}),
+    ("{a:1,b:'x'}", {'a': 1, 'b': 'x'}),
+    ('var hq_json = {a:1};', {'a': 1}),
+    ("{s:'it\\'s', t:'say \"hi\"'}", {'s': "it's", 't': 'say "hi"'}),
+    ('{a:true,b:false,c:null,d:-1.5e3}', {'a': True, 'b': False, 'c': None, 'd': -1500.0}),
+    ('[{code:"600000",name:abc},]', [{'code': '600000', 'name': 'abc'}]),
+    ('{a:[1,2,],}', {'a': [1, 2]}),
+    ('"12"', '12'),
+    ("{a:.5,b:-.25,c:5.,d:1.e3,e:-.5E-1}", {'a': 0.5, 'b': -0.25, 'c': 5.0, 'd': 1000.0, 'e': -0.05}),
+    ("{t:'09:30:00',p:[.5,'x']}", {'t': '09:30:00', 'p': [0.5, 'x']}),
+    ('{"a":"1.5",b:2}', {'a': '1.5', 'b': 2}),
+])
+def test_str2Dict(text, expected):
+    assert Utility.str2Dict(text) == expected
+
+
+def test_codes_numbers():
+    result = Utility.codes([1, 600000, 999999, -1, 1000000, 12345678])
+
+    assert list(result) == ['000001', '600000', '999999', '', '', '']
+
+
+def test_codes_floats():
+    result = Utility.codes(np.array([1.0, np.nan, -3.0, 1e7]))
+
+    assert list(result) == ['000001', '', '', '']
+
+
+def test_codes_strings():
+    result = Utility.codes(['600000', 'sh600000', '000001.SZ', '1', '12345678', '-1', 'abc', ''])
+
+    assert list(result) == ['600000', '600000', '000001', '000001', '', '', '', '']
+
+
+def test_codes_series():
+    codes = pd.Series([600000, 1], index=['a', 'b'], name='code')
+    result = Utility.codes(codes)
+
+    assert isinstance(result, pd.Series)
+    assert list(result.index) == ['a', 'b']
+    assert list(result) == ['600000', '000001']
+
+
+@pytest.mark.parametrize('code', ['600000', '000001', '300750', '12345678', '-1', 'abc'])
+def test_symbols_match_symbol(code):
+    assert Utility.symbols([code])[0] == Utility.symbol(code)
+
+
+def test_symbols_numbers():
+    assert list(Utility.symbols([600000, 1, -1, 12345678])) == ['sh600000', 'sz000001', '', '']